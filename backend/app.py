@@ -1,40 +1,106 @@
-from flask import Flask, request, jsonify
+from flask import Blueprint, Flask, current_app, request, jsonify
 from flask_sqlalchemy import SQLAlchemy
 from flask_cors import CORS
-from flask_jwt_extended import JWTManager, create_access_token, create_refresh_token, jwt_required, get_jwt_identity
-from flask_mail import Mail, Message
+from flask_jwt_extended import (
+    JWTManager, create_access_token, create_refresh_token, jwt_required, get_jwt, get_jwt_identity,
+    verify_jwt_in_request
+)
+from flask_mail import Mail
+import click
+from itsdangerous import BadSignature, URLSafeTimedSerializer
+from functools import partial, wraps
 import csv
+import hmac
 import io
-import random
-import string
-from werkzeug.security import generate_password_hash, check_password_hash
-from datetime import datetime, timedelta
+import math
+import os
+import queue
+import time
+from datetime import date, datetime, timedelta
+from sqlalchemy.exc import IntegrityError, OperationalError
+from sqlalchemy.orm import configure_mappers
+from werkzeug.local import LocalProxy
+from werkzeug.middleware.proxy_fix import ProxyFix
 import config
-
-app = Flask(__name__)
-CORS(app)
-
-# JWT Configuration
-app.config['JWT_SECRET_KEY'] = 'your-secret-key-change-this-in-production'  # Change this!
-app.config['JWT_ACCESS_TOKEN_EXPIRES'] = timedelta(hours=1)
-app.config['JWT_REFRESH_TOKEN_EXPIRES'] = timedelta(days=30)
-jwt = JWTManager(app)
-
-# MySQL Configuration from config.py
-app.config['SQLALCHEMY_DATABASE_URI'] = config.SQLALCHEMY_DATABASE_URI
-app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = config.SQLALCHEMY_TRACK_MODIFICATIONS
-app.config['SQLALCHEMY_ENGINE_OPTIONS'] = config.SQLALCHEMY_ENGINE_OPTIONS
-
-# Email Configuration (update in config.py with your Gmail credentials)
-app.config['MAIL_SERVER'] = getattr(config, 'MAIL_SERVER', 'smtp.gmail.com')
-app.config['MAIL_PORT'] = getattr(config, 'MAIL_PORT', 587)
-app.config['MAIL_USE_TLS'] = getattr(config, 'MAIL_USE_TLS', True)
-app.config['MAIL_USERNAME'] = getattr(config, 'MAIL_USERNAME', None)
-app.config['MAIL_PASSWORD'] = getattr(config, 'MAIL_PASSWORD', None)
-app.config['MAIL_DEFAULT_SENDER'] = getattr(config, 'MAIL_USERNAME', 'noreply@aquatics.com')
-
-db = SQLAlchemy(app)
-mail = Mail(app)
+from ranking import competition_ranks, place_result
+from derived import DerivedRebuild, diff_bests
+from seeding import seed_heats
+from cache import ResponseCache, TTLCache
+from dates import birth_date_range, date_range_from_args, filter_date_range, parse_date
+from pagination import keyset_page
+from passwords import HasherBusy, PasswordHasher
+from export import FORMATS as EXPORT_FORMATS, stream_export
+from ids import SequenceAllocator
+from migrate_dates import migrate_date_columns
+from mailer import ConsoleBackend, FileBackend, MailQueue, SMTPBackend, render_mail
+from otp import MemoryOTPStore, OTPPurger, SQLOTPStore
+from live import MemoryBroker, RedisBroker, stream as live_stream
+from metrics import RequestMetrics
+from replicas import ReplicaRouter, RoutingSession
+from ratelimit import MemoryLimiter, RateLimiter, RedisLimiter
+from encoding import Compressor, FastJSONProvider
+
+api = Blueprint('api', __name__, cli_group=None)
+db = SQLAlchemy(session_options={'class_': RoutingSession})
+mail = Mail()
+jwt = JWTManager()
+
+def _service(name):
+    """Module-level name for a per-app object built by create_app()"""
+    return LocalProxy(lambda: current_app.extensions['swimming'][name])
+
+rankings_cache = _service('rankings_cache')
+db_router = _service('db_router')
+passwords = _service('passwords')
+live_broker = _service('live_broker')
+mail_queue = _service('mail_queue')
+otp_store = _service('otp_store')
+otp_purger = _service('otp_purger')
+user_cache = _service('user_cache')
+athlete_ids = _service('athlete_ids')
+rate_limiter = _service('rate_limiter')
+
+def replica_sticky_key():
+    """Writes stick a client to the primary: by JWT identity, else remote address"""
+    try:
+        return f'user:{get_jwt_identity()}'
+    except RuntimeError:  # No verified JWT in this request
+        return f'addr:{request.remote_addr}'
+
+@api.app_errorhandler(HasherBusy)
+def handle_hasher_busy(e):
+    response = jsonify({'error': 'Server is busy, please try again in a moment.'})
+    response.headers['Retry-After'] = '1'
+    return response, 429
+
+def rate_limited(rule, email_field=None):
+    """
+    Answer 429 with Retry-After once the client IP, or the address in the
+    JSON body's ``email_field``, is out of tokens for RATE_LIMITS[rule]
+    """
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            if current_app.config['RATE_LIMIT_ENABLED']:
+                email = None
+                if email_field:
+                    email = (request.get_json(silent=True) or {}).get(email_field)
+                wait = rate_limiter.check(rule, request.remote_addr, email if isinstance(email, str) else None)
+                if wait:
+                    response = jsonify({'error': 'Too many attempts. Please try again later.'})
+                    response.headers['Retry-After'] = str(math.ceil(wait))
+                    return response, 429
+            return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+def make_mail_backend(app):
+    backend = app.config['MAIL_BACKEND']
+    if backend == 'smtp':
+        return SMTPBackend(mail)
+    if backend == 'file':
+        return FileBackend(app.config['MAIL_FILE_DIR'])
+    return ConsoleBackend()
 
 class Swimmer(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -42,7 +108,7 @@ class Swimmer(db.Model):
     first_name = db.Column(db.String(100), nullable=False)
     last_name = db.Column(db.String(100), nullable=False)
     name = db.Column(db.String(100), nullable=False)  # Full name (computed)
-    date_of_birth = db.Column(db.String(20), nullable=False)
+    date_of_birth = db.Column(db.Date, nullable=False, index=True)
     email = db.Column(db.String(100), unique=True, nullable=False)
     father_name = db.Column(db.String(100), nullable=True)
     father_mobile = db.Column(db.String(20), nullable=True)
@@ -59,7 +125,7 @@ class Swimmer(db.Model):
 class Meet(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(100), nullable=False)
-    date = db.Column(db.String(20), nullable=False)
+    date = db.Column(db.Date, nullable=False, index=True)
     location = db.Column(db.String(100), nullable=True)
 
 class Event(db.Model):
@@ -76,6 +142,11 @@ class Result(db.Model):
     timing = db.Column(db.Float, nullable=False)
     rank = db.Column(db.Integer, nullable=True)
 
+    __table_args__ = (
+        db.Index('ix_result_meet_event', 'meet_id', 'event_id'),
+        db.Index('ix_result_swimmer_event', 'swimmer_id', 'event_id'),
+    )
+
 class User(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     username = db.Column(db.String(100), unique=True, nullable=False)
@@ -90,9 +161,41 @@ class PersonalBest(db.Model):
     event_id = db.Column(db.Integer, db.ForeignKey('event.id'), nullable=False)
     best_time = db.Column(db.Float, nullable=False)
     meet_id = db.Column(db.Integer, db.ForeignKey('meet.id'), nullable=False)  # Where PB was set
-    date = db.Column(db.String(20), nullable=False)
+    date = db.Column(db.Date, nullable=False)
     season_year = db.Column(db.Integer, nullable=False)  # For season best tracking
 
+    __table_args__ = (
+        db.Index('uq_personal_best_swimmer_event', 'swimmer_id', 'event_id', unique=True),
+        db.Index('ix_personal_best_event_swimmer', 'event_id', 'swimmer_id'),
+        db.Index('ix_personal_best_event_date', 'event_id', 'date'),
+    )
+
+class SeasonBest(db.Model):
+    # Fastest time per swimmer, event and season; maintained alongside
+    # PersonalBest so season rankings never scan the result table. gender and
+    # birth_year are copied from Swimmer so age-group filters use the index.
+    id = db.Column(db.Integer, primary_key=True)
+    swimmer_id = db.Column(db.Integer, db.ForeignKey('swimmer.id'), nullable=False)
+    event_id = db.Column(db.Integer, db.ForeignKey('event.id'), nullable=False)
+    season_year = db.Column(db.Integer, nullable=False)
+    best_time = db.Column(db.Float, nullable=False)
+    meet_id = db.Column(db.Integer, db.ForeignKey('meet.id'), nullable=False)
+    date = db.Column(db.Date, nullable=False)
+    gender = db.Column(db.String(10), nullable=False)
+    birth_year = db.Column(db.Integer, nullable=False)
+
+    __table_args__ = (
+        db.Index('uq_season_best_swimmer_event_season', 'swimmer_id', 'event_id', 'season_year', unique=True),
+        db.Index('ix_season_best_event_season_time', 'event_id', 'season_year', 'best_time'),
+        db.Index('ix_season_best_event_season_gender_birth', 'event_id', 'season_year', 'gender', 'birth_year'),
+    )
+
+class RankingVersion(db.Model):
+    # Bumped in the same transaction as any write that changes an event's
+    # rankings; every worker checks it before using its cached copy.
+    event_id = db.Column(db.Integer, db.ForeignKey('event.id'), primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0)
+
 class Entry(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     swimmer_id = db.Column(db.Integer, db.ForeignKey('swimmer.id'), nullable=False)
@@ -100,10 +203,16 @@ class Entry(db.Model):
     meet_id = db.Column(db.Integer, db.ForeignKey('meet.id'), nullable=False)
     entry_time = db.Column(db.Float, nullable=True)  # Seed time / Previous best time
     status = db.Column(db.String(20), default='pending')  # 'pending', 'approved', 'rejected', 'withdrawn'
-    entry_date = db.Column(db.String(20), nullable=False)  # When they registered
+    entry_date = db.Column(db.Date, nullable=False, index=True)  # When they registered
     heat = db.Column(db.Integer, nullable=True)  # Assigned heat number
     lane = db.Column(db.Integer, nullable=True)  # Assigned lane number
 
+    __table_args__ = (
+        db.Index('ix_entry_meet_status', 'meet_id', 'status'),
+        db.Index('ix_entry_swimmer_event_meet', 'swimmer_id', 'event_id', 'meet_id'),
+        db.Index('ix_entry_status', 'status'),
+    )
+
 class OTP(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     email = db.Column(db.String(100), nullable=False)
@@ -112,52 +221,149 @@ class OTP(db.Model):
     created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
     is_used = db.Column(db.Boolean, default=False)
 
-@app.route('/swimmers', methods=['GET'])
+    __table_args__ = (
+        db.Index('ix_otp_email_purpose_used', 'email', 'purpose', 'is_used', 'created_at'),
+        db.Index('ix_otp_created_at', 'created_at'),
+    )
+
+@api.before_app_request
+def start_background_jobs():
+    # Started on the first request so pre-forking servers start them per worker
+    otp_purger.start()
+
+def load_user(user_id):
+    """User record as a dict (with the swimmer's athlete_id), cached per process"""
+    user = user_cache.get(user_id)
+    if user is None:
+        row = db.session.query(
+            User.id, User.username, User.role, User.swimmer_id, Swimmer.athlete_id
+        ).outerjoin(Swimmer, Swimmer.id == User.swimmer_id).filter(User.id == user_id).first()
+        if row is None:
+            return None
+        user = user_cache.put(user_id, {
+            'id': row.id,
+            'username': row.username,
+            'role': row.role,
+            'swimmer_id': row.swimmer_id,
+            'athlete_id': row.athlete_id
+        })
+    return user
+
+def user_claims(user):
+    """Extra JWT claims so role checks and /me need no user lookup"""
+    return {'role': user['role'], 'swimmer_id': user['swimmer_id'], 'athlete_id': user['athlete_id']}
+
+def role_required(*roles):
+    """Allow only tokens whose role claim is one of ``roles``; use under @jwt_required()"""
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            role = get_jwt().get('role')
+            if role is None:  # Token issued before role claims were added
+                user = load_user(get_jwt_identity())
+                role = user['role'] if user else None
+            if role not in roles:
+                return jsonify({'error': 'You do not have permission to do this.'}), 403
+            return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+def caller_scope():
+    """(is_admin, swimmer_id) of the token's user; older tokens without claims look the user up"""
+    claims = get_jwt()
+    if 'role' not in claims:
+        claims = load_user(get_jwt_identity()) or {}
+    return claims.get('role') == 'admin', claims.get('swimmer_id')
+
+SWIMMER_FIELDS = {
+    'id': Swimmer.id,
+    'athlete_id': Swimmer.athlete_id,
+    'name': Swimmer.name,
+    'age': Swimmer.age,
+    'gender': Swimmer.gender,
+    'classification': Swimmer.classification,
+    'country': Swimmer.country,
+    'club': Swimmer.club
+}
+
+class IdSequence(db.Model):
+    name = db.Column(db.String(50), primary_key=True)  # e.g. 'ATH-2026-'
+    next_value = db.Column(db.Integer, nullable=False)
+
+def seed_athlete_sequence(conn, prefix):
+    """First number for a new prefix: one past the highest existing athlete_id"""
+    existing = conn.execute(
+        db.select(Swimmer.athlete_id).where(Swimmer.athlete_id.like(f'{prefix}%'))
+    ).scalars()
+    numbers = [int(a[len(prefix):]) for a in existing if a[len(prefix):].isdigit()]
+    return max(numbers, default=0) + 1
+
+def sequence_engine():
+    """
+    Engine used only for reserving id blocks. It opens its own connection, so
+    request threads holding every pooled connection cannot starve it.
+    """
+    services = current_app.extensions['swimming']
+    if services.get('sequence_engine') is None:
+        services['sequence_engine'] = db.create_engine(
+            db.engine.url, poolclass=db.pool.NullPool,
+            connect_args=current_app.config['SQLALCHEMY_ENGINE_OPTIONS'].get('connect_args', {})
+        )
+    return services['sequence_engine']
+
+def next_athlete_id():
+    # Format: ATH-YEAR-NUMBER (e.g., ATH-2026-0001)
+    prefix = f"ATH-{datetime.now().year}-"
+    return f"{prefix}{athlete_ids.next(prefix):04d}"
+
+@api.route('/swimmers', methods=['GET'])
 @jwt_required()
 def get_swimmers():
-    swimmers = Swimmer.query.all()
-    return jsonify([{
-        'id': s.id,
-        'athlete_id': s.athlete_id,
-        'name': s.name,
-        'age': s.age,
-        'gender': s.gender,
-        'classification': s.classification,
-        'country': s.country,
-        'club': s.club
-    } for s in swimmers])
-
-@app.route('/swimmers', methods=['POST'])
+    query = db.session.query(Swimmer)
+    for name in ('classification', 'gender', 'club', 'country'):
+        if request.args.get(name):
+            query = query.filter(SWIMMER_FIELDS[name] == request.args[name])
+    return keyset_page(query, Swimmer.id, SWIMMER_FIELDS)
+
+@api.route('/swimmers', methods=['POST'])
 @jwt_required()
 def add_swimmer():
     data = request.json
     # Auto-generate athlete_id if not provided
     if 'athlete_id' not in data:
-        # Generate format: COUNTRY-YEAR-NUMBER (e.g., IND-2026-001)
-        count = Swimmer.query.count() + 1
-        data['athlete_id'] = f"ATH-2026-{count:04d}"
+        data['athlete_id'] = next_athlete_id()
+    if data.get('date_of_birth'):
+        try:
+            data['date_of_birth'] = parse_date(data['date_of_birth'])
+        except ValueError:
+            return jsonify({'error': 'Invalid date_of_birth. Use YYYY-MM-DD.'}), 400
     
     swimmer = Swimmer(**data)
     db.session.add(swimmer)
     db.session.commit()
     return jsonify({'id': swimmer.id, 'athlete_id': swimmer.athlete_id}), 201
 
-@app.route('/meets', methods=['POST'])
+@api.route('/meets', methods=['POST'])
 @jwt_required()
 def add_meet():
     data = request.json
+    try:
+        data['date'] = parse_date(data.get('date'))
+    except ValueError:
+        return jsonify({'error': 'Invalid date. Use YYYY-MM-DD.'}), 400
     meet = Meet(**data)
     db.session.add(meet)
     db.session.commit()
     return jsonify({'id': meet.id}), 201
 
-@app.route('/meets', methods=['GET'])
+MEET_FIELDS = {'id': Meet.id, 'name': Meet.name, 'date': Meet.date, 'location': Meet.location}
+
+@api.route('/meets', methods=['GET'])
 @jwt_required()
 def get_meets():
-    meets = Meet.query.all()
-    return jsonify([{'id': m.id, 'name': m.name, 'date': m.date, 'location': m.location} for m in meets])
+    return keyset_page(db.session.query(Meet), Meet.id, MEET_FIELDS)
 
-@app.route('/events', methods=['POST'])
+@api.route('/events', methods=['POST'])
 @jwt_required()
 def add_event():
     data = request.json
@@ -166,76 +372,128 @@ def add_event():
     db.session.commit()
     return jsonify({'id': event.id}), 201
 
-@app.route('/events', methods=['GET'])
+EVENT_FIELDS = {'id': Event.id, 'name': Event.name, 'distance': Event.distance, 'stroke': Event.stroke}
+
+@api.route('/events', methods=['GET'])
 @jwt_required()
 def get_events():
-    events = Event.query.all()
-    return jsonify([{'id': e.id, 'name': e.name, 'distance': e.distance, 'stroke': e.stroke} for e in events])
-
-@app.route('/results', methods=['POST'])
+    query = db.session.query(Event)
+    if request.args.get('stroke'):
+        query = query.filter(Event.stroke == request.args['stroke'])
+    if request.args.get('distance', type=int):
+        query = query.filter(Event.distance == request.args.get('distance', type=int))
+    return keyset_page(query, Event.id, EVENT_FIELDS)
+
+def load_ranking_group(meet_id, event_id, classification):
+    """
+    Rows for one ranking board: (result_id, timing, stored rank). FOR UPDATE
+    (of the result rows only, not the swimmers) makes MySQL read the latest
+    committed rows. Call it after bump_ranking_versions: the event's version
+    row is what makes writers to one event take turns, even while the group
+    is still empty (SQLite ignores both; it has one writer).
+    """
+    group = db.func.coalesce(Swimmer.classification, 'Open')
+    return db.session.query(Result.id, Result.timing, Result.rank).join(
+        Swimmer, Swimmer.id == Result.swimmer_id
+    ).filter(
+        Result.meet_id == meet_id,
+        Result.event_id == event_id,
+        group == (classification or 'Open')
+    ).with_for_update(of=Result).all()
+
+RETRYABLE_ERRORS = (1213, 1205)  # MySQL: deadlock found, lock wait timeout
+
+def is_retryable(error):
+    """True when the database gave up on the transaction and running it again may succeed"""
+    return bool(error.orig and error.orig.args) and error.orig.args[0] in RETRYABLE_ERRORS
+
+@api.route('/results', methods=['POST'])
 @jwt_required()
 def add_result():
     data = request.json
-    result = Result(**data)
-    db.session.add(result)
-    db.session.commit()
-    
-    # Calculate rank based on timing for the same event and meet
-    # First, rank by classification if available
-    swimmer = Swimmer.query.get(result.swimmer_id)
-    
-    # Get all results for this event and meet
-    all_results = Result.query.filter_by(event_id=result.event_id, meet_id=result.meet_id).all()
-    
-    # Group by classification and assign ranks
-    classification_groups = {}
-    for r in all_results:
-        s = Swimmer.query.get(r.swimmer_id)
-        classification = s.classification or 'Open'
-        if classification not in classification_groups:
-            classification_groups[classification] = []
-        classification_groups[classification].append(r)
-    
-    # Assign ranks within each classification
-    for classification, results_list in classification_groups.items():
-        sorted_results = sorted(results_list, key=lambda x: x.timing)
-        for idx, r in enumerate(sorted_results):
-            r.rank = idx + 1
-    
-    db.session.commit()
-    
-    # Update Personal Best
-    meet = Meet.query.get(result.meet_id)
-    pb = PersonalBest.query.filter_by(swimmer_id=result.swimmer_id, event_id=result.event_id).first()
-    
-    if pb:
-        if result.timing < pb.best_time:
-            pb.best_time = result.timing
-            pb.meet_id = result.meet_id
-            pb.date = meet.date
-            pb.season_year = int(meet.date.split('-')[0]) if meet.date else 2026
-    else:
-        pb = PersonalBest(
-            swimmer_id=result.swimmer_id,
-            event_id=result.event_id,
-            best_time=result.timing,
-            meet_id=result.meet_id,
-            date=meet.date,
-            season_year=int(meet.date.split('-')[0]) if meet.date else 2026
-        )
-        db.session.add(pb)
-    
-    db.session.commit()
-    
-    return jsonify({'id': result.id, 'is_pb': result.timing == pb.best_time}), 201
-
-@app.route('/results', methods=['GET'])
+    swimmer = db.session.query(
+        Swimmer.classification, Swimmer.name, Swimmer.athlete_id
+    ).filter_by(id=data.get('swimmer_id')).first()
+    meet = db.session.query(Meet.date).filter_by(id=data.get('meet_id')).first()
+
+    for attempt in range(3):
+        result = Result(**data)
+        try:
+            # Lock the event's version row, then read the group before
+            # inserting into it and place the timing on that board; only
+            # slower swimmers (and any stale stored ranks) come back as changes
+            bump_ranking_versions([result.event_id])
+            board = load_ranking_group(result.meet_id, result.event_id, swimmer.classification)
+            db.session.add(result)
+            db.session.flush()  # Get result.id before ranking
+            result.rank, rank_changes = place_result(board, result.id, result.timing)
+            if rank_changes:
+                db.session.execute(
+                    db.update(Result),
+                    [{'id': rid, 'rank': rank} for rid, rank in rank_changes.items()]
+                )
+
+            new_bests = merge_personal_bests(
+                {(result.swimmer_id, result.event_id): (result.timing, result.meet_id)},
+                {result.meet_id: meet.date}
+            )
+            merge_season_bests(
+                {(result.swimmer_id, result.event_id, meet.date.year): (result.timing, result.meet_id)},
+                {result.meet_id: meet.date}
+            )
+            db.session.commit()
+            break
+        except OperationalError as e:
+            db.session.rollback()
+            if attempt == 2 or not is_retryable(e):
+                raise
+        except Exception:
+            db.session.rollback()
+            raise
+    rankings_cache.invalidate(result.event_id)
+
+    channel = f'meet:{result.meet_id}'
+    live_broker.publish(channel, 'results', {'event_id': result.event_id, 'results': [{
+        'id': result.id,
+        'swimmer_id': result.swimmer_id,
+        'swimmer_name': swimmer.name,
+        'athlete_id': swimmer.athlete_id,
+        'timing': result.timing,
+        'rank': result.rank
+    }]})
+    if rank_changes:
+        live_broker.publish(channel, 'ranks', {'event_id': result.event_id, 'changes': [
+            {'id': rid, 'rank': rank} for rid, rank in rank_changes.items()
+        ]})
+
+    return jsonify({'id': result.id, 'rank': result.rank, 'is_pb': bool(new_bests)}), 201
+
+RESULT_FIELDS = {
+    'id': Result.id,
+    'swimmer_id': Result.swimmer_id,
+    'event_id': Result.event_id,
+    'meet_id': Result.meet_id,
+    'timing': Result.timing,
+    'rank': Result.rank
+}
+
+@api.route('/results', methods=['GET'])
 @jwt_required()
 def get_results():
-    results = Result.query.all()
-    return jsonify([{'id': r.id, 'swimmer_id': r.swimmer_id, 'event_id': r.event_id, 'meet_id': r.meet_id, 'timing': r.timing, 'rank': r.rank} for r in results])
-
-@app.route('/personal-bests/<int:swimmer_id>', methods=['GET'])
+    query = db.session.query(Result)
+    for name in ('meet_id', 'event_id', 'swimmer_id'):
+        value = request.args.get(name, type=int)
+        if value:
+            query = query.filter(RESULT_FIELDS[name] == value)
+    try:
+        start, end = date_range_from_args(request.args)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    if start or end:
+        query = filter_date_range(query.join(Meet, Meet.id == Result.meet_id), Meet.date, start, end)
+    return keyset_page(query, Result.id, RESULT_FIELDS)
+
+@api.route('/personal-bests/<int:swimmer_id>', methods=['GET'])
 @jwt_required()
 def get_personal_bests(swimmer_id):
     pbs = PersonalBest.query.filter_by(swimmer_id=swimmer_id).all()
@@ -248,65 +506,295 @@ def get_personal_bests(swimmer_id):
         'season_year': pb.season_year
     } for pb in pbs])
 
-@app.route('/performance-history/<int:swimmer_id>/<int:event_id>', methods=['GET'])
+@api.route('/performance-history/<int:swimmer_id>/<int:event_id>', methods=['GET'])
 @jwt_required()
 def get_performance_history(swimmer_id, event_id):
-    results = Result.query.filter_by(swimmer_id=swimmer_id, event_id=event_id).all()
-    history = []
-    for r in results:
-        meet = Meet.query.get(r.meet_id)
-        history.append({
-            'timing': r.timing,
-            'rank': r.rank,
-            'meet_name': meet.name,
-            'meet_date': meet.date
+    try:
+        start, end = date_range_from_args(request.args)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    rows = db.session.query(
+        Result.timing, Result.rank, Meet.name, Meet.date
+    ).join(Meet, Meet.id == Result.meet_id).filter(
+        Result.swimmer_id == swimmer_id,
+        Result.event_id == event_id
+    )
+    rows = filter_date_range(rows, Meet.date, start, end).order_by(Meet.date, Result.id)
+    return jsonify([{
+        'timing': timing,
+        'rank': rank,
+        'meet_name': meet_name,
+        'meet_date': meet_date
+    } for timing, rank, meet_name, meet_date in rows])
+
+@api.route('/performance-history/<int:swimmer_id>', methods=['GET'])
+@jwt_required()
+def get_all_performance_history(swimmer_id):
+    """Every event's history for one swimmer in a single response"""
+    try:
+        start, end = date_range_from_args(request.args)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    rows = db.session.query(
+        Result.event_id, Event.name, Result.timing, Result.rank, Meet.name, Meet.date
+    ).join(Meet, Meet.id == Result.meet_id
+    ).join(Event, Event.id == Result.event_id
+    ).filter(Result.swimmer_id == swimmer_id)
+    rows = filter_date_range(rows, Meet.date, start, end).order_by(Result.event_id, Meet.date, Result.id)
+
+    series = []
+    for event_id, event_name, timing, rank, meet_name, meet_date in rows:
+        if not series or series[-1]['event_id'] != event_id:
+            series.append({'event_id': event_id, 'event_name': event_name, 'history': []})
+        series[-1]['history'].append({
+            'timing': timing,
+            'rank': rank,
+            'meet_name': meet_name,
+            'meet_date': meet_date
         })
-    return jsonify(sorted(history, key=lambda x: x['meet_date']))
+    return jsonify(series)
+
+def supports_window_functions():
+    """RANK() OVER needs SQLite 3.25+ or MySQL 8 / MariaDB 10.2+"""
+    dialect = db.engine.dialect
+    version = dialect.server_version_info or ()
+    if dialect.name == 'sqlite':
+        return version >= (3, 25)
+    if dialect.name in ('mysql', 'mariadb'):
+        return version >= ((10, 2) if dialect.is_mariadb else (8, 0))
+    return True
+
+def build_rankings(event_id, class_filter=None, start=None, end=None,
+                   season=None, gender=None, born=None):
+    # Best time for each swimmer in this event, ranked within classification.
+    # A whole season reads SeasonBest; an arbitrary date range takes the best
+    # over results from meets in that range (a Meet.date index range scan);
+    # otherwise all-time bests come from PersonalBest. ``born`` is a
+    # (earliest, latest) date-of-birth range for age-group rankings.
+    if season is not None:
+        best = db.session.query(
+            SeasonBest.swimmer_id.label('swimmer_id'),
+            SeasonBest.best_time.label('best_time')
+        ).filter(SeasonBest.event_id == event_id, SeasonBest.season_year == season)
+        if gender:
+            best = best.filter(SeasonBest.gender == gender)
+        if born:
+            born_from, born_to = born
+            if born_from:
+                best = best.filter(SeasonBest.birth_year >= born_from.year)
+            if born_to:
+                best = best.filter(SeasonBest.birth_year <= born_to.year)
+        gender = born = None  # Already applied
+    elif start is None and end is None:
+        best = db.session.query(
+            PersonalBest.swimmer_id.label('swimmer_id'),
+            PersonalBest.best_time.label('best_time')
+        ).filter(PersonalBest.event_id == event_id)
+    else:
+        best = db.session.query(
+            Result.swimmer_id.label('swimmer_id'),
+            db.func.min(Result.timing).label('best_time')
+        ).join(Meet, Meet.id == Result.meet_id).filter(Result.event_id == event_id)
+        best = filter_date_range(best, Meet.date, start, end).group_by(Result.swimmer_id)
+    best = best.subquery()
+
+    classification = db.func.coalesce(Swimmer.classification, 'Open')
+    columns = [
+        Swimmer.athlete_id, Swimmer.name, Swimmer.classification,
+        best.c.best_time, Swimmer.country, Swimmer.club, classification
+    ]
+    window = supports_window_functions()
+    if window:
+        columns.append(db.func.rank().over(
+            partition_by=classification, order_by=best.c.best_time
+        ))
+
+    query = db.session.query(*columns).select_from(best).join(
+        Swimmer, Swimmer.id == best.c.swimmer_id
+    )
+    if class_filter:
+        query = query.filter(classification == class_filter)
+    if gender:
+        query = query.filter(Swimmer.gender == gender)
+    if born:
+        query = filter_date_range(query, Swimmer.date_of_birth, *born)
+    rows = query.order_by(classification, best.c.best_time).all()
 
-@app.route('/rankings/<int:event_id>', methods=['GET'])
+    result = {}
+    for row in rows:
+        group = result.setdefault(row[6], [])
+        if window:
+            rank = row[7]
+        elif group and group[-1]['best_time'] == row.best_time:
+            rank = group[-1]['rank']  # Ties share a rank
+        else:
+            rank = len(group) + 1
+        group.append({
+            'athlete_id': row.athlete_id,
+            'name': row.name,
+            'classification': row.classification,
+            'best_time': row.best_time,
+            'country': row.country,
+            'club': row.club,
+            'rank': rank
+        })
+    return result
+
+def ranking_version(event_id):
+    return db.session.query(RankingVersion.version).filter_by(event_id=event_id).scalar() or 0
+
+def bump_ranking_versions(event_ids):
+    """
+    Mark these events' rankings as changed, inside the caller's write
+    transaction. Once it commits, cached copies in every worker stop matching.
+    """
+    event_ids = sorted(set(event_ids))  # Same lock order in every writer
+    if not event_ids:
+        return
+    updated = db.session.execute(
+        db.update(RankingVersion).where(RankingVersion.event_id.in_(event_ids))
+        .values(version=RankingVersion.version + 1)
+    ).rowcount
+    if updated == len(event_ids):
+        return
+    existing = set(db.session.scalars(
+        db.select(RankingVersion.event_id).where(RankingVersion.event_id.in_(event_ids))
+    ))
+    missing = [event_id for event_id in event_ids if event_id not in existing]
+    try:
+        with db.session.begin_nested():
+            db.session.execute(db.insert(RankingVersion), [{'event_id': eid, 'version': 1} for eid in missing])
+    except IntegrityError:
+        # Another writer created the rows first; move past its version
+        db.session.execute(
+            db.update(RankingVersion).where(RankingVersion.event_id.in_(missing))
+            .values(version=RankingVersion.version + 1)
+        )
+
+@api.route('/rankings/<int:event_id>', methods=['GET'])
 @jwt_required()
 def get_rankings(event_id):
-    # Get best time for each swimmer in this event
-    swimmers = Swimmer.query.all()
-    rankings = []
-    
-    for swimmer in swimmers:
-        pb = PersonalBest.query.filter_by(swimmer_id=swimmer.id, event_id=event_id).first()
-        if pb:
-            rankings.append({
-                'athlete_id': swimmer.athlete_id,
-                'name': swimmer.name,
-                'classification': swimmer.classification,
-                'best_time': pb.best_time,
-                'country': swimmer.country,
-                'club': swimmer.club
-            })
-    
-    # Sort by classification and then by time
-    rankings_by_class = {}
-    for r in rankings:
-        classification = r['classification'] or 'Open'
-        if classification not in rankings_by_class:
-            rankings_by_class[classification] = []
-        rankings_by_class[classification].append(r)
-    
-    # Assign ranks within each classification
-    result = {}
-    for classification, class_rankings in rankings_by_class.items():
-        sorted_rankings = sorted(class_rankings, key=lambda x: x['best_time'])
-        for idx, r in enumerate(sorted_rankings):
-            r['rank'] = idx + 1
-        result[classification] = sorted_rankings
-    
-    return jsonify(result)
+    class_filter = request.args.get('classification') or None
+    gender = request.args.get('gender') or None
+    try:
+        start, end = date_range_from_args(request.args)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    # A whole season (no date_from/date_to narrowing it) is served from SeasonBest
+    season = None
+    if request.args.get('season') and not (request.args.get('date_from') or request.args.get('date_to')):
+        season, start, end = start.year, None, None
+
+    born = None
+    age_group = request.args.get('age_group') or None
+    if age_group:
+        if age_group not in current_app.config['AGE_GROUPS']:
+            return jsonify({'error': f"age_group must be one of: {', '.join(current_app.config['AGE_GROUPS'])}"}), 400
+        age_year = season or (end.year if end else date.today().year)
+        born = birth_date_range(*current_app.config['AGE_GROUPS'][age_group], age_year)
+
+    # Shortly after a write a replica may still lag; read the primary then.
+    # The version is read before building, so a write committed meanwhile
+    # can only make this body newer than its version, never older.
+    with db_router.primary(db_router.recently_written()):
+        version = ranking_version(event_id)
+        key = (event_id, version, class_filter, start, end, season, gender, born)
+        cached = rankings_cache.get(key)
+        hit = cached is not None
+        if not hit:
+            body = current_app.json.dumps_bytes(build_rankings(
+                event_id, class_filter, start, end, season=season, gender=gender, born=born
+            ))
+            cached = rankings_cache.put(key, body)
+    etag, body = cached
+
+    response = current_app.response_class(body, mimetype='application/json')
+    response.set_etag(f'{version}-{etag}')
+    response.headers['Cache-Control'] = 'no-cache'  # Clients must revalidate
+    response.headers['X-Cache'] = 'HIT' if hit else 'MISS'
+    return response.make_conditional(request)
+
+def live_tickets():
+    # Signed with the JWT secret under its own salt, so a ticket is never an access token
+    return URLSafeTimedSerializer(current_app.config['JWT_SECRET_KEY'], salt='live-ticket')
+
+@api.route('/meets/<int:meet_id>/live/ticket', methods=['POST'])
+@jwt_required()
+def live_ticket(meet_id):
+    """
+    Short-lived ticket for one meet's stream. EventSource cannot set headers,
+    so browsers pass this in the URL instead of their access token.
+    """
+    if db.session.get(Meet, meet_id) is None:
+        return jsonify({'error': 'Meet not found'}), 404
+    ticket = live_tickets().dumps({'meet_id': meet_id, 'user_id': get_jwt_identity()})
+    return jsonify({'ticket': ticket, 'expires_in': current_app.config['LIVE_TICKET_TTL']})
+
+@api.route('/meets/<int:meet_id>/live', methods=['GET'])
+def live_meet(meet_id):
+    """
+    Server-Sent Events: 'results' and 'ranks' events as they are committed.
+    Authenticated by ?ticket= from POST /meets/<id>/live/ticket (checked at
+    connect time; get a new one to reconnect) or an Authorization header.
+    """
+    ticket = request.args.get('ticket')
+    if ticket:
+        try:
+            payload = live_tickets().loads(ticket, max_age=current_app.config['LIVE_TICKET_TTL'])
+        except BadSignature:  # Includes SignatureExpired
+            return jsonify({'error': 'Invalid or expired ticket'}), 401
+        if payload.get('meet_id') != meet_id:
+            return jsonify({'error': 'Ticket is for a different meet'}), 401
+    else:
+        verify_jwt_in_request()
+    if db.session.get(Meet, meet_id) is None:
+        return jsonify({'error': 'Meet not found'}), 404
+    subscription = live_broker.subscribe(f'meet:{meet_id}')
+    response = current_app.response_class(
+        live_stream(subscription, current_app.config['LIVE_HEARTBEAT']), mimetype='text/event-stream'
+    )
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'  # Don't let nginx buffer the stream
+    return response
+
+@api.route('/live/stats', methods=['GET'])
+@jwt_required()
+@role_required('admin')
+def get_live_stats():
+    return jsonify(live_broker.stats())
+
+@api.route('/db/stats', methods=['GET'])
+@jwt_required()
+@role_required('admin')
+def get_db_stats():
+    return jsonify(db_router.stats())
+
+@api.route('/rate-limits/stats', methods=['GET'])
+@jwt_required()
+@role_required('admin')
+def get_rate_limit_stats():
+    return jsonify(rate_limiter.stats())
+
+@api.route('/mail/stats', methods=['GET'])
+@jwt_required()
+@role_required('admin')
+def get_mail_stats():
+    """The outbox numbers /metrics exports as swimming_mail_*, as JSON"""
+    return jsonify(mail_queue.stats())
+
+@api.route('/rankings/cache-stats', methods=['GET'])
+@jwt_required()
+@role_required('admin')
+def get_rankings_cache_stats():
+    return jsonify(rankings_cache.stats())
 
 # Entry Management Endpoints
-@app.route('/entries', methods=['POST'])
+@api.route('/entries', methods=['POST'])
 @jwt_required()
 def add_entry():
     """Swimmer registers for an event"""
     data = request.json
-    from datetime import datetime
     
     # Check if already entered
     existing = Entry.query.filter_by(
@@ -324,49 +812,52 @@ def add_entry():
         meet_id=data['meet_id'],
         entry_time=data.get('entry_time'),
         status='pending',
-        entry_date=datetime.now().strftime('%Y-%m-%d')
+        entry_date=date.today()
     )
     db.session.add(entry)
     db.session.commit()
     return jsonify({'id': entry.id, 'status': entry.status}), 201
 
-@app.route('/entries', methods=['GET'])
+ENTRY_FIELDS = {
+    'id': Entry.id,
+    'swimmer_id': Entry.swimmer_id,
+    'swimmer_name': db.func.coalesce(Swimmer.name, 'Unknown'),
+    'athlete_id': db.func.coalesce(Swimmer.athlete_id, ''),
+    'event_id': Entry.event_id,
+    'event_name': db.func.coalesce(Event.name, 'Unknown'),
+    'meet_id': Entry.meet_id,
+    'meet_name': db.func.coalesce(Meet.name, 'Unknown'),
+    'entry_time': Entry.entry_time,
+    'status': Entry.status,
+    'entry_date': Entry.entry_date,
+    'heat': Entry.heat,
+    'lane': Entry.lane
+}
+
+@api.route('/entries', methods=['GET'])
 @jwt_required()
 def get_entries():
     """Get all entries (admin view)"""
-    meet_id = request.args.get('meet_id')
-    swimmer_id = request.args.get('swimmer_id')
+    meet_id = request.args.get('meet_id', type=int)
+    swimmer_id = request.args.get('swimmer_id', type=int)
+    status = request.args.get('status')
     
-    query = Entry.query
+    # One joined query for the columns the response needs; outer joins keep
+    # entries whose swimmer, event or meet has been removed
+    query = db.session.query(*ENTRY_FIELDS.values()
+    ).outerjoin(Swimmer, Swimmer.id == Entry.swimmer_id
+    ).outerjoin(Event, Event.id == Entry.event_id
+    ).outerjoin(Meet, Meet.id == Entry.meet_id)
     if meet_id:
-        query = query.filter_by(meet_id=int(meet_id))
+        query = query.filter(Entry.meet_id == meet_id)
     if swimmer_id:
-        query = query.filter_by(swimmer_id=int(swimmer_id))
-    
-    entries = query.all()
-    result = []
-    for e in entries:
-        swimmer = Swimmer.query.get(e.swimmer_id)
-        event = Event.query.get(e.event_id)
-        meet = Meet.query.get(e.meet_id)
-        result.append({
-            'id': e.id,
-            'swimmer_id': e.swimmer_id,
-            'swimmer_name': swimmer.name if swimmer else 'Unknown',
-            'athlete_id': swimmer.athlete_id if swimmer else '',
-            'event_id': e.event_id,
-            'event_name': event.name if event else 'Unknown',
-            'meet_id': e.meet_id,
-            'meet_name': meet.name if meet else 'Unknown',
-            'entry_time': e.entry_time,
-            'status': e.status,
-            'entry_date': e.entry_date,
-            'heat': e.heat,
-            'lane': e.lane
-        })
-    return jsonify(result)
+        query = query.filter(Entry.swimmer_id == swimmer_id)
+    if status:
+        query = query.filter(Entry.status == status)
+
+    return current_app.json.response_rows(ENTRY_FIELDS, query.order_by(Entry.id))
 
-@app.route('/entries/<int:entry_id>', methods=['PUT'])
+@api.route('/entries/<int:entry_id>', methods=['PUT'])
 @jwt_required()
 def update_entry(entry_id):
     """Update entry status (admin approves/rejects)"""
@@ -385,7 +876,7 @@ def update_entry(entry_id):
     db.session.commit()
     return jsonify({'id': entry.id, 'status': entry.status}), 200
 
-@app.route('/entries/<int:entry_id>', methods=['DELETE'])
+@api.route('/entries/<int:entry_id>', methods=['DELETE'])
 @jwt_required()
 def delete_entry(entry_id):
     """Withdraw entry"""
@@ -397,7 +888,209 @@ def delete_entry(entry_id):
     db.session.commit()
     return jsonify({'message': 'Entry withdrawn'}), 200
 
-@app.route('/register', methods=['POST'])
+ENTRY_STATUSES = ('pending', 'approved', 'rejected', 'withdrawn')
+
+def bulk_items(data, key):
+    """The list under ``key`` in a bulk request body, or an error message"""
+    items = (data or {}).get(key)
+    if not isinstance(items, list) or not items:
+        return None, f"'{key}' must be a non-empty list"
+    if len(items) > current_app.config['BULK_ENTRY_MAX']:
+        return None, f"At most {current_app.config['BULK_ENTRY_MAX']} items per request"
+    return items, None
+
+def bulk_response(results):
+    failed = sum(1 for r in results if 'error' in r)
+    return jsonify({'succeeded': len(results) - failed, 'failed': failed, 'results': results}), 200
+
+def valid_entry_time(value):
+    """A finite, positive number of seconds, or None for no seed time"""
+    if value is None:
+        return True
+    return isinstance(value, (int, float)) and not isinstance(value, bool) and math.isfinite(value) and value > 0
+
+def valid_position(value):
+    """Heat and lane numbers are positive integers"""
+    return isinstance(value, int) and not isinstance(value, bool) and value > 0
+
+@api.route('/entries/bulk', methods=['POST'])
+@jwt_required()
+def add_entries_bulk():
+    """
+    Register many entries; duplicates and unknown ids fail per item. Only
+    admins may register entries for swimmers other than their own.
+    """
+    items, error = bulk_items(request.get_json(silent=True), 'entries')
+    if error:
+        return jsonify({'error': error}), 400
+
+    keys = []
+    for item in items:
+        try:
+            keys.append((int(item['swimmer_id']), int(item['event_id']), int(item['meet_id'])))
+        except (KeyError, TypeError, ValueError):
+            keys.append(None)
+    valid = [k for k in keys if k]
+
+    # One query per check instead of one per entry
+    swimmers = {sid for (sid,) in db.session.query(Swimmer.id).filter(Swimmer.id.in_({k[0] for k in valid}))}
+    events = {eid for (eid,) in db.session.query(Event.id).filter(Event.id.in_({k[1] for k in valid}))}
+    meets = {mid for (mid,) in db.session.query(Meet.id).filter(Meet.id.in_({k[2] for k in valid}))}
+    taken = set(db.session.query(Entry.swimmer_id, Entry.event_id, Entry.meet_id).filter(
+        db.tuple_(Entry.swimmer_id, Entry.event_id, Entry.meet_id).in_(set(valid))
+    )) if valid else set()
+
+    is_admin, own_swimmer_id = caller_scope()
+    results, created = [], []
+    today = date.today()
+    for index, (item, key) in enumerate(zip(items, keys)):
+        if key is None:
+            results.append({'index': index, 'error': 'swimmer_id, event_id and meet_id are required'})
+        elif not is_admin and key[0] != own_swimmer_id:
+            results.append({'index': index, 'error': 'You can only register your own entries'})
+        elif not valid_entry_time(item.get('entry_time')):
+            results.append({'index': index, 'error': 'entry_time must be a positive number of seconds or null'})
+        elif key[0] not in swimmers or key[1] not in events or key[2] not in meets:
+            results.append({'index': index, 'error': 'Unknown swimmer, event or meet'})
+        elif key in taken:
+            results.append({'index': index, 'error': 'Already registered for this event'})
+        else:
+            taken.add(key)
+            entry = Entry(
+                swimmer_id=key[0],
+                event_id=key[1],
+                meet_id=key[2],
+                entry_time=item.get('entry_time'),
+                status='pending',
+                entry_date=today
+            )
+            created.append(entry)
+            results.append({'index': index, 'status': entry.status, 'entry': entry})
+
+    db.session.add_all(created)
+    db.session.commit()
+    for result in results:
+        if 'entry' in result:
+            result['id'] = result.pop('entry').id
+    return bulk_response(results)
+
+@api.route('/entries/bulk', methods=['PUT'])
+@jwt_required()
+@role_required('admin')
+def update_entries_bulk():
+    """
+    Update many entries in one transaction. Either {"ids": [...], "status": ...}
+    or {"entries": [{"id": ..., "status"/"heat"/"lane": ...}, ...]}.
+    """
+    data = request.get_json(silent=True) or {}
+    if 'ids' in data:
+        ids, error = bulk_items(data, 'ids')
+        items = [{'id': entry_id, 'status': data.get('status')} for entry_id in ids or []]
+    else:
+        items, error = bulk_items(data, 'entries')
+    if error:
+        return jsonify({'error': error}), 400
+
+    ids = {item.get('id') for item in items if isinstance(item, dict) and isinstance(item.get('id'), int)}
+    existing = {eid for (eid,) in db.session.query(Entry.id).filter(Entry.id.in_(ids))}
+
+    results, changes = [], []
+    for index, item in enumerate(items):
+        if not isinstance(item, dict) or item.get('id') not in existing:
+            results.append({'index': index, 'error': 'Entry not found'})
+            continue
+        change = {field: item[field] for field in ('status', 'heat', 'lane') if field in item}
+        if 'status' in change and change['status'] not in ENTRY_STATUSES:
+            results.append({'index': index, 'id': item['id'], 'error': f"status must be one of: {', '.join(ENTRY_STATUSES)}"})
+            continue
+        if not all(valid_position(change[field]) for field in ('heat', 'lane') if field in change):
+            results.append({'index': index, 'id': item['id'], 'error': 'heat and lane must be positive integers'})
+            continue
+        if not change:
+            results.append({'index': index, 'id': item['id'], 'error': 'Nothing to update'})
+            continue
+        changes.append({'id': item['id'], **change})
+        results.append({'index': index, 'id': item['id'], 'status': change.get('status', 'updated')})
+
+    if changes:
+        db.session.execute(db.update(Entry), changes)
+    db.session.commit()
+    return bulk_response(results)
+
+@api.route('/entries/bulk', methods=['DELETE'])
+@jwt_required()
+def delete_entries_bulk():
+    """Withdraw many entries by id; non-admins can only withdraw their own swimmer's entries"""
+    ids, error = bulk_items(request.get_json(silent=True), 'ids')
+    if error:
+        return jsonify({'error': error}), 400
+
+    query = db.session.query(Entry.id).filter(
+        Entry.id.in_({entry_id for entry_id in ids if isinstance(entry_id, int)})
+    )
+    is_admin, own_swimmer_id = caller_scope()
+    if not is_admin:
+        query = query.filter(Entry.swimmer_id == own_swimmer_id)  # Other swimmers' entries read as not found
+    existing = {eid for (eid,) in query}
+    if existing:
+        Entry.query.filter(Entry.id.in_(existing)).delete(synchronize_session=False)
+    db.session.commit()
+    return bulk_response([
+        {'index': index, 'id': entry_id, 'status': 'withdrawn'} if isinstance(entry_id, int) and entry_id in existing
+        else {'index': index, 'id': entry_id, 'error': 'Entry not found'}
+        for index, entry_id in enumerate(ids)
+    ])
+
+@api.route('/meets/<int:meet_id>/events/<int:event_id>/seed', methods=['POST'])
+@jwt_required()
+@role_required('admin')
+def seed_event(meet_id, event_id):
+    """Assign heats and lanes to every approved entry for one event"""
+    data = request.get_json(silent=True) or {}
+    seed_round = data.get('round', 'prelim')
+    if seed_round not in ('prelim', 'final'):
+        return jsonify({'error': "round must be 'prelim' or 'final'"}), 400
+    lanes = data.get('lanes', current_app.config['POOL_LANES'])
+    if not isinstance(lanes, int) or not 1 <= lanes <= 10:
+        return jsonify({'error': 'lanes must be a number from 1 to 10'}), 400
+
+    # Seed by entry time, falling back to the swimmer's personal best
+    seed_time = db.func.coalesce(Entry.entry_time, PersonalBest.best_time)
+    entries = db.session.query(Entry.id, seed_time).outerjoin(
+        PersonalBest,
+        (PersonalBest.swimmer_id == Entry.swimmer_id) & (PersonalBest.event_id == Entry.event_id)
+    ).filter(
+        Entry.meet_id == meet_id,
+        Entry.event_id == event_id,
+        Entry.status == 'approved'
+    ).all()
+
+    assignments = seed_heats(entries, lanes=lanes, circle=seed_round == 'final')
+    if assignments:
+        db.session.execute(
+            db.update(Entry),
+            [{'id': entry_id, 'heat': heat, 'lane': lane} for entry_id, heat, lane in assignments]
+        )
+    # Entries no longer approved give up their lanes
+    cleared = Entry.query.filter(
+        Entry.meet_id == meet_id,
+        Entry.event_id == event_id,
+        Entry.status != 'approved',
+        Entry.heat.isnot(None)
+    ).update({'heat': None, 'lane': None}, synchronize_session=False)
+    db.session.commit()
+
+    return jsonify({
+        'meet_id': meet_id,
+        'event_id': event_id,
+        'round': seed_round,
+        'lanes': lanes,
+        'heats': max((heat for _, heat, _ in assignments), default=0),
+        'seeded': len(assignments),
+        'cleared': cleared
+    }), 200
+
+@api.route('/register', methods=['POST'])
 @jwt_required()
 def register():
     data = request.json
@@ -406,7 +1099,7 @@ def register():
     
     user = User(
         username=data['username'],
-        password_hash=generate_password_hash(data['password']),
+        password_hash=passwords.hash(data['password']),
         role=data['role'],
         swimmer_id=data.get('swimmer_id')
     )
@@ -414,7 +1107,8 @@ def register():
     db.session.commit()
     return jsonify({'id': user.id, 'username': user.username, 'role': user.role}), 201
 
-@app.route('/signup', methods=['POST'])
+@api.route('/signup', methods=['POST'])
+@rate_limited('signup', email_field='email')
 def signup():
     data = request.json
     
@@ -426,11 +1120,16 @@ def signup():
     if User.query.filter_by(username=data['email']).first():
         return jsonify({'error': 'Username already exists'}), 400
 
+    try:
+        dob = parse_date(data['date_of_birth'])
+    except ValueError:
+        return jsonify({'error': 'Invalid date of birth. Use YYYY-MM-DD.'}), 400
+
     # Check duplicate by First Name + Last Name + Date of Birth
     existing = Swimmer.query.filter_by(
         first_name=data['first_name'].strip(),
         last_name=data['last_name'].strip(),
-        date_of_birth=data['date_of_birth']
+        date_of_birth=dob
     ).first()
     if existing:
         return jsonify({
@@ -440,17 +1139,15 @@ def signup():
         }), 400
     
     # Auto-generate athlete_id
-    count = Swimmer.query.count() + 1
-    athlete_id = f"ATH-2026-{count:04d}"
+    athlete_id = next_athlete_id()
     
     # Calculate age from date of birth
-    try:
-        dob = datetime.strptime(data['date_of_birth'], '%Y-%m-%d')
-        today = datetime.now()
-        age = today.year - dob.year - ((today.month, today.day) < (dob.month, dob.day))
-    except:
-        age = 0
+    today = date.today()
+    age = today.year - dob.year - ((today.month, today.day) < (dob.month, dob.day))
     
+    # Hash before opening the write transaction so row locks are held briefly
+    password_hash = passwords.hash(data['password'])
+
     # Create swimmer record
     full_name = f"{data['first_name']} {data['last_name']}"
     swimmer = Swimmer(
@@ -458,7 +1155,7 @@ def signup():
         first_name=data['first_name'],
         last_name=data['last_name'],
         name=full_name,
-        date_of_birth=data['date_of_birth'],
+        date_of_birth=dob,
         email=data['email'],
         father_name=data.get('father_name'),
         father_mobile=data.get('father_mobile'),
@@ -478,7 +1175,7 @@ def signup():
     # Create user account (username is email, password is default, email not verified yet)
     user = User(
         username=data['email'],
-        password_hash=generate_password_hash(data['password']),
+        password_hash=password_hash,
         role='swimmer',
         swimmer_id=swimmer.id,
         email_verified=False
@@ -486,54 +1183,16 @@ def signup():
     db.session.add(user)
     db.session.commit()
     
-    # Generate a 6-digit OTP for email verification
-    otp_code = ''.join(random.choices(string.digits, k=6))
-    
-    # Invalidate any previous unused OTPs for this email
-    OTP.query.filter_by(email=data['email'], purpose='verification', is_used=False).delete()
-    
-    # Save new OTP
-    otp = OTP(
-        email=data['email'],
-        code=otp_code,
-        purpose='verification',
-        created_at=datetime.utcnow(),
-        is_used=False
-    )
-    db.session.add(otp)
+    # Issue a new 6-digit OTP (replaces any unused one for this email)
+    otp_code = otp_store.issue(data['email'], 'verification')
     db.session.commit()
     
-    # Try to send email; fall back to console log if mail not configured
+    # Hand the email to the background mail queue
     try:
-        if app.config.get('MAIL_USERNAME'):
-            msg = Message(
-                subject='Aquatics — Email Verification',
-                recipients=[data['email']],
-                html=f"""
-                <div style="font-family:Arial,sans-serif;max-width:480px;margin:auto;padding:32px;
-                            background:#f0f4ff;border-radius:12px;">
-                  <h2 style="color:#001f4d;">🏊 Welcome to Aquatics!</h2>
-                  <p style="color:#444;">Thank you for registering. Please verify your email using the OTP below.
-                     It expires in <strong>10 minutes</strong>.</p>
-                  <div style="font-size:2.5rem;font-weight:900;letter-spacing:12px;
-                              text-align:center;padding:24px;background:#fff;
-                              border-radius:10px;color:#003580;margin:20px 0;">
-                    {otp_code}
-                  </div>
-                  <p style="color:#888;font-size:0.88rem;">
-                    Your Athlete ID: <strong>{athlete_id}</strong>
-                  </p>
-                </div>
-                """
-            )
-            mail.send(msg)
-            print(f'[INFO] Verification OTP sent to {data["email"]}')
-        else:
-            # Mail not configured — print to console for development
-            print(f'[DEV] Verification OTP for {data["email"]}: {otp_code}')
-    except Exception as e:
-        print(f'[ERROR] Failed to send email: {e}')
-        print(f'[DEV] Verification OTP for {data["email"]}: {otp_code}')
+        mail_queue.enqueue(render_mail('verification', data['email'], otp_code=otp_code, athlete_id=athlete_id))
+        print(f'[INFO] Verification OTP queued for {data["email"]}')
+    except queue.Full:
+        print(f'[ERROR] Mail queue full; verification OTP for {data["email"]} not sent')
     
     return jsonify({
         'id': user.id,
@@ -544,7 +1203,8 @@ def signup():
         'message': 'Account created! Please verify your email with the OTP sent to your email address.'
     }), 201
 
-@app.route('/verify-email', methods=['POST'])
+@api.route('/verify-email', methods=['POST'])
+@rate_limited('otp', email_field='email')
 def verify_email():
     data = request.json
     email = data.get('email', '').strip()
@@ -553,31 +1213,23 @@ def verify_email():
     if not email or not otp_code:
         return jsonify({'error': 'Email and OTP are required.'}), 400
 
-    # Find the OTP record
-    otp = OTP.query.filter_by(
-        email=email, code=otp_code, purpose='verification', is_used=False
-    ).order_by(OTP.created_at.desc()).first()
-
-    if not otp:
+    # Consume the OTP; expired codes are excluded by the lookup itself
+    if not otp_store.consume(email, otp_code, 'verification'):
         return jsonify({'error': 'Invalid or expired OTP.'}), 400
 
-    # Check expiry (10 minutes)
-    age = (datetime.utcnow() - otp.created_at).total_seconds()
-    if age > 600:
-        return jsonify({'error': 'OTP has expired. Please request a new one.'}), 400
-
     # Find the user and mark email as verified
     user = User.query.filter_by(username=email).first()
     if not user:
         return jsonify({'error': 'User not found.'}), 404
 
     user.email_verified = True
-    otp.is_used = True
     db.session.commit()
+    user_cache.invalidate(user.id)
 
     return jsonify({'message': 'Email verified successfully! You can now log in.'}), 200
 
-@app.route('/resend-verification', methods=['POST'])
+@api.route('/resend-verification', methods=['POST'])
+@rate_limited('resend_verification', email_field='email')
 def resend_verification():
     data = request.json
     email = data.get('email', '').strip()
@@ -595,62 +1247,25 @@ def resend_verification():
     if user.email_verified:
         return jsonify({'error': 'Email is already verified. Please login.'}), 400
 
-    # Generate a 6-digit OTP for email verification
-    otp_code = ''.join(random.choices(string.digits, k=6))
-
-    # Invalidate any previous unused OTPs for this email
-    OTP.query.filter_by(email=email, purpose='verification', is_used=False).delete()
-
-    # Save new OTP
-    otp = OTP(
-        email=email,
-        code=otp_code,
-        purpose='verification',
-        created_at=datetime.utcnow(),
-        is_used=False
-    )
-    db.session.add(otp)
+    # Issue a new 6-digit OTP (replaces any unused one for this email)
+    otp_code = otp_store.issue(email, 'verification')
     db.session.commit()
 
     # Get swimmer details for athlete ID
     swimmer = Swimmer.query.filter_by(email=email).first()
     athlete_id = swimmer.athlete_id if swimmer else 'N/A'
 
-    # Try to send email; fall back to console log if mail not configured
+    # Hand the email to the background mail queue
     try:
-        if app.config.get('MAIL_USERNAME'):
-            msg = Message(
-                subject='Aquatics — Email Verification',
-                recipients=[email],
-                html=f"""
-                <div style="font-family:Arial,sans-serif;max-width:480px;margin:auto;padding:32px;
-                            background:#f0f4ff;border-radius:12px;">
-                  <h2 style="color:#001f4d;">🏊 Welcome to Aquatics!</h2>
-                  <p style="color:#444;">Please verify your email using the OTP below.
-                     It expires in <strong>10 minutes</strong>.</p>
-                  <div style="font-size:2.5rem;font-weight:900;letter-spacing:12px;
-                              text-align:center;padding:24px;background:#fff;
-                              border-radius:10px;color:#003580;margin:20px 0;">
-                    {otp_code}
-                  </div>
-                  <p style="color:#888;font-size:0.88rem;">
-                    Your Athlete ID: <strong>{athlete_id}</strong>
-                  </p>
-                </div>
-                """
-            )
-            mail.send(msg)
-            print(f'[INFO] Verification OTP resent to {email}')
-        else:
-            # Mail not configured — print to console for development
-            print(f'[DEV] Verification OTP for {email}: {otp_code}')
-    except Exception as e:
-        print(f'[ERROR] Failed to send email: {e}')
-        print(f'[DEV] Verification OTP for {email}: {otp_code}')
+        mail_queue.enqueue(render_mail('verification_resend', email, otp_code=otp_code, athlete_id=athlete_id))
+        print(f'[INFO] Verification OTP queued for {email}')
+    except queue.Full:
+        print(f'[ERROR] Mail queue full; verification OTP for {email} not sent')
 
     return jsonify({'message': 'Verification OTP sent to your email address.'}), 200
 
-@app.route('/forgot-password', methods=['POST'])
+@api.route('/forgot-password', methods=['POST'])
+@rate_limited('forgot_password', email_field='email')
 def forgot_password():
     data = request.json
     email = data.get('email', '').strip().lower()
@@ -665,59 +1280,22 @@ def forgot_password():
         # Return success anyway to prevent email enumeration
         return jsonify({'message': 'If that email is registered, you will receive an OTP.'}), 200
 
-    # Generate a 6-digit OTP
-    otp_code = ''.join(random.choices(string.digits, k=6))
-
-    # Invalidate any previous unused OTPs for this email
-    OTP.query.filter_by(email=user.username, purpose='reset', is_used=False).delete()
-
-    # Save new OTP
-    otp = OTP(
-        email=user.username,
-        code=otp_code,
-        purpose='reset',
-        created_at=datetime.utcnow(),
-        is_used=False
-    )
-    db.session.add(otp)
+    # Issue a new 6-digit OTP (replaces any unused one for this email)
+    otp_code = otp_store.issue(user.username, 'reset')
     db.session.commit()
 
-    # Try to send email; fall back to console log if mail not configured
+    # Hand the email to the background mail queue
     try:
-        if app.config.get('MAIL_USERNAME'):
-            msg = Message(
-                subject='Aquatics — Password Reset OTP',
-                recipients=[user.username],
-                html=f"""
-                <div style="font-family:Arial,sans-serif;max-width:480px;margin:auto;padding:32px;
-                            background:#f0f4ff;border-radius:12px;">
-                  <h2 style="color:#001f4d;">🏊 Aquatics Password Reset</h2>
-                  <p style="color:#444;">Use the OTP below to reset your password.
-                     It expires in <strong>10 minutes</strong>.</p>
-                  <div style="font-size:2.5rem;font-weight:900;letter-spacing:12px;
-                              text-align:center;padding:24px;background:#fff;
-                              border-radius:10px;color:#003580;margin:20px 0;">
-                    {otp_code}
-                  </div>
-                  <p style="color:#888;font-size:0.88rem;">
-                    If you did not request this, ignore this email.
-                  </p>
-                </div>
-                """
-            )
-            mail.send(msg)
-            print(f'[INFO] Password reset OTP sent to {user.username}')
-        else:
-            # Mail not configured — print to console for development
-            print(f'[DEV] Password reset OTP for {user.username}: {otp_code}')
-    except Exception as e:
-        print(f'[ERROR] Failed to send email: {e}')
-        print(f'[DEV] Password reset OTP for {user.username}: {otp_code}')
+        mail_queue.enqueue(render_mail('reset', user.username, otp_code=otp_code))
+        print(f'[INFO] Password reset OTP queued for {user.username}')
+    except queue.Full:
+        print(f'[ERROR] Mail queue full; password reset OTP for {user.username} not sent')
 
     return jsonify({'message': 'If that email is registered, you will receive an OTP.'}), 200
 
 
-@app.route('/reset-password', methods=['POST'])
+@api.route('/reset-password', methods=['POST'])
+@rate_limited('otp', email_field='email')
 def reset_password():
     data = request.json
     email = data.get('email', '').strip()
@@ -730,43 +1308,42 @@ def reset_password():
     if len(new_password) < 6:
         return jsonify({'error': 'Password must be at least 6 characters.'}), 400
 
-    # Find the OTP record
-    otp = OTP.query.filter_by(
-        email=email, code=otp_code, purpose='reset', is_used=False
-    ).order_by(OTP.created_at.desc()).first()
-
-    if not otp:
+    # Consume the OTP; expired codes are excluded by the lookup itself
+    if not otp_store.consume(email, otp_code, 'reset'):
         return jsonify({'error': 'Invalid or expired OTP.'}), 400
 
-    # Check expiry (10 minutes)
-    age = (datetime.utcnow() - otp.created_at).total_seconds()
-    if age > 600:
-        return jsonify({'error': 'OTP has expired. Please request a new one.'}), 400
-
     # Find the user and update password
     user = User.query.filter_by(username=email).first()
     if not user:
         return jsonify({'error': 'User not found.'}), 404
 
-    user.password_hash = generate_password_hash(new_password)
-    otp.is_used = True
+    user.password_hash = passwords.hash(new_password)
     db.session.commit()
+    user_cache.invalidate(user.id)
 
     return jsonify({'message': 'Password reset successfully. You can now log in.'}), 200
 
 
-@app.route('/login', methods=['POST'])
+@api.route('/login', methods=['POST'])
+@rate_limited('login', email_field='username')
 def login():
     data = request.json
     user = User.query.filter_by(username=data['username']).first()
     
-    if user and check_password_hash(user.password_hash, data['password']):
+    if user and passwords.verify(user.password_hash, data['password']):
         # Check if email is verified (skip for admin)
         if user.role != 'admin' and not user.email_verified:
             return jsonify({'error': 'Please verify your email before logging in. Check your inbox for the verification OTP.'}), 403
+
+        # Upgrade hashes made with an older method or cost while we have the password
+        if passwords.needs_rehash(user.password_hash):
+            user.password_hash = passwords.hash(data['password'])
+            db.session.commit()
         
-        # Create JWT tokens
-        access_token = create_access_token(identity=user.id)
+        # Create JWT tokens carrying the claims role checks need
+        user_cache.invalidate(user.id)
+        record = load_user(user.id)
+        access_token = create_access_token(identity=user.id, additional_claims=user_claims(record))
         refresh_token = create_refresh_token(identity=user.id)
         
         return jsonify({
@@ -775,34 +1352,303 @@ def login():
             'id': user.id,
             'username': user.username,
             'role': user.role,
-            'swimmer_id': user.swimmer_id
+            'swimmer_id': user.swimmer_id,
+            'athlete_id': record['athlete_id']
         }), 200
     
     return jsonify({'error': 'Invalid username or password'}), 401
 
-@app.route('/refresh', methods=['POST'])
+@api.route('/refresh', methods=['POST'])
 @jwt_required(refresh=True)
 def refresh():
     current_user_id = get_jwt_identity()
-    new_access_token = create_access_token(identity=current_user_id)
+    user = load_user(current_user_id)
+    if not user:
+        return jsonify({'error': 'User not found'}), 401
+    new_access_token = create_access_token(identity=current_user_id, additional_claims=user_claims(user))
     return jsonify({'access_token': new_access_token}), 200
 
-@app.route('/me', methods=['GET'])
+@api.route('/me', methods=['GET'])
 @jwt_required()
 def get_current_user():
-    current_user_id = get_jwt_identity()
-    user = User.query.get(current_user_id)
+    user = load_user(get_jwt_identity())
     if user:
-        return jsonify({
-            'id': user.id,
-            'username': user.username,
-            'role': user.role,
-            'swimmer_id': user.swimmer_id
-        }), 200
+        return jsonify(user), 200
     return jsonify({'error': 'User not found'}), 404
 
 
-@app.route('/upload-results', methods=['POST'])
+def rerank_groups(groups):
+    """
+    Recompute classification-grouped ranks for the given (event_id, meet_id)
+    groups and write back only the rows whose rank changed. Returns the
+    changes as {(event_id, meet_id): [{'id': ..., 'rank': ...}, ...]}.
+    """
+    if not groups:
+        return {}
+    rows = db.session.query(
+        Result.id, Result.event_id, Result.meet_id, Result.timing, Result.rank,
+        db.func.coalesce(Swimmer.classification, 'Open')
+    ).join(Swimmer, Swimmer.id == Result.swimmer_id).filter(
+        db.tuple_(Result.event_id, Result.meet_id).in_(list(groups))
+    ).all()
+
+    boards = {}
+    for rid, event_id, meet_id, timing, rank, classification in rows:
+        boards.setdefault((event_id, meet_id, classification), []).append((timing, rid, rank))
+
+    changes = {}
+    for (event_id, meet_id, _), board in boards.items():
+        board.sort()
+        ranks = competition_ranks([timing for timing, _, _ in board])
+        for (timing, rid, stored), rank in zip(board, ranks):
+            if stored != rank:
+                changes.setdefault((event_id, meet_id), []).append({'id': rid, 'rank': rank})
+    if changes:
+        db.session.execute(db.update(Result), [c for group in changes.values() for c in group])
+    return changes
+
+def insert_bests(model, keys, rows):
+    """
+    Insert best-time rows that are unique on the ``keys`` columns. A row
+    another writer inserted first only has its best_time lowered. Returns the
+    keys of rows that lost to an equal or faster time stored meanwhile.
+    """
+    try:
+        with db.session.begin_nested():
+            db.session.execute(db.insert(model), rows)
+        return set()
+    except IntegrityError:
+        pass
+    beaten = set()
+    for row in rows:
+        key = tuple(row[name] for name in keys)
+        try:
+            with db.session.begin_nested():
+                db.session.execute(db.insert(model), [row])
+        except IntegrityError:
+            updated = db.session.execute(
+                db.update(model).where(
+                    *(getattr(model, name) == value for name, value in zip(keys, key)),
+                    model.best_time > row['best_time']
+                ).values({name: value for name, value in row.items() if name not in keys})
+            ).rowcount
+            if not updated:
+                beaten.add(key)
+    return beaten
+
+def merge_personal_bests(bests, meet_dates):
+    """
+    Fold the fastest new time per (swimmer_id, event_id) into PersonalBest.
+    ``bests`` maps (swimmer_id, event_id) -> (timing, meet_id). Returns the
+    keys whose stored best is now that time.
+    """
+    if not bests:
+        return set()
+    existing = {
+        (pb.swimmer_id, pb.event_id): pb
+        for pb in PersonalBest.query.filter(
+            db.tuple_(PersonalBest.swimmer_id, PersonalBest.event_id).in_(list(bests))
+        )
+    }
+    inserts, slower = [], set()
+    for (swimmer_id, event_id), (timing, meet_id) in bests.items():
+        meet_date = meet_dates[meet_id]
+        season_year = meet_date.year
+        pb = existing.get((swimmer_id, event_id))
+        if pb is None:
+            inserts.append({
+                'swimmer_id': swimmer_id,
+                'event_id': event_id,
+                'best_time': timing,
+                'meet_id': meet_id,
+                'date': meet_date,
+                'season_year': season_year
+            })
+        elif timing < pb.best_time:
+            pb.best_time = timing
+            pb.meet_id = meet_id
+            pb.date = meet_date
+            pb.season_year = season_year
+        elif timing > pb.best_time:
+            slower.add((swimmer_id, event_id))
+    if inserts:
+        slower |= insert_bests(PersonalBest, ('swimmer_id', 'event_id'), inserts)
+    return set(bests) - slower
+
+def merge_season_bests(bests, meet_dates):
+    """
+    Fold the fastest new time per (swimmer_id, event_id, season_year) into
+    SeasonBest. ``bests`` maps that key -> (timing, meet_id).
+    """
+    if not bests:
+        return
+    existing = {
+        (sb.swimmer_id, sb.event_id, sb.season_year): sb
+        for sb in SeasonBest.query.filter(
+            db.tuple_(SeasonBest.swimmer_id, SeasonBest.event_id, SeasonBest.season_year).in_(list(bests))
+        )
+    }
+    new_swimmers = {key[0] for key in bests if key not in existing}
+    swimmers = {
+        sid: (gender, dob.year)
+        for sid, gender, dob in db.session.query(
+            Swimmer.id, Swimmer.gender, Swimmer.date_of_birth
+        ).filter(Swimmer.id.in_(new_swimmers))
+    } if new_swimmers else {}
+    inserts = []
+    for (swimmer_id, event_id, season_year), (timing, meet_id) in bests.items():
+        sb = existing.get((swimmer_id, event_id, season_year))
+        if sb is None:
+            gender, birth_year = swimmers[swimmer_id]
+            inserts.append({
+                'swimmer_id': swimmer_id,
+                'event_id': event_id,
+                'season_year': season_year,
+                'best_time': timing,
+                'meet_id': meet_id,
+                'date': meet_dates[meet_id],
+                'gender': gender,
+                'birth_year': birth_year
+            })
+        elif timing < sb.best_time:
+            sb.best_time = timing
+            sb.meet_id = meet_id
+            sb.date = meet_dates[meet_id]
+    if inserts:
+        insert_bests(SeasonBest, ('swimmer_id', 'event_id', 'season_year'), inserts)
+
+REBUILD_CHUNK = 10000
+
+def _write_chunks(statement, rows):
+    for start in range(0, len(rows), REBUILD_CHUNK):
+        db.session.execute(statement, rows[start:start + REBUILD_CHUNK])
+
+def rebuild_derived(dry_run=False, show=0, log=print):
+    """
+    Recompute result ranks, personal bests and season bests from every
+    result (see derived.py) and write back only what differs. Returns the
+    change counts.
+    """
+    started = time.perf_counter()
+    group = db.func.coalesce(Swimmer.classification, 'Open')
+    rows = db.session.execute(
+        db.select(
+            Result.id, Result.meet_id, Result.event_id, group, Result.timing, Result.rank,
+            Result.swimmer_id, Meet.date
+        ).join(Swimmer, Swimmer.id == Result.swimmer_id
+        ).join(Meet, Meet.id == Result.meet_id
+        ).order_by(Result.meet_id, Result.event_id, group, Result.timing, Result.id
+        ).execution_options(stream_results=True, yield_per=REBUILD_CHUNK)
+    )
+    rebuild = DerivedRebuild()
+    for row in rows:
+        rebuild.add(*row)
+    rows.close()
+
+    personal = diff_bests(rebuild.personal_bests, {
+        (swimmer_id, event_id): (pb_id, best_time, meet_id, pb_date)
+        for pb_id, swimmer_id, event_id, best_time, meet_id, pb_date in db.session.query(
+            PersonalBest.id, PersonalBest.swimmer_id, PersonalBest.event_id,
+            PersonalBest.best_time, PersonalBest.meet_id, PersonalBest.date
+        )
+    })
+    season = diff_bests(rebuild.season_bests, {
+        (swimmer_id, event_id, season_year): (sb_id, best_time, meet_id, sb_date)
+        for sb_id, swimmer_id, event_id, season_year, best_time, meet_id, sb_date in db.session.query(
+            SeasonBest.id, SeasonBest.swimmer_id, SeasonBest.event_id, SeasonBest.season_year,
+            SeasonBest.best_time, SeasonBest.meet_id, SeasonBest.date
+        )
+    })
+    counts = {
+        'results': rebuild.rows,
+        'ranks': len(rebuild.rank_changes),
+        'personal_bests': {'insert': len(personal[0]), 'update': len(personal[1]), 'delete': len(personal[2])},
+        'season_bests': {'insert': len(season[0]), 'update': len(season[1]), 'delete': len(season[2])},
+    }
+    log(f"[INFO] Read {rebuild.rows} results in {time.perf_counter() - started:.1f}s: "
+        f"{counts['ranks']} rank changes, personal bests {counts['personal_bests']}, "
+        f"season bests {counts['season_bests']}")
+
+    for result_id, old, new in rebuild.rank_changes[:show]:
+        log(f'  result {result_id}: rank {old} -> {new}')
+    for name, (inserts, updates, delete_ids) in (('personal best', personal), ('season best', season)):
+        for key, best in inserts[:show]:
+            log(f'  {name} {key}: new {best[0]} at meet {best[3]}')
+        for row_id, key, best in updates[:show]:
+            log(f'  {name} {key}: now {best[0]} at meet {best[3]}')
+        for row_id in delete_ids[:show]:
+            log(f'  {name} row {row_id}: no results left, delete')
+    if dry_run:
+        return counts
+
+    _write_chunks(db.update(Result), [
+        {'id': result_id, 'rank': new} for result_id, _, new in rebuild.rank_changes
+    ])
+
+    pb_inserts, pb_updates, pb_deletes = personal
+    _write_chunks(db.update(PersonalBest), [{
+        'id': row_id, 'best_time': best[0], 'meet_id': best[3], 'date': best[1], 'season_year': best[1].year
+    } for row_id, key, best in pb_updates])
+    _write_chunks(db.insert(PersonalBest), [{
+        'swimmer_id': key[0], 'event_id': key[1], 'best_time': best[0], 'meet_id': best[3],
+        'date': best[1], 'season_year': best[1].year
+    } for key, best in pb_inserts])
+
+    sb_inserts, sb_updates, sb_deletes = season
+    _write_chunks(db.update(SeasonBest), [{
+        'id': row_id, 'best_time': best[0], 'meet_id': best[3], 'date': best[1]
+    } for row_id, key, best in sb_updates])
+    if sb_inserts:
+        swimmers = {
+            sid: (gender, dob.year)
+            for sid, gender, dob in db.session.query(Swimmer.id, Swimmer.gender, Swimmer.date_of_birth)
+        }
+        _write_chunks(db.insert(SeasonBest), [{
+            'swimmer_id': key[0], 'event_id': key[1], 'season_year': key[2], 'best_time': best[0],
+            'meet_id': best[3], 'date': best[1], 'gender': swimmers[key[0]][0], 'birth_year': swimmers[key[0]][1]
+        } for key, best in sb_inserts])
+
+    for model, ids in ((PersonalBest, pb_deletes), (SeasonBest, sb_deletes)):
+        for start in range(0, len(ids), REBUILD_CHUNK):
+            model.query.filter(model.id.in_(ids[start:start + REBUILD_CHUNK])).delete(synchronize_session=False)
+
+    bump_ranking_versions(db.session.scalars(db.select(Event.id)))
+    db.session.commit()
+    rankings_cache.invalidate()
+    log(f'[INFO] Derived data rebuilt in {time.perf_counter() - started:.1f}s')
+    return counts
+
+def publish_uploaded_results(last_id, groups, rank_changes):
+    """Push an upload's new rows (id > last_id) to live subscribers, one event per group"""
+    if not groups:
+        return
+    rows = db.session.query(
+        Result.id, Result.event_id, Result.meet_id, Result.swimmer_id,
+        Swimmer.name, Swimmer.athlete_id, Result.timing, Result.rank
+    ).join(Swimmer, Swimmer.id == Result.swimmer_id).filter(
+        Result.id > last_id,
+        db.tuple_(Result.event_id, Result.meet_id).in_(list(groups))
+    ).order_by(Result.id)
+    added = {}
+    for rid, event_id, meet_id, swimmer_id, name, athlete_id, timing, rank in rows:
+        added.setdefault((event_id, meet_id), []).append({
+            'id': rid,
+            'swimmer_id': swimmer_id,
+            'swimmer_name': name,
+            'athlete_id': athlete_id,
+            'timing': timing,
+            'rank': rank
+        })
+    for (event_id, meet_id), results in added.items():
+        live_broker.publish(f'meet:{meet_id}', 'results', {'event_id': event_id, 'results': results})
+    new_ids = {r['id'] for results in added.values() for r in results}
+    for (event_id, meet_id), changes in rank_changes.items():
+        # New rows already carry their rank; only existing rows need a 'ranks' event
+        changes = [c for c in changes if c['id'] not in new_ids]
+        if changes:
+            live_broker.publish(f'meet:{meet_id}', 'ranks', {'event_id': event_id, 'changes': changes})
+
+@api.route('/upload-results', methods=['POST'])
 def upload_results():
     if 'file' not in request.files:
         return jsonify({'error': 'No file provided'}), 400
@@ -811,59 +1657,429 @@ def upload_results():
     if file.filename == '':
         return jsonify({'error': 'No file selected'}), 400
     
-    # Read CSV file
-    stream = io.StringIO(file.stream.read().decode("UTF8"), newline=None)
+    started = time.perf_counter()
+    chunk_size = current_app.config['UPLOAD_CHUNK_SIZE']
+
+    # Resolve names from in-memory maps built once per upload
+    # (first row wins on duplicate names, as with filter_by(...).first())
+    swimmer_ids, event_ids, meet_ids, meet_dates = {}, {}, {}, {}
+    for sid, name in db.session.query(Swimmer.id, Swimmer.name).order_by(Swimmer.id):
+        swimmer_ids.setdefault(name, sid)
+    for eid, name in db.session.query(Event.id, Event.name).order_by(Event.id):
+        event_ids.setdefault(name, eid)
+    for mid, name, meet_date in db.session.query(Meet.id, Meet.name, Meet.date).order_by(Meet.id):
+        meet_ids.setdefault(name, mid)
+        meet_dates[mid] = meet_date
+
+    # Stream the CSV instead of buffering the whole file
+    stream = io.TextIOWrapper(file.stream, encoding='utf-8-sig', newline='')
     csv_reader = csv.DictReader(stream)
     
+    last_id = db.session.query(db.func.max(Result.id)).scalar() or 0
     results_added = 0
-    for row in csv_reader:
+    rejected = []
+    groups = set()
+    bests = {}
+    season_bests = {}
+    chunk = []
+    try:
         # Assuming CSV has columns: swimmer_name, event_name, meet_name, timing
-        swimmer = Swimmer.query.filter_by(name=row.get('swimmer_name')).first()
-        event = Event.query.filter_by(name=row.get('event_name')).first()
-        meet = Meet.query.filter_by(name=row.get('meet_name')).first()
-        
-        if swimmer and event and meet:
-            result = Result(
-                swimmer_id=swimmer.id,
-                event_id=event.id,
-                meet_id=meet.id,
-                timing=float(row.get('timing', 0))
-            )
-            db.session.add(result)
-            results_added += 1
-    
-    db.session.commit()
-    
-    # Recalculate all ranks
-    all_results = Result.query.all()
-    event_meet_groups = {}
-    for r in all_results:
-        key = f"{r.event_id}_{r.meet_id}"
-        if key not in event_meet_groups:
-            event_meet_groups[key] = []
-        event_meet_groups[key].append(r)
-    
-    for group in event_meet_groups.values():
-        sorted_results = sorted(group, key=lambda x: x.timing)
-        for idx, r in enumerate(sorted_results):
-            r.rank = idx + 1
-    
-    db.session.commit()
-    
-    return jsonify({'message': f'{results_added} results added successfully'}), 201
+        for line_no, row in enumerate(csv_reader, start=2):
+            swimmer_id = swimmer_ids.get(row.get('swimmer_name'))
+            event_id = event_ids.get(row.get('event_name'))
+            meet_id = meet_ids.get(row.get('meet_name'))
+            if not (swimmer_id and event_id and meet_id):
+                rejected.append({'line': line_no, 'error': 'Unknown swimmer, event or meet'})
+                continue
+            try:
+                timing = float(row.get('timing') or '')
+            except ValueError:
+                timing = None
+            if timing is None or not math.isfinite(timing) or timing <= 0:
+                rejected.append({'line': line_no, 'error': 'Invalid timing'})
+                continue
+
+            chunk.append({
+                'swimmer_id': swimmer_id,
+                'event_id': event_id,
+                'meet_id': meet_id,
+                'timing': timing
+            })
+            groups.add((event_id, meet_id))
+            best = bests.get((swimmer_id, event_id))
+            if best is None or timing < best[0]:
+                bests[(swimmer_id, event_id)] = (timing, meet_id)
+            season_key = (swimmer_id, event_id, meet_dates[meet_id].year)
+            season_best = season_bests.get(season_key)
+            if season_best is None or timing < season_best[0]:
+                season_bests[season_key] = (timing, meet_id)
+
+            if len(chunk) >= chunk_size:
+                db.session.execute(db.insert(Result), chunk)
+                results_added += len(chunk)
+                chunk = []
+        if chunk:
+            db.session.execute(db.insert(Result), chunk)
+            results_added += len(chunk)
+
+        # Re-rank only the (event, meet) groups this file touched
+        rank_changes = rerank_groups(groups)
+        merge_personal_bests(bests, meet_dates)
+        merge_season_bests(season_bests, meet_dates)
+        bump_ranking_versions(event_id for event_id, _ in groups)
+        db.session.commit()
+    except UnicodeDecodeError:
+        db.session.rollback()
+        return jsonify({'error': 'File must be UTF-8 encoded CSV'}), 400
+    finally:
+        stream.detach()
+
+    for event_id in {event_id for event_id, _ in groups}:
+        rankings_cache.invalidate(event_id)
+    publish_uploaded_results(last_id, groups, rank_changes)
+
+    elapsed = time.perf_counter() - started
+    return jsonify({
+        'message': f'{results_added} results added successfully',
+        'added': results_added,
+        'rejected_count': len(rejected),
+        'rejected': rejected[:100],
+        'rows_per_sec': round((results_added + len(rejected)) / elapsed, 1) if elapsed else None
+    }), 201
 
-if __name__ == '__main__':
+@api.route('/export/results', methods=['GET'])
+@jwt_required()
+def export_results():
+    fmt = request.args.get('format', 'ndjson')
+    if fmt not in EXPORT_FORMATS:
+        return jsonify({'error': f"format must be one of: {', '.join(EXPORT_FORMATS)}"}), 400
+    try:
+        start, end = date_range_from_args(request.args)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    query = db.session.query(
+        Result.id, Result.swimmer_id, Swimmer.athlete_id, Swimmer.name,
+        Result.event_id, Event.name, Result.meet_id, Meet.name, Meet.date,
+        Result.timing, Result.rank
+    ).join(Swimmer, Swimmer.id == Result.swimmer_id
+    ).join(Event, Event.id == Result.event_id
+    ).join(Meet, Meet.id == Result.meet_id)
+    if request.args.get('meet_id', type=int):
+        query = query.filter(Result.meet_id == request.args.get('meet_id', type=int))
+    if request.args.get('event_id', type=int):
+        query = query.filter(Result.event_id == request.args.get('event_id', type=int))
+    query = filter_date_range(query, Meet.date, start, end)
+
+    names = ['id', 'swimmer_id', 'athlete_id', 'swimmer_name', 'event_id', 'event_name',
+             'meet_id', 'meet_name', 'meet_date', 'timing', 'rank']
+    return stream_export(query.order_by(Result.id), names, fmt, 'results')
+
+@api.route('/export/personal-bests', methods=['GET'])
+@jwt_required()
+def export_personal_bests():
+    fmt = request.args.get('format', 'ndjson')
+    if fmt not in EXPORT_FORMATS:
+        return jsonify({'error': f"format must be one of: {', '.join(EXPORT_FORMATS)}"}), 400
+    try:
+        start, end = date_range_from_args(request.args)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    query = db.session.query(
+        PersonalBest.id, PersonalBest.swimmer_id, Swimmer.athlete_id, Swimmer.name,
+        PersonalBest.event_id, Event.name, PersonalBest.best_time, PersonalBest.meet_id,
+        PersonalBest.date, PersonalBest.season_year
+    ).join(Swimmer, Swimmer.id == PersonalBest.swimmer_id
+    ).join(Event, Event.id == PersonalBest.event_id)
+    if request.args.get('meet_id', type=int):
+        query = query.filter(PersonalBest.meet_id == request.args.get('meet_id', type=int))
+    if request.args.get('event_id', type=int):
+        query = query.filter(PersonalBest.event_id == request.args.get('event_id', type=int))
+    query = filter_date_range(query, PersonalBest.date, start, end)
+
+    names = ['id', 'swimmer_id', 'athlete_id', 'swimmer_name', 'event_id', 'event_name',
+             'best_time', 'meet_id', 'date', 'season_year']
+    return stream_export(query.order_by(PersonalBest.id), names, fmt, 'personal_bests')
+
+def ensure_indexes():
+    """Create indexes declared on models that an older database is missing"""
+    for table in db.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(db.engine, checkfirst=True)
+
+@api.cli.command('migrate-dates')
+@click.option('--dry-run', is_flag=True, help='Report what would change without writing.')
+def migrate_dates_command(dry_run):
+    """Convert string date columns to DATE and add their range indexes"""
+    migrate_date_columns(db.engine, dry_run=dry_run)
+    if not dry_run:
+        ensure_indexes()
+        print('[INFO] Date migration complete')
+
+@api.cli.command('rebuild-derived')
+@click.option('--dry-run', is_flag=True, help='Report what would change without writing.')
+@click.option('--show', default=10, help='Sample changes to print of each kind.')
+def rebuild_derived_command(dry_run, show):
+    """Recompute result ranks, personal bests and season bests from all results"""
+    SeasonBest.__table__.create(db.engine, checkfirst=True)
+    rebuild_derived(dry_run=dry_run, show=show)
+
+@api.cli.command('init-db')
+@click.option('--admin-password', default='admin123', help='Password for the admin user if it is created.')
+def init_db_command(admin_password):
+    """Create missing tables and indexes, and the admin user if there is none"""
+    db.create_all()
+    ensure_indexes()
+    if not User.query.filter_by(username='admin').first():
+        admin = User(
+            username='admin',
+            password_hash=passwords.hash(admin_password),
+            role='admin',
+            email_verified=True
+        )
+        db.session.add(admin)
+        db.session.commit()
+        print(f'[INFO] Default admin user created: username=admin, password={admin_password}')
+    print('[INFO] Database ready')
+
+def create_app(cfg=None):
+    """
+    Build the app from ``cfg`` (a config module or object, default config.py).
+    Engines connect lazily and background threads start on first use, so
+    under a pre-forking server build the app in each worker after the fork
+    (see wsgi.py) and call warm_up() before it takes traffic.
+    """
+    cfg = cfg or config
+    app = Flask(__name__)
+    CORS(app, expose_headers=['X-Next-Cursor', 'Link', 'ETag'])
+
+    # JWT Configuration
+    app.config['JWT_SECRET_KEY'] = getattr(cfg, 'JWT_SECRET_KEY', 'your-secret-key-change-this-in-production')  # Change this!
+    app.config['JWT_ACCESS_TOKEN_EXPIRES'] = timedelta(hours=1)
+    app.config['JWT_REFRESH_TOKEN_EXPIRES'] = timedelta(days=30)
+
+    # MySQL Configuration from config.py
+    app.config['SQLALCHEMY_DATABASE_URI'] = cfg.SQLALCHEMY_DATABASE_URI
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = cfg.SQLALCHEMY_TRACK_MODIFICATIONS
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = cfg.SQLALCHEMY_ENGINE_OPTIONS
+
+    # Read replicas for GET requests (see replicas.py); each becomes bind 'replicaN'
+    app.config['SQLALCHEMY_REPLICA_URIS'] = getattr(cfg, 'SQLALCHEMY_REPLICA_URIS', [])
+    app.config['SQLALCHEMY_BINDS'] = {
+        f'replica{i}': dict(getattr(cfg, 'SQLALCHEMY_REPLICA_ENGINE_OPTIONS', cfg.SQLALCHEMY_ENGINE_OPTIONS), url=uri)
+        for i, uri in enumerate(app.config['SQLALCHEMY_REPLICA_URIS'])
+    }
+    app.config['DB_REPLICA_STICKY_SECONDS'] = getattr(cfg, 'DB_REPLICA_STICKY_SECONDS', 5)
+
+    # Results CSV ingest
+    app.config['UPLOAD_CHUNK_SIZE'] = getattr(cfg, 'UPLOAD_CHUNK_SIZE', 1000)
+
+    # List endpoint pagination (keyset on id)
+    app.config['PAGE_SIZE_DEFAULT'] = getattr(cfg, 'PAGE_SIZE_DEFAULT', 500)
+    app.config['PAGE_SIZE_MAX'] = getattr(cfg, 'PAGE_SIZE_MAX', 1000)
+
+    # Password hashing pool (see passwords.py)
+    app.config['PASSWORD_HASH_METHOD'] = getattr(cfg, 'PASSWORD_HASH_METHOD', 'scrypt:32768:8:1')
+    app.config['PASSWORD_HASH_WORKERS'] = getattr(cfg, 'PASSWORD_HASH_WORKERS', 2)
+    app.config['PASSWORD_HASH_MAX_PENDING'] = getattr(cfg, 'PASSWORD_HASH_MAX_PENDING', 32)
+
+    # OTP storage: 'sql' (shared) or 'memory' (single process only)
+    app.config['OTP_BACKEND'] = getattr(cfg, 'OTP_BACKEND', 'sql')
+    app.config['OTP_TTL'] = getattr(cfg, 'OTP_TTL', 600)
+    app.config['OTP_PURGE_INTERVAL'] = getattr(cfg, 'OTP_PURGE_INTERVAL', 300)
+
+    # athlete_id numbers reserved per process at a time
+    app.config['ATHLETE_ID_BLOCK_SIZE'] = getattr(cfg, 'ATHLETE_ID_BLOCK_SIZE', 20)
+
+    # Age groups for /rankings?age_group= (label -> (min_age, max_age))
+    app.config['AGE_GROUPS'] = getattr(cfg, 'AGE_GROUPS', {})
+
+    # Most items accepted by one /entries/bulk request
+    app.config['BULK_ENTRY_MAX'] = getattr(cfg, 'BULK_ENTRY_MAX', 5000)
+
+    # Lanes per heat used by heat seeding unless the request sets 'lanes'
+    app.config['POOL_LANES'] = getattr(cfg, 'POOL_LANES', 8)
+
+    # Request/SQL instrumentation exposed at /metrics (off unless enabled)
+    app.config['METRICS_ENABLED'] = getattr(cfg, 'METRICS_ENABLED', False)
+    app.config['METRICS_SLOW_QUERIES'] = getattr(cfg, 'METRICS_SLOW_QUERIES', 10)
+    app.config['METRICS_QUERY_WARN'] = getattr(cfg, 'METRICS_QUERY_WARN', 50)
+    app.config['METRICS_TOKEN'] = getattr(cfg, 'METRICS_TOKEN', None)
+
+    # Live meet updates over SSE: 'memory' (one process) or 'redis' (shared)
+    app.config['LIVE_BACKEND'] = getattr(cfg, 'LIVE_BACKEND', 'memory')
+    app.config['LIVE_REDIS_URL'] = getattr(cfg, 'LIVE_REDIS_URL', 'redis://localhost:6379/0')
+    app.config['LIVE_QUEUE_SIZE'] = getattr(cfg, 'LIVE_QUEUE_SIZE', 256)
+    app.config['LIVE_HEARTBEAT'] = getattr(cfg, 'LIVE_HEARTBEAT', 15)
+    app.config['LIVE_TICKET_TTL'] = getattr(cfg, 'LIVE_TICKET_TTL', 60)
+
+    # Per-process cache of user records for /me, /refresh and role checks
+    app.config['USER_CACHE_TTL'] = getattr(cfg, 'USER_CACHE_TTL', 60)
+    app.config['USER_CACHE_SIZE'] = getattr(cfg, 'USER_CACHE_SIZE', 1024)
+
+    # Rankings response cache
+    app.config['RANKINGS_CACHE_SIZE'] = getattr(cfg, 'RANKINGS_CACHE_SIZE', 256)
+
+    # Email Configuration (update in config.py with your Gmail credentials)
+    app.config['MAIL_SERVER'] = getattr(cfg, 'MAIL_SERVER', 'smtp.gmail.com')
+    app.config['MAIL_PORT'] = getattr(cfg, 'MAIL_PORT', 587)
+    app.config['MAIL_USE_TLS'] = getattr(cfg, 'MAIL_USE_TLS', True)
+    app.config['MAIL_USERNAME'] = getattr(cfg, 'MAIL_USERNAME', None)
+    app.config['MAIL_PASSWORD'] = getattr(cfg, 'MAIL_PASSWORD', None)
+    app.config['MAIL_DEFAULT_SENDER'] = getattr(cfg, 'MAIL_USERNAME', None) or 'noreply@aquatics.com'
+
+    # Background mail queue ('smtp', 'console' or 'file'; default picks smtp when
+    # MAIL_USERNAME is set and console otherwise)
+    app.config['MAIL_BACKEND'] = getattr(cfg, 'MAIL_BACKEND', None) or (
+        'smtp' if app.config['MAIL_USERNAME'] else 'console'
+    )
+    app.config['MAIL_WORKERS'] = getattr(cfg, 'MAIL_WORKERS', 2)
+    app.config['MAIL_MAX_RETRIES'] = getattr(cfg, 'MAIL_MAX_RETRIES', 3)
+    app.config['MAIL_RETRY_BACKOFF'] = getattr(cfg, 'MAIL_RETRY_BACKOFF', 2.0)
+    app.config['MAIL_FILE_DIR'] = getattr(cfg, 'MAIL_FILE_DIR', os.path.join(app.instance_path, 'outbox'))
+
+    # Warm-up: connections opened per pool before a worker serves (None: pool_size)
+    app.config['WARM_UP_CONNECTIONS'] = getattr(cfg, 'WARM_UP_CONNECTIONS', None)
+
+    # Token buckets for login/signup/OTP endpoints: 'memory' (per process) or 'redis'
+    app.config['RATE_LIMIT_ENABLED'] = getattr(cfg, 'RATE_LIMIT_ENABLED', True)
+    app.config['RATE_LIMIT_BACKEND'] = getattr(cfg, 'RATE_LIMIT_BACKEND', 'memory')
+    app.config['RATE_LIMIT_REDIS_URL'] = getattr(cfg, 'RATE_LIMIT_REDIS_URL', 'redis://localhost:6379/0')
+    app.config['RATE_LIMITS'] = getattr(cfg, 'RATE_LIMITS', {})
+    app.config['TRUSTED_PROXIES'] = getattr(cfg, 'TRUSTED_PROXIES', 0)
+
+    if app.config['TRUSTED_PROXIES']:
+        app.wsgi_app = ProxyFix(app.wsgi_app, x_for=app.config['TRUSTED_PROXIES'], x_proto=app.config['TRUSTED_PROXIES'])
+
+    # Response encoding: JSON encoder ('auto', 'orjson' or 'stdlib') and compression
+    app.config['JSON_ENCODER'] = getattr(cfg, 'JSON_ENCODER', 'auto')
+    app.config['COMPRESS_ENABLED'] = getattr(cfg, 'COMPRESS_ENABLED', True)
+    app.config['COMPRESS_MIN_SIZE'] = getattr(cfg, 'COMPRESS_MIN_SIZE', 1024)
+    app.config['COMPRESS_MIMETYPES'] = getattr(cfg, 'COMPRESS_MIMETYPES', ['application/json'])
+    app.config['COMPRESS_GZIP_LEVEL'] = getattr(cfg, 'COMPRESS_GZIP_LEVEL', 6)
+    app.config['COMPRESS_BROTLI_QUALITY'] = getattr(cfg, 'COMPRESS_BROTLI_QUALITY', 4)
+
+    app.json = FastJSONProvider(app, backend=app.config['JSON_ENCODER'])
+
+    db.init_app(app)
+    mail.init_app(app)
+    jwt.init_app(app)
+
+    services = app.extensions['swimming'] = {}
+    services['rankings_cache'] = ResponseCache(maxsize=app.config['RANKINGS_CACHE_SIZE'])
+
+    router = services['db_router'] = ReplicaRouter(
+        keys=app.config['SQLALCHEMY_BINDS'],
+        sticky_seconds=app.config['DB_REPLICA_STICKY_SECONDS'],
+        key_func=replica_sticky_key
+    )
+    router.init_app(app, db)
+
+    services['mail_queue'] = MailQueue(
+        app, partial(make_mail_backend, app),
+        workers=app.config['MAIL_WORKERS'],
+        max_retries=app.config['MAIL_MAX_RETRIES'],
+        backoff=app.config['MAIL_RETRY_BACKOFF']
+    )
+
+    compressor = None
+    if app.config['COMPRESS_ENABLED']:
+        compressor = services['compressor'] = Compressor(
+            min_size=app.config['COMPRESS_MIN_SIZE'],
+            mimetypes=app.config['COMPRESS_MIMETYPES'],
+            gzip_level=app.config['COMPRESS_GZIP_LEVEL'],
+            brotli_quality=app.config['COMPRESS_BROTLI_QUALITY']
+        )
+        compressor.init_app(app)
+
+    if app.config['METRICS_ENABLED']:
+        request_metrics = RequestMetrics(
+            slow_queries=app.config['METRICS_SLOW_QUERIES'],
+            query_warn=app.config['METRICS_QUERY_WARN']
+        )
+        request_metrics.init_app(app, db.Engine)
+        request_metrics.add_collector(router.gauges)
+        request_metrics.add_collector(services['mail_queue'].gauges)
+        if compressor:
+            request_metrics.add_collector(compressor.gauges)
+
+        def render_metrics():
+            return app.response_class(request_metrics.render(), mimetype='text/plain; version=0.0.4')
+        admin_metrics = jwt_required()(role_required('admin')(render_metrics))
+
+        def get_metrics():
+            # Scrapers send METRICS_TOKEN as a bearer token; anyone else needs an admin login
+            token = app.config['METRICS_TOKEN']
+            supplied = request.headers.get('Authorization', '').encode()
+            if token and hmac.compare_digest(supplied, f'Bearer {token}'.encode()):
+                return render_metrics()
+            return admin_metrics()
+        app.add_url_rule('/metrics', 'get_metrics', get_metrics, methods=['GET'])
+
+    services['passwords'] = PasswordHasher(
+        method=app.config['PASSWORD_HASH_METHOD'],
+        workers=app.config['PASSWORD_HASH_WORKERS'],
+        max_pending=app.config['PASSWORD_HASH_MAX_PENDING']
+    )
+
+    if app.config['LIVE_BACKEND'] == 'redis':
+        services['live_broker'] = RedisBroker(app.config['LIVE_REDIS_URL'], queue_size=app.config['LIVE_QUEUE_SIZE'])
+    else:
+        services['live_broker'] = MemoryBroker(queue_size=app.config['LIVE_QUEUE_SIZE'])
+
+    if app.config['OTP_BACKEND'] == 'memory':
+        services['otp_store'] = MemoryOTPStore(ttl=app.config['OTP_TTL'])
+    else:
+        services['otp_store'] = SQLOTPStore(db, OTP, ttl=app.config['OTP_TTL'])
+    services['otp_purger'] = OTPPurger(app, services['otp_store'], interval=app.config['OTP_PURGE_INTERVAL'])
+
+    services['user_cache'] = TTLCache(ttl=app.config['USER_CACHE_TTL'], maxsize=app.config['USER_CACHE_SIZE'])
+    services['athlete_ids'] = SequenceAllocator(
+        sequence_engine, IdSequence.__table__,
+        block_size=app.config['ATHLETE_ID_BLOCK_SIZE'], seed=seed_athlete_sequence
+    )
+
+    if app.config['RATE_LIMIT_BACKEND'] == 'redis':
+        limiter_backend = RedisLimiter(app.config['RATE_LIMIT_REDIS_URL'])
+    else:
+        limiter_backend = MemoryLimiter()
+    services['rate_limiter'] = RateLimiter(limiter_backend, app.config['RATE_LIMITS'])
+
+    app.register_blueprint(api)
+    return app
+
+def warm_up(app, log=print):
+    """
+    Get a freshly forked worker ready before it accepts traffic: drop any
+    connections inherited from the parent, open pool connections, load the
+    reference tables (which also fills SQLAlchemy's statement cache), start
+    the password hashing processes and the OTP purger. Returns seconds taken.
+    """
+    started = time.perf_counter()
+    configure_mappers()
     with app.app_context():
-        db.create_all()
-        # Create default admin user if not exists
-        if not User.query.filter_by(username='admin').first():
-            admin = User(
-                username='admin',
-                password_hash=generate_password_hash('admin123'),
-                role='admin',
-                email_verified=True
-            )
-            db.session.add(admin)
-            db.session.commit()
-            print('Default admin user created: username=admin, password=admin123')
-    app.run(debug=True)
+        opened = 0
+        for engine in db.engines.values():
+            engine.dispose(close=False)  # Never reuse the parent process's sockets
+            count = app.config['WARM_UP_CONNECTIONS']
+            if count is None:
+                count = engine.pool.size() if hasattr(engine.pool, 'size') else 1
+            connections = [engine.connect() for _ in range(count)]
+            for connection in connections:
+                connection.exec_driver_sql('SELECT 1')
+                connection.close()
+            opened += len(connections)
+        Event.query.order_by(Event.id).all()
+        Meet.query.order_by(Meet.date.desc()).all()
+        db.session.remove()
+        passwords.warm_up()
+        otp_purger.start()
+    seconds = time.perf_counter() - started
+    log(f'[INFO] Worker {os.getpid()} warmed up in {seconds * 1000:.0f} ms ({opened} connections)')
+    return seconds
+
+if __name__ == '__main__':
+    # Development server only; run `flask --app app init-db` once first and
+    # use wsgi.py under gunicorn in production
+    create_app().run(debug=True)
@@ -0,0 +1,6 @@
+"""
+Benchmarks for the Swimming Management System backend.
+
+Run from the backend directory, e.g.  python -m benchmarks.rankings
+The full suite with synthetic data and baselines is  python -m benchmarks.suite
+"""
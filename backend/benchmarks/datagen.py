@@ -0,0 +1,248 @@
+"""
+Synthetic meet data for benchmarks.
+
+Usage (from backend/):
+    python -m benchmarks.datagen --scale 10k [--db sqlite:///...] [--seed 42]
+
+Scales are named by the number of results: 1k, 10k, 100k and 1m. Everything
+else is sized from that: one swimmer per ten results, a meet per 2,500
+results (at least four, spread over three seasons), the standard pool
+events, one upcoming meet with entries, plus an admin and up to 200
+verified swimmer logins (password ``bench-password``). Results are
+generated one (meet, event) heat at a time and ranked like the API does,
+and personal/season bests are derived from them, so every table is
+consistent. The same seed always gives the same data.
+"""
+import argparse
+from datetime import date, timedelta
+import os
+import random
+import sys
+import tempfile
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+import config
+
+SCALES = {'1k': 1_000, '10k': 10_000, '100k': 100_000, '1m': 1_000_000}
+SEASONS = (2024, 2025, 2026)
+CHUNK = 10_000
+BENCH_PASSWORD = 'bench-password'
+MAX_LOGINS = 200
+
+# (name, distance, stroke, base seconds for a strong senior swimmer)
+EVENTS = [
+    ('50m Freestyle', 50, 'Freestyle', 23.0),
+    ('100m Freestyle', 100, 'Freestyle', 50.0),
+    ('200m Freestyle', 200, 'Freestyle', 110.0),
+    ('400m Freestyle', 400, 'Freestyle', 235.0),
+    ('800m Freestyle', 800, 'Freestyle', 490.0),
+    ('1500m Freestyle', 1500, 'Freestyle', 935.0),
+    ('50m Backstroke', 50, 'Backstroke', 26.0),
+    ('100m Backstroke', 100, 'Backstroke', 55.0),
+    ('200m Backstroke', 200, 'Backstroke', 120.0),
+    ('50m Breaststroke', 50, 'Breaststroke', 28.0),
+    ('100m Breaststroke', 100, 'Breaststroke', 61.0),
+    ('200m Breaststroke', 200, 'Breaststroke', 133.0),
+    ('50m Butterfly', 50, 'Butterfly', 24.5),
+    ('100m Butterfly', 100, 'Butterfly', 53.0),
+    ('200m Butterfly', 200, 'Butterfly', 118.0),
+    ('200m Individual Medley', 200, 'Individual Medley', 122.0),
+    ('400m Individual Medley', 400, 'Individual Medley', 260.0),
+]
+CLASSIFICATIONS = [None] * 16 + ['S5', 'S9', 'S10', 'S14']
+CLUBS = ['Dolphins SC', 'Marlins', 'Aqua Stars', 'Riverside', 'Bluewave', 'Tritons']
+COUNTRIES = ['IND', 'IND', 'IND', 'SRI', 'NEP', 'BAN']
+
+
+def sizes(results):
+    return {
+        'results': results,
+        'swimmers': max(50, results // 10),
+        'meets': max(4, results // 2500),
+    }
+
+
+def generate(scale, seed=42, log=print):
+    """
+    Fill the app's database (dropping existing tables) with ``scale``
+    results' worth of data. Must run inside an app context. Returns a
+    summary dict with row counts and the ids benchmarks need.
+    """
+    from ranking import competition_ranks
+    from app import (
+        db, ensure_indexes, passwords,
+        Swimmer, Meet, Event, Result, PersonalBest, SeasonBest, Entry, User
+    )
+
+    rng = random.Random(seed)
+    plan = sizes(SCALES[scale] if isinstance(scale, str) else scale)
+    started = time.perf_counter()
+
+    db.drop_all()
+    db.create_all()
+    ensure_indexes()
+
+    def insert(model, rows):
+        for start in range(0, len(rows), CHUNK):
+            db.session.execute(db.insert(model), rows[start:start + CHUNK])
+
+    # Events
+    insert(Event, [
+        {'id': i, 'name': name, 'distance': distance, 'stroke': stroke}
+        for i, (name, distance, stroke, _) in enumerate(EVENTS, start=1)
+    ])
+    base_times = {i: base for i, (_, _, _, base) in enumerate(EVENTS, start=1)}
+
+    # Swimmers, each with an ability factor and 3-6 events they swim
+    swimmers = []
+    ability = {}
+    swims = {event_id: [] for event_id in base_times}
+    for i in range(1, plan['swimmers'] + 1):
+        birth_year = rng.randint(2001, 2018)
+        gender = 'Male' if i % 2 else 'Female'
+        swimmers.append({
+            'id': i,
+            'athlete_id': f'ATH-BENCH-{i:07d}',
+            'first_name': 'Swimmer',
+            'last_name': str(i),
+            'name': f'Swimmer {i}',
+            'date_of_birth': date(birth_year, rng.randint(1, 12), rng.randint(1, 28)),
+            'email': f'swimmer{i}@bench.local',
+            'age': SEASONS[-1] - birth_year,
+            'gender': gender,
+            'classification': rng.choice(CLASSIFICATIONS),
+            'country': rng.choice(COUNTRIES),
+            'club': rng.choice(CLUBS),
+        })
+        # Younger swimmers and women are slower on average; spread is wide
+        youth = max(0, 18 - (SEASONS[-1] - birth_year)) * 0.025
+        ability[i] = (1.0 + youth + (0.08 if gender == 'Female' else 0)) * rng.uniform(1.0, 1.35)
+        for event_id in rng.sample(sorted(base_times), rng.randint(3, 6)):
+            swims[event_id].append(i)
+    insert(Swimmer, swimmers)
+    classification = {s['id']: s['classification'] or 'Open' for s in swimmers}
+    gender_birth = {s['id']: (s['gender'], s['date_of_birth'].year) for s in swimmers}
+
+    # Past meets spread over the seasons, plus one upcoming meet for entries
+    meets = []
+    for i in range(1, plan['meets'] + 1):
+        season = SEASONS[(i - 1) * len(SEASONS) // plan['meets']]
+        meets.append({
+            'id': i,
+            'name': f'Bench Meet {i}',
+            'date': date(season, 1, 15) + timedelta(days=rng.randint(0, 330)),
+            'location': rng.choice(['Bengaluru', 'Chennai', 'Mumbai', 'Pune', 'Delhi']),
+        })
+    upcoming_id = plan['meets'] + 1
+    upcoming_date = date(SEASONS[-1] + 1, 3, 1)
+    meets.append({'id': upcoming_id, 'name': 'Bench Championship', 'date': upcoming_date, 'location': 'Bengaluru'})
+    insert(Meet, meets)
+    meet_dates = {m['id']: m['date'] for m in meets}
+
+    # Results one heat (meet, event) at a time, ranked within classification
+    per_heat = max(1, plan['results'] // (plan['meets'] * len(base_times)))
+    result_id = 0
+    chunk = []
+    personal, season = {}, {}
+    heats = [(meet_id, event_id) for meet_id in range(1, plan['meets'] + 1) for event_id in base_times]
+    remaining = plan['results']
+    for n, (meet_id, event_id) in enumerate(heats):
+        count = min(remaining, per_heat if n < len(heats) - 1 else remaining, len(swims[event_id]))
+        remaining -= count
+        heat = []
+        for swimmer_id in rng.sample(swims[event_id], count):
+            timing = round(base_times[event_id] * ability[swimmer_id] * rng.uniform(0.97, 1.05), 2)
+            result_id += 1
+            heat.append({'id': result_id, 'swimmer_id': swimmer_id, 'event_id': event_id,
+                         'meet_id': meet_id, 'timing': timing, 'rank': None})
+        boards = {}
+        for row in heat:
+            boards.setdefault(classification[row['swimmer_id']], []).append(row)
+        for board in boards.values():
+            board.sort(key=lambda r: (r['timing'], r['id']))
+            for row, rank in zip(board, competition_ranks([r['timing'] for r in board])):
+                row['rank'] = rank
+        for row in heat:
+            key = (row['swimmer_id'], event_id)
+            if key not in personal or row['timing'] < personal[key][0]:
+                personal[key] = (row['timing'], meet_id)
+            season_key = key + (meet_dates[meet_id].year,)
+            if season_key not in season or row['timing'] < season[season_key][0]:
+                season[season_key] = (row['timing'], meet_id)
+        chunk.extend(heat)
+        if len(chunk) >= CHUNK:
+            insert(Result, chunk)
+            chunk = []
+    insert(Result, chunk)
+
+    insert(PersonalBest, [{
+        'swimmer_id': swimmer_id, 'event_id': event_id, 'best_time': timing, 'meet_id': meet_id,
+        'date': meet_dates[meet_id], 'season_year': meet_dates[meet_id].year
+    } for (swimmer_id, event_id), (timing, meet_id) in personal.items()])
+    insert(SeasonBest, [{
+        'swimmer_id': swimmer_id, 'event_id': event_id, 'season_year': season_year, 'best_time': timing,
+        'meet_id': meet_id, 'date': meet_dates[meet_id],
+        'gender': gender_birth[swimmer_id][0], 'birth_year': gender_birth[swimmer_id][1]
+    } for (swimmer_id, event_id, season_year), (timing, meet_id) in season.items()])
+
+    # Entries for the upcoming meet, seeded from personal bests where known
+    entry_keys = rng.sample(sorted(personal), min(len(personal), max(100, plan['results'] // 5)))
+    insert(Entry, [{
+        'swimmer_id': swimmer_id, 'event_id': event_id, 'meet_id': upcoming_id,
+        'entry_time': personal[(swimmer_id, event_id)][0] if rng.random() < 0.8 else None,
+        'status': rng.choices(['approved', 'pending', 'rejected'], [7, 2, 1])[0],
+        'entry_date': upcoming_date - timedelta(days=rng.randint(14, 75)),
+    } for swimmer_id, event_id in entry_keys])
+
+    # Logins: hash once, share it
+    password_hash = passwords.hash(BENCH_PASSWORD)
+    logins = min(MAX_LOGINS, plan['swimmers'])
+    insert(User, [{'username': 'admin', 'password_hash': password_hash, 'role': 'admin', 'email_verified': True}] + [{
+        'username': f'swimmer{i}@bench.local', 'password_hash': password_hash, 'role': 'swimmer',
+        'swimmer_id': i, 'email_verified': True
+    } for i in range(1, logins + 1)])
+
+    db.session.commit()
+    summary = {
+        'scale': scale,
+        'seed': seed,
+        'swimmers': plan['swimmers'],
+        'meets': plan['meets'],
+        'events': len(base_times),
+        'results': result_id,
+        'personal_bests': len(personal),
+        'season_bests': len(season),
+        'entries': len(entry_keys),
+        'logins': logins,
+        'upcoming_meet_id': upcoming_id,
+        'seconds': round(time.perf_counter() - started, 1),
+    }
+    log(f'[INFO] Generated {scale}: ' + ', '.join(f'{k}={v}' for k, v in summary.items() if k != 'scale'))
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--scale', choices=sorted(SCALES, key=SCALES.get), default='10k')
+    parser.add_argument('--db', default=None, help='SQLAlchemy URI (default: a SQLite file in the temp dir)')
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    config.SQLALCHEMY_DATABASE_URI = args.db or 'sqlite:///' + os.path.join(
+        tempfile.gettempdir(), f'swimming_bench_{args.scale}.db'
+    )
+    if config.SQLALCHEMY_DATABASE_URI.startswith('sqlite'):
+        config.SQLALCHEMY_ENGINE_OPTIONS = {}
+    config.PASSWORD_HASH_WORKERS = 0
+
+    from app import create_app
+    with create_app().app_context():
+        generate(args.scale, seed=args.seed)
+    print(config.SQLALCHEMY_DATABASE_URI)
+
+
+if __name__ == '__main__':
+    main()
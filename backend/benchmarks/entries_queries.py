@@ -0,0 +1,89 @@
+"""
+Check that GET /entries runs a constant number of SQL statements.
+
+Usage (from backend/):
+    python -m benchmarks.entries_queries [--scale 1k]
+
+Generates --scale and then ten times --scale worth of data (see datagen.py;
+entries scale with it) into a fresh SQLite database, removes one swimmer
+that has entries, and counts the statements (after_cursor_execute) of
+GET /entries with and without a meet_id filter. Exits with status 1 if a
+count differs between the two sizes, i.e. if the endpoint queries per row
+again.
+"""
+import argparse
+import os
+import sys
+import tempfile
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+import config
+
+DB_FILE = os.path.join(tempfile.gettempdir(), 'swimming_bench_entries_queries.db')
+config.SQLALCHEMY_DATABASE_URI = f'sqlite:///{DB_FILE}'
+config.SQLALCHEMY_ENGINE_OPTIONS = {}
+config.PASSWORD_HASH_WORKERS = 0
+
+from flask_jwt_extended import create_access_token
+from sqlalchemy import event
+from app import create_app, db, Swimmer, Entry
+from benchmarks.datagen import SCALES, generate
+
+app = create_app()
+
+
+def seed(results):
+    """datagen data plus entries whose swimmer no longer exists; returns the upcoming meet id"""
+    summary = generate(results, log=lambda message: None)
+    swimmer_id = db.session.query(Entry.swimmer_id).order_by(Entry.id).limit(1).scalar()
+    db.session.execute(db.delete(Swimmer).where(Swimmer.id == swimmer_id))
+    db.session.commit()
+    return summary['upcoming_meet_id']
+
+
+def count_statements(client, url, headers):
+    statements = []
+    listener = lambda *args: statements.append(args[2])
+    event.listen(db.engine, 'after_cursor_execute', listener)
+    try:
+        response = client.get(url, headers=headers)
+    finally:
+        event.remove(db.engine, 'after_cursor_execute', listener)
+    assert response.status_code == 200, (url, response.status_code)
+    return len(statements), len(response.get_json())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--scale', choices=['1k', '10k', '100k'], default='1k')
+    args = parser.parse_args()
+
+    failed = False
+    with app.app_context():
+        headers = {'Authorization': f'Bearer {create_access_token(identity=1)}'}
+        client = app.test_client()
+        counts = {}
+        print(f'{"url":>20} {"results":>8} {"rows":>6} {"statements":>11}')
+        for results in (SCALES[args.scale], SCALES[args.scale] * 10):
+            meet_id = seed(results)
+            urls = {'/entries': '/entries', '/entries?meet_id=': f'/entries?meet_id={meet_id}'}
+            client.get('/entries', headers=headers)  # Per-process lookups happen once, not per size
+            for name, url in urls.items():
+                statements, rows = count_statements(client, url, headers)
+                counts.setdefault(name, []).append((rows, statements))
+                print(f'{name:>20} {results:>8} {rows:>6} {statements:>11}')
+        for name, ((small_rows, small), (large_rows, large)) in counts.items():
+            if small != large:
+                print(f'FAIL {name}: {small} statements for {small_rows} entries, {large} for {large_rows}')
+                failed = True
+        db.session.remove()
+    os.remove(DB_FILE)
+    if failed:
+        sys.exit(1)
+    print('OK: statement count does not grow with the number of entries')
+
+
+if __name__ == '__main__':
+    main()
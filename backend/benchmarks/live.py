@@ -0,0 +1,149 @@
+"""
+Live results fan-out: delivery latency to many SSE subscribers.
+
+Usage (from backend/):
+    python -m benchmarks.live [--subscribers 2000] [--results 20]
+
+Starts the app on a threaded local server against a temporary SQLite
+database, opens --subscribers connections to GET /meets/1/live (read from
+one selector loop), then posts results one at a time and records how long
+each subscriber takes to receive the 'results' event.
+"""
+import argparse
+from datetime import date
+import os
+import resource
+import selectors
+import socket
+import statistics
+import sys
+import tempfile
+import threading
+import time
+import urllib.request
+import json
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+import config
+
+DB_FILE = os.path.join(tempfile.gettempdir(), 'swimming_bench_live.db')
+config.SQLALCHEMY_DATABASE_URI = f'sqlite:///{DB_FILE}'
+config.SQLALCHEMY_ENGINE_OPTIONS = {'connect_args': {'timeout': 30}}
+config.LIVE_TICKET_TTL = 300  # Opening thousands of connections can take longer than the default
+
+from flask_jwt_extended import create_access_token
+from werkzeug.serving import make_server
+from app import create_app, db, Swimmer, Meet, Event
+
+app = create_app()
+live_broker = app.extensions['swimming']['live_broker']
+
+
+def seed():
+    db.drop_all()
+    db.create_all()
+    db.session.execute(db.insert(Meet), [{'id': 1, 'name': 'Bench Meet', 'date': date(2026, 3, 1)}])
+    db.session.execute(db.insert(Event), [{'id': 1, 'name': '50m Freestyle', 'distance': 50, 'stroke': 'Freestyle'}])
+    db.session.execute(db.insert(Swimmer), [{
+        'id': i,
+        'athlete_id': f'ATH-BENCH-{i:06d}',
+        'first_name': 'Swimmer',
+        'last_name': str(i),
+        'name': f'Swimmer {i}',
+        'date_of_birth': date(2010, 1, 1),
+        'email': f'swimmer{i}@bench.local',
+        'age': 16,
+        'gender': 'M',
+    } for i in range(1, 101)])
+    db.session.commit()
+
+
+def subscribe(port, ticket, count):
+    """Open ``count`` SSE connections; returns the connected sockets"""
+    request = (
+        f'GET /meets/1/live?ticket={ticket} HTTP/1.1\r\n'
+        f'Host: 127.0.0.1:{port}\r\nAccept: text/event-stream\r\n\r\n'
+    ).encode()
+    sockets = []
+    for _ in range(count):
+        sock = socket.create_connection(('127.0.0.1', port))
+        sock.sendall(request)
+        sockets.append(sock)
+    return sockets
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--subscribers', type=int, default=2000)
+    parser.add_argument('--results', type=int, default=20)
+    args = parser.parse_args()
+
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    needed = args.subscribers * 2 + 100  # Client and server end of every connection
+    if soft < needed:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (min(needed, hard), hard))
+
+    with app.app_context():
+        seed()
+        token = create_access_token(identity=1, additional_claims={'role': 'admin'})
+
+    server = make_server('127.0.0.1', 0, app, threaded=True)
+    server.daemon_threads = True
+    server.request_queue_size = 1024
+    port = server.server_port
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    ticket_request = urllib.request.Request(
+        f'http://127.0.0.1:{port}/meets/1/live/ticket', method='POST',
+        headers={'Authorization': f'Bearer {token}'}
+    )
+    ticket = json.loads(urllib.request.urlopen(ticket_request).read())['ticket']
+
+    started = time.perf_counter()
+    sockets = subscribe(port, ticket, args.subscribers)
+    while live_broker.stats()['subscribers'] < args.subscribers:
+        if time.perf_counter() - started > 120:
+            sys.exit(f'only {live_broker.stats()["subscribers"]} subscribers connected')
+        time.sleep(0.05)
+    print(f'{args.subscribers} subscribers connected in {time.perf_counter() - started:.1f}s')
+
+    selector = selectors.DefaultSelector()
+    for sock in sockets:
+        sock.setblocking(False)
+        selector.register(sock, selectors.EVENT_READ)
+
+    latencies = []
+    missed = 0
+    for n in range(args.results):
+        body = json.dumps({'swimmer_id': n % 100 + 1, 'event_id': 1, 'meet_id': 1, 'timing': 30 + n / 10}).encode()
+        post = urllib.request.Request(
+            f'http://127.0.0.1:{port}/results', data=body, method='POST',
+            headers={'Content-Type': 'application/json', 'Authorization': f'Bearer {token}'}
+        )
+        waiting = set(sockets)
+        sent = time.perf_counter()
+        urllib.request.urlopen(post).read()
+        deadline = sent + 5
+        while waiting and time.perf_counter() < deadline:
+            for key, _ in selector.select(timeout=0.1):
+                data = key.fileobj.recv(65536)
+                if b'event: results' in data and key.fileobj in waiting:
+                    waiting.discard(key.fileobj)
+                    latencies.append((time.perf_counter() - sent) * 1000)
+        missed += len(waiting)
+
+    latencies.sort()
+    p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+    print(f'{"deliveries":>11} {"missed":>7} {"p50 ms":>9} {"p95 ms":>9} {"max ms":>9}')
+    print(f'{len(latencies):>11} {missed:>7} {statistics.median(latencies):>9.1f} {p95:>9.1f} {latencies[-1]:>9.1f}')
+
+    for sock in sockets:
+        sock.close()
+    server.shutdown()
+    os.remove(DB_FILE)
+
+
+if __name__ == '__main__':
+    main()
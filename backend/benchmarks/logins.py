@@ -0,0 +1,87 @@
+"""
+Login throughput: logins/sec overall and per hashing core.
+
+Usage (from backend/):
+    python -m benchmarks.logins [--logins 200] [--threads 16] [--workers 1 2 4]
+
+Runs POST /login from a thread pool against a temporary SQLite database once
+per --workers value (PASSWORD_HASH_WORKERS; 0 hashes inline on the request
+thread for comparison). 429 responses are counted as rejected, not failed.
+"""
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+import os
+import sys
+import tempfile
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+import config
+
+DB_FILE = os.path.join(tempfile.gettempdir(), 'swimming_bench_logins.db')
+config.SQLALCHEMY_DATABASE_URI = f'sqlite:///{DB_FILE}'
+config.SQLALCHEMY_ENGINE_OPTIONS = {'pool_size': 32, 'max_overflow': 0}
+config.RATE_LIMIT_ENABLED = False  # Logins all come from one address
+
+
+def run(app, passwords, workers, logins, threads):
+    passwords.shutdown()
+    passwords.workers = workers
+    client = app.test_client()
+    users = 50
+
+    def login(idx):
+        return client.post('/login', json={
+            'username': f'user{idx % users}@bench.local',
+            'password': 'bench-password',
+        }).status_code
+
+    login(0)  # Start the pool before timing
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        codes = list(pool.map(login, range(logins)))
+    elapsed = time.perf_counter() - started
+    ok = codes.count(200)
+    rejected = codes.count(429)
+    rate = ok / elapsed
+    per_core = rate / workers if workers else rate
+    print(f'{workers:>8} {rate:>12.1f} {per_core:>14.1f} {rejected:>9} {len(codes) - ok - rejected:>7}')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--logins', type=int, default=200)
+    parser.add_argument('--threads', type=int, default=16)
+    parser.add_argument('--workers', type=int, nargs='+', default=[0, 1, 2, 4])
+    args = parser.parse_args()
+
+    from app import create_app, db, User
+
+    app = create_app()
+    passwords = app.extensions['swimming']['passwords']
+
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        password_hash = passwords.hash('bench-password')
+        db.session.execute(db.insert(User), [{
+            'username': f'user{i}@bench.local',
+            'password_hash': password_hash,
+            'role': 'swimmer',
+            'email_verified': True,
+        } for i in range(50)])
+        db.session.commit()
+
+    print(f'method: {passwords.method}  logins: {args.logins}  client threads: {args.threads}')
+    print(f'{"workers":>8} {"logins/s":>12} {"logins/s/core":>14} {"rejected":>9} {"failed":>7}')
+    for workers in args.workers:
+        run(app, passwords, workers, args.logins, args.threads)
+
+    passwords.shutdown()
+    os.remove(DB_FILE)
+
+
+if __name__ == '__main__':
+    main()
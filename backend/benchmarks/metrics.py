@@ -0,0 +1,114 @@
+"""
+Overhead of METRICS_ENABLED: request throughput with and without it.
+
+Usage (from backend/):
+    python -m benchmarks.metrics [--requests 2000] [--rounds 5]
+
+Each configuration runs in its own process (the setting is read at import)
+against a fresh SQLite database. The workload mixes GET /entries,
+GET /rankings/1 with the response cache cleared and POST /results.
+Rounds alternate between the two configurations; the best round of each is
+compared.
+"""
+import argparse
+from datetime import date
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+
+def run_workload(enabled, requests):
+    """Runs inside the child process; prints requests/sec"""
+    import config
+
+    db_file = os.path.join(tempfile.gettempdir(), f'swimming_bench_metrics_{os.getpid()}.db')
+    config.SQLALCHEMY_DATABASE_URI = f'sqlite:///{db_file}'
+    config.SQLALCHEMY_ENGINE_OPTIONS = {}
+    config.METRICS_ENABLED = enabled
+
+    from flask_jwt_extended import create_access_token
+    from app import create_app, db, Swimmer, Meet, Event, Entry, PersonalBest
+
+    app = create_app()
+    rankings_cache = app.extensions['swimming']['rankings_cache']
+
+    random.seed(42)
+    with app.app_context():
+        db.create_all()
+        db.session.execute(db.insert(Meet), [{'id': 1, 'name': 'Bench Meet', 'date': date(2026, 3, 1)}])
+        db.session.execute(db.insert(Event), [{'id': 1, 'name': '50m Freestyle', 'distance': 50, 'stroke': 'Freestyle'}])
+        db.session.execute(db.insert(Swimmer), [{
+            'id': i,
+            'athlete_id': f'ATH-BENCH-{i:06d}',
+            'first_name': 'Swimmer',
+            'last_name': str(i),
+            'name': f'Swimmer {i}',
+            'date_of_birth': date(2010, 1, 1),
+            'email': f'swimmer{i}@bench.local',
+            'age': 16,
+            'gender': 'M',
+        } for i in range(1, 201)])
+        db.session.execute(db.insert(PersonalBest), [{
+            'swimmer_id': i, 'event_id': 1, 'best_time': round(random.uniform(24, 45), 2),
+            'meet_id': 1, 'date': date(2026, 3, 1), 'season_year': 2026,
+        } for i in range(1, 201)])
+        db.session.execute(db.insert(Entry), [{
+            'swimmer_id': i, 'event_id': 1, 'meet_id': 1, 'status': 'approved', 'entry_date': date(2026, 2, 1),
+        } for i in range(1, 201)])
+        db.session.commit()
+        headers = {'Authorization': f'Bearer {create_access_token(identity=1)}'}
+
+    client = app.test_client()
+    started = time.perf_counter()
+    for n in range(requests):
+        kind = n % 3
+        if kind == 0:
+            response = client.get('/entries?meet_id=1', headers=headers)
+        elif kind == 1:
+            rankings_cache.invalidate()
+            response = client.get('/rankings/1', headers=headers)
+        else:
+            response = client.post('/results', headers=headers, json={
+                'swimmer_id': n % 200 + 1, 'event_id': 1, 'meet_id': 1, 'timing': random.uniform(24, 45)
+            })
+        assert response.status_code < 300, response.status_code
+    rate = requests / (time.perf_counter() - started)
+    os.remove(db_file)
+    print(rate)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--rounds', type=int, default=5)
+    parser.add_argument('--child', choices=['on', 'off'], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_workload(args.child == 'on', args.requests)
+        return
+
+    best = {'off': 0.0, 'on': 0.0}
+    for _ in range(args.rounds):
+        for mode in ('off', 'on'):
+            output = subprocess.run(
+                [sys.executable, '-m', 'benchmarks.metrics', '--child', mode, '--requests', str(args.requests)],
+                cwd=BACKEND_DIR, capture_output=True, text=True, check=True
+            ).stdout
+            best[mode] = max(best[mode], float(output.strip().splitlines()[-1]))
+
+    overhead = (best['off'] - best['on']) / best['off'] * 100
+    print(f'{"metrics":>8} {"req/s":>10}')
+    print(f'{"off":>8} {best["off"]:>10.1f}')
+    print(f'{"on":>8} {best["on"]:>10.1f}')
+    print(f'overhead: {overhead:.2f}%')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,143 @@
+"""
+JSON encode time and bytes on the wire for the large list endpoints.
+
+Usage (from backend/):
+    python -m benchmarks.payloads [--scale 10k] [--repeat 20]
+
+Generates synthetic data (see datagen.py), then for GET /results (one page
+of 1000), GET /entries (the upcoming meet) and GET /rankings/<event> (the
+event with most results, response cache cleared before every request):
+
+- encode: serializing rows that are already loaded. 'before' is the old
+  path (a dict per row, then jsonify with the standard library); the other
+  two are FastJSONProvider.response_rows (rankings: dumps_bytes of the
+  built table) with the standard library and with orjson
+- request: the whole request through the test client with each encoder,
+  compression off
+- wire: body size uncompressed, gzip and (if installed) brotli with the
+  default settings, and the time to compress it
+
+Medians in ms.
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+import config
+
+DB_FILE = os.path.join(tempfile.gettempdir(), 'swimming_bench_payloads.db')
+config.SQLALCHEMY_DATABASE_URI = f'sqlite:///{DB_FILE}'
+config.SQLALCHEMY_ENGINE_OPTIONS = {}
+config.PASSWORD_HASH_WORKERS = 0
+config.COMPRESS_ENABLED = False
+
+from flask import jsonify
+from flask_jwt_extended import create_access_token
+from app import (
+    create_app, db, build_rankings, ENTRY_FIELDS, RESULT_FIELDS,
+    Entry, Event, Meet, Result, Swimmer
+)
+from encoding import Compressor
+
+
+def median_ms(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples)
+
+
+def load_rows(name, meet_id, event_id):
+    """The rows an endpoint serializes: (field names, column tuples), or (None, rankings table)"""
+    if name == 'results':
+        rows = db.session.query(*RESULT_FIELDS.values()).order_by(Result.id).limit(1000).all()
+        return list(RESULT_FIELDS), rows
+    if name == 'entries':
+        rows = db.session.query(*ENTRY_FIELDS.values()
+        ).outerjoin(Swimmer, Swimmer.id == Entry.swimmer_id
+        ).outerjoin(Event, Event.id == Entry.event_id
+        ).outerjoin(Meet, Meet.id == Entry.meet_id
+        ).filter(Entry.meet_id == meet_id).order_by(Entry.id).all()
+        return list(ENTRY_FIELDS), rows
+    return None, build_rankings(event_id)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--scale', default='10k')
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    from benchmarks.datagen import generate
+    apps = {}
+    for encoder in ('stdlib', 'orjson'):
+        config.JSON_ENCODER = encoder
+        apps[encoder] = create_app()
+    with apps['stdlib'].app_context():
+        data = generate(args.scale, log=lambda message: None)
+        event_id = db.session.query(Result.event_id).group_by(Result.event_id).order_by(
+            db.func.count().desc()).limit(1).scalar()
+        headers = {'Authorization': f'Bearer {create_access_token(identity=1)}'}
+
+    urls = {
+        'results': '/results?limit=1000',
+        'entries': f'/entries?meet_id={data["upcoming_meet_id"]}',
+        'rankings': f'/rankings/{event_id}',
+    }
+    compressor = Compressor()
+
+    print(f'{args.scale} scale, medians over {args.repeat} runs')
+    print(f'{"":>9} {"":>6} | {"encode ms":^26} | {"request ms":^17} | {"bytes on the wire":^44}')
+    print(f'{"endpoint":>9} {"rows":>6} | {"before":>8} {"stdlib":>8} {"orjson":>8} | {"stdlib":>8} {"orjson":>8} | '
+          f'{"identity":>9} {"gzip":>8} {"gzip ms":>8} {"br":>8} {"br ms":>7}')
+    for name, url in urls.items():
+        encode = {}
+        for encoder, app in apps.items():
+            with app.test_request_context(url):
+                names, rows = load_rows(name, data['upcoming_meet_id'], event_id)
+                if names is None:
+                    count = sum(len(group) for group in rows.values())
+                    encode[encoder] = median_ms(lambda: app.json.dumps_bytes(rows), args.repeat)
+                    if encoder == 'stdlib':
+                        encode['before'] = median_ms(lambda: app.json.dumps(rows).encode(), args.repeat)
+                else:
+                    count = len(rows)
+                    encode[encoder] = median_ms(lambda: app.json.response_rows(names, rows), args.repeat)
+                    if encoder == 'stdlib':
+                        encode['before'] = median_ms(lambda: jsonify([dict(zip(names, row)) for row in rows]),
+                                                     args.repeat)
+
+        request_ms = {}
+        for encoder, app in apps.items():
+            client = app.test_client()
+            rankings_cache = app.extensions['swimming']['rankings_cache']
+
+            def get():
+                rankings_cache.invalidate()
+                response = client.get(url, headers=headers)
+                assert response.status_code == 200, (url, response.status_code)
+                return response.get_data()
+            body = get()
+            request_ms[encoder] = median_ms(get, args.repeat)
+
+        wire = {'identity': (len(body), 0.0)}
+        for encoding in compressor.encodings:
+            compressed = compressor.compress(body, encoding)
+            wire[encoding] = (len(compressed), median_ms(lambda: compressor.compress(body, encoding), args.repeat))
+        br_bytes, br_ms = (f'{wire["br"][0]:>8}', f'{wire["br"][1]:>7.2f}') if 'br' in wire else (f'{"-":>8}', f'{"-":>7}')
+        print(f'{name:>9} {count:>6} | {encode["before"]:>8.2f} {encode["stdlib"]:>8.2f} {encode["orjson"]:>8.2f} | '
+              f'{request_ms["stdlib"]:>8.2f} {request_ms["orjson"]:>8.2f} | '
+              f'{wire["identity"][0]:>9} {wire["gzip"][0]:>8} {wire["gzip"][1]:>8.2f} {br_bytes} {br_ms}')
+    os.remove(DB_FILE)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,119 @@
+"""
+Latency of GET /rankings/<event_id> at 1k, 10k and 100k swimmers.
+
+Usage (from backend/):
+    python -m benchmarks.rankings [--sizes 1000 10000 100000] [--repeat 20]
+
+Each size runs against a fresh SQLite database so MySQL is not required.
+The response cache is cleared before every timed request, so the numbers are
+the cost of building the ranking: all-time (PersonalBest) and a season
+age-group table (SeasonBest).
+"""
+import argparse
+from datetime import date
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+import config
+
+DB_FILE = os.path.join(tempfile.gettempdir(), 'swimming_bench_rankings.db')
+config.SQLALCHEMY_DATABASE_URI = f'sqlite:///{DB_FILE}'
+config.SQLALCHEMY_ENGINE_OPTIONS = {}
+
+from flask_jwt_extended import create_access_token
+from app import create_app, db, ensure_indexes, Swimmer, Meet, Event, PersonalBest, SeasonBest
+
+app = create_app()
+rankings_cache = app.extensions['swimming']['rankings_cache']
+
+CLASSIFICATIONS = [None, 'S1', 'S5', 'S9', 'S14']
+QUERIES = {
+    'all-time': '/rankings/1',
+    'season 15-17 M': '/rankings/1?season=2026&age_group=15-17&gender=M',
+}
+
+
+def seed(size):
+    db.drop_all()
+    db.create_all()
+    ensure_indexes()
+    db.session.execute(db.insert(Meet), [{'id': 1, 'name': 'Bench Meet', 'date': date(2026, 3, 1)}])
+    db.session.execute(db.insert(Event), [{'id': 1, 'name': '50m Freestyle', 'distance': 50, 'stroke': 'Freestyle'}])
+    swimmers = [{
+        'id': i,
+        'athlete_id': f'ATH-BENCH-{i:06d}',
+        'first_name': 'Swimmer',
+        'last_name': str(i),
+        'name': f'Swimmer {i}',
+        'date_of_birth': date(random.randint(2006, 2016), 1, 1),
+        'email': f'swimmer{i}@bench.local',
+        'age': 16,
+        'gender': 'M' if i % 2 else 'F',
+        'classification': random.choice(CLASSIFICATIONS),
+    } for i in range(1, size + 1)]
+    db.session.execute(db.insert(Swimmer), swimmers)
+    # Roughly a third of swimmers have swum the event
+    db.session.execute(db.insert(PersonalBest), [{
+        'swimmer_id': i,
+        'event_id': 1,
+        'best_time': round(random.uniform(24, 45), 2),
+        'meet_id': 1,
+        'date': date(2026, 3, 1),
+        'season_year': 2026,
+    } for i in range(1, size + 1) if i % 3 == 0])
+    db.session.execute(db.insert(SeasonBest), [{
+        'swimmer_id': i,
+        'event_id': 1,
+        'season_year': 2026,
+        'best_time': round(random.uniform(24, 45), 2),
+        'meet_id': 1,
+        'date': date(2026, 3, 1),
+        'gender': swimmers[i - 1]['gender'],
+        'birth_year': swimmers[i - 1]['date_of_birth'].year,
+    } for i in range(1, size + 1) if i % 3 == 0])
+    db.session.commit()
+
+
+def measure(client, headers, url, repeat):
+    client.get(url, headers=headers)  # Warm up
+    samples = []
+    for _ in range(repeat):
+        rankings_cache.invalidate()
+        started = time.perf_counter()
+        response = client.get(url, headers=headers)
+        samples.append((time.perf_counter() - started) * 1000)
+        assert response.status_code == 200
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 100000])
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    random.seed(42)
+    with app.app_context():
+        headers = {'Authorization': f'Bearer {create_access_token(identity=1)}'}
+        client = app.test_client()
+        print(f'{"swimmers":>10} {"query":>16} {"p50 ms":>10} {"p95 ms":>10} {"max ms":>10}')
+        for size in args.sizes:
+            seed(size)
+            for label, url in QUERIES.items():
+                samples = sorted(measure(client, headers, url, args.repeat))
+                p95 = samples[min(len(samples) - 1, int(len(samples) * 0.95))]
+                print(f'{size:>10} {label:>16} {statistics.median(samples):>10.2f} '
+                      f'{p95:>10.2f} {samples[-1]:>10.2f}')
+        db.session.remove()
+    os.remove(DB_FILE)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,250 @@
+"""
+Rate limiting: per-check overhead, and login latency for real users while
+the unauthenticated endpoints are being abused.
+
+Usage (from backend/):
+    python -m benchmarks.rate_limits [--seconds 8] [--rate 50] [--attackers 16] [--users 2]
+
+Overhead: time per RateLimiter.check() against the memory backend, and the
+difference per request to POST /forgot-password (unknown address) with
+limiting on (limits too high to trigger) and off. Best of three rounds.
+
+Abuse: the app runs in its own process behind werkzeug's threaded server.
+--users threads log in as different bench swimmers from different
+addresses, twice a second each, for --seconds. Meanwhile a separate
+process sends --rate requests per second over --attackers connections:
+POST /login with wrong
+passwords from one address (rotating usernames) and POST /forgot-password
+for one real account from rotating addresses. Three runs: no attack, the
+attack with limiting off, and the attack with the default RATE_LIMITS.
+Reported: the real users' login latency and failures, attacker logins sent
+and how many reached a password check, reset requests sent and mails
+written.
+"""
+import argparse
+import http.client
+import json
+import os
+import signal
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+import config
+
+DB_FILE = os.path.join(tempfile.gettempdir(), 'swimming_bench_rate_limits.db')
+config.SQLALCHEMY_DATABASE_URI = f'sqlite:///{DB_FILE}'
+config.SQLALCHEMY_ENGINE_OPTIONS = {'pool_size': 40, 'max_overflow': 0, 'connect_args': {'timeout': 30}}
+config.MAIL_BACKEND = 'file'
+config.MAIL_FILE_DIR = os.path.join(tempfile.gettempdir(), 'swimming_bench_outbox')
+DEFAULT_LIMITS = config.RATE_LIMITS
+
+from app import create_app, warm_up
+from ratelimit import MemoryLimiter, RateLimiter
+
+
+def percentile(ordered, pct):
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))] if ordered else 0.0
+
+
+def check_overhead(checks=200_000):
+    limiter = RateLimiter(MemoryLimiter(), {'login': {'ip': (10**9, 1), 'email': (10**9, 1)}})
+    addresses = [f'10.{i // 256}.{i % 256}.1' for i in range(10_000)]
+    best = float('inf')
+    for _ in range(3):
+        started = time.perf_counter()
+        for n in range(checks):
+            limiter.check('login', addresses[n % 10_000], 'swimmer1@bench.local')
+        best = min(best, (time.perf_counter() - started) / checks)
+    return best * 1e6
+
+
+def request_overhead(requests=3000):
+    def per_request(enabled):
+        config.RATE_LIMIT_ENABLED = enabled
+        config.RATE_LIMITS = {'forgot_password': {'ip': (10**9, 1), 'email': (10**9, 1)}}
+        app = create_app()
+        client = app.test_client()
+        best = float('inf')
+        for _ in range(3):
+            started = time.perf_counter()
+            for n in range(requests):
+                client.post('/forgot-password', json={'email': f'nobody{n}@bench.local'},
+                            environ_base={'REMOTE_ADDR': f'10.9.{n // 256 % 256}.{n % 256}'})
+            best = min(best, (time.perf_counter() - started) / requests)
+        return best * 1e6
+
+    off = per_request(False)
+    on = per_request(True)
+    config.RATE_LIMITS = DEFAULT_LIMITS
+    return off, on
+
+
+def serve(limited, port):
+    """Runs inside the server process until terminated"""
+    from werkzeug.serving import make_server
+
+    config.RATE_LIMIT_ENABLED = limited
+    config.TRUSTED_PROXIES = 1  # Clients pick their address with X-Forwarded-For
+    app = create_app()
+    warm_up(app, log=lambda message: None)
+    server = make_server('127.0.0.1', port, app, threaded=True)
+    signal.signal(signal.SIGTERM, lambda *args: threading.Thread(target=server.shutdown).start())
+    server.serve_forever()
+    app.extensions['swimming']['passwords'].shutdown()  # Don't leave hashing processes behind
+
+
+def post(connection, path, body, address):
+    connection.request('POST', path, json.dumps(body), {
+        'Content-Type': 'application/json', 'X-Forwarded-For': address
+    })
+    response = connection.getresponse()
+    response.read()
+    return response.status
+
+
+def attack(port, attackers, rate, seconds, logins):
+    """Runs inside the attacker process; prints what got through as JSON"""
+    stop = threading.Event()
+    counts = {'login': 0, 'hashed': 0, 'forgot': 0}
+    lock = threading.Lock()
+
+    def attacker(idx):
+        connection = http.client.HTTPConnection('127.0.0.1', port, timeout=60)
+        interval = attackers / rate
+        next_at = time.perf_counter() + idx * interval / attackers
+        n = 0
+        while not stop.is_set():
+            stop.wait(max(0.0, next_at - time.perf_counter()))
+            next_at += interval
+            if n % 2:
+                status = post(connection, '/login', {
+                    'username': f'swimmer{(idx + n) % logins + 1}@bench.local', 'password': 'guess'
+                }, '203.0.113.9')
+                with lock:
+                    counts['login'] += 1
+                    counts['hashed'] += status == 401
+            else:
+                post(connection, '/forgot-password', {'email': 'swimmer1@bench.local'}, f'198.51.{idx}.{n % 250}')
+                with lock:
+                    counts['forgot'] += 1
+            n += 1
+
+    threads = [threading.Thread(target=attacker, args=(idx,), daemon=True) for idx in range(attackers)]
+    for thread in threads:
+        thread.start()
+    time.sleep(seconds)
+    stop.set()
+    print(json.dumps(counts))
+
+
+def abuse(limited, with_attack, seconds, attackers, rate, users, logins, port):
+    server = subprocess.Popen(
+        [sys.executable, '-m', 'benchmarks.rate_limits', '--serve', 'on' if limited else 'off', '--port', str(port)],
+        cwd=BACKEND_DIR, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    for _ in range(100):
+        try:
+            http.client.HTTPConnection('127.0.0.1', port, timeout=1).request('GET', '/')
+            break
+        except OSError:
+            time.sleep(0.1)
+
+    attacker = None
+    if with_attack:
+        attacker = subprocess.Popen(
+            [sys.executable, '-m', 'benchmarks.rate_limits', '--attack', str(attackers), '--rate', str(rate),
+             '--port', str(port), '--seconds', str(seconds), '--logins', str(logins)],
+            cwd=BACKEND_DIR, stdout=subprocess.PIPE, text=True
+        )
+        time.sleep(1)  # Let the flood build up
+
+    stop = threading.Event()
+    latencies, failures = [], []
+    lock = threading.Lock()
+
+    def real_user(idx):
+        connection = http.client.HTTPConnection('127.0.0.1', port, timeout=60)
+        n = 0
+        while not stop.is_set():
+            swimmer = (idx * 997 + n) % logins + 1
+            started = time.perf_counter()
+            status = post(connection, '/login', {
+                'username': f'swimmer{swimmer}@bench.local', 'password': 'bench-password'
+            }, f'10.1.{idx}.{n % 250}')
+            elapsed = (time.perf_counter() - started) * 1000
+            with lock:
+                latencies.append(elapsed)
+                if status != 200:
+                    failures.append(status)
+            n += 1
+            stop.wait(0.5)
+
+    threads = [threading.Thread(target=real_user, args=(idx,)) for idx in range(users)]
+    for thread in threads:
+        thread.start()
+    time.sleep(seconds - 1 if with_attack else seconds)
+    stop.set()
+    for thread in threads:
+        thread.join()
+
+    counts = {'login': 0, 'hashed': 0, 'forgot': 0}
+    if attacker:
+        counts = json.loads(attacker.communicate()[0].strip().splitlines()[-1])
+    server.terminate()
+    server.wait()
+    latencies.sort()
+    return dict(counts, logins=len(latencies), failed=len(failures), p50=percentile(latencies, 50),
+                p95=percentile(latencies, 95), max=latencies[-1] if latencies else 0.0)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--seconds', type=float, default=8)
+    parser.add_argument('--attackers', type=int, default=16, help='Attacker threads (connections)')
+    parser.add_argument('--rate', type=float, default=50, help='Attack requests per second, all threads together')
+    parser.add_argument('--users', type=int, default=2)
+    parser.add_argument('--port', type=int, default=5099)
+    parser.add_argument('--serve', choices=['on', 'off'], help=argparse.SUPPRESS)
+    parser.add_argument('--attack', type=int, help=argparse.SUPPRESS)
+    parser.add_argument('--logins', type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        serve(args.serve == 'on', args.port)
+        return
+    if args.attack:
+        attack(args.port, args.attack, args.rate, args.seconds, args.logins)
+        return
+
+    from benchmarks.datagen import generate
+    app = create_app()
+    with app.app_context():
+        data = generate('1k', log=lambda message: None)
+    app.extensions['swimming']['passwords'].shutdown()
+
+    print(f'RateLimiter.check (memory, ip + email): {check_overhead():.2f} us')
+    off, on = request_overhead()
+    print(f'POST /forgot-password per request: {off:.1f} us off, {on:.1f} us on ({on - off:+.1f} us)')
+
+    print(f'\n{args.users} real users, attack at {args.rate:g} req/s on {args.attackers} connections, '
+          f'{args.seconds:g}s per run')
+    print(f'{"run":>18} {"logins":>7} {"failed":>7} {"p50 ms":>8} {"p95 ms":>8} {"max ms":>8} '
+          f'{"bad logins":>11} {"hashed":>7} {"resets":>7} {"mails":>6}')
+    runs = [('no attack', True, False), ('attack, no limits', False, True), ('attack, limited', True, True)]
+    for name, limited, with_attack in runs:
+        mails_before = len(os.listdir(config.MAIL_FILE_DIR)) if os.path.isdir(config.MAIL_FILE_DIR) else 0
+        r = abuse(limited, with_attack, args.seconds, args.attackers, args.rate, args.users, data['logins'], args.port)
+        mails = (len(os.listdir(config.MAIL_FILE_DIR)) if os.path.isdir(config.MAIL_FILE_DIR) else 0) - mails_before
+        print(f'{name:>18} {r["logins"]:>7} {r["failed"]:>7} {r["p50"]:>8.1f} {r["p95"]:>8.1f} {r["max"]:>8.1f} '
+              f'{r["login"]:>11} {r["hashed"]:>7} {r["forgot"]:>7} {mails:>6}')
+    os.remove(DB_FILE)
+
+
+if __name__ == '__main__':
+    main()
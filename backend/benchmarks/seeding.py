@@ -0,0 +1,99 @@
+"""
+Heat seeding time for one event with 1k and 10k approved entries.
+
+Usage (from backend/):
+    python -m benchmarks.seeding [--sizes 1000 10000] [--repeat 5]
+
+Times POST /meets/1/events/1/seed (prelim and final) against a fresh SQLite
+database. A third of the entries have no entry time and fall back to the
+swimmer's personal best; a few have neither and are seeded as no time.
+"""
+import argparse
+from datetime import date
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+import config
+
+DB_FILE = os.path.join(tempfile.gettempdir(), 'swimming_bench_seeding.db')
+config.SQLALCHEMY_DATABASE_URI = f'sqlite:///{DB_FILE}'
+config.SQLALCHEMY_ENGINE_OPTIONS = {}
+
+from flask_jwt_extended import create_access_token
+from app import create_app, db, ensure_indexes, Swimmer, Meet, Event, Entry, PersonalBest
+
+app = create_app()
+
+
+def seed(size):
+    db.drop_all()
+    db.create_all()
+    ensure_indexes()
+    db.session.execute(db.insert(Meet), [{'id': 1, 'name': 'Bench Meet', 'date': date(2026, 3, 1)}])
+    db.session.execute(db.insert(Event), [{'id': 1, 'name': '50m Freestyle', 'distance': 50, 'stroke': 'Freestyle'}])
+    db.session.execute(db.insert(Swimmer), [{
+        'id': i,
+        'athlete_id': f'ATH-BENCH-{i:06d}',
+        'first_name': 'Swimmer',
+        'last_name': str(i),
+        'name': f'Swimmer {i}',
+        'date_of_birth': date(2010, 1, 1),
+        'email': f'swimmer{i}@bench.local',
+        'age': 16,
+        'gender': 'M',
+    } for i in range(1, size + 1)])
+    db.session.execute(db.insert(PersonalBest), [{
+        'swimmer_id': i,
+        'event_id': 1,
+        'best_time': round(random.uniform(24, 45), 2),
+        'meet_id': 1,
+        'date': date(2026, 3, 1),
+        'season_year': 2026,
+    } for i in range(1, size + 1) if i % 10])
+    db.session.execute(db.insert(Entry), [{
+        'swimmer_id': i,
+        'event_id': 1,
+        'meet_id': 1,
+        'entry_time': round(random.uniform(24, 45), 2) if i % 3 else None,
+        'status': 'approved',
+        'entry_date': date(2026, 2, 1),
+    } for i in range(1, size + 1)])
+    db.session.commit()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000])
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    random.seed(42)
+    with app.app_context():
+        token = create_access_token(identity=1, additional_claims={'role': 'admin'})
+        headers = {'Authorization': f'Bearer {token}'}
+        client = app.test_client()
+        print(f'{"entries":>10} {"round":>8} {"p50 ms":>10} {"max ms":>10} {"heats":>7}')
+        for size in args.sizes:
+            seed(size)
+            for seed_round in ('prelim', 'final'):
+                samples = []
+                for _ in range(args.repeat):
+                    started = time.perf_counter()
+                    response = client.post('/meets/1/events/1/seed', json={'round': seed_round}, headers=headers)
+                    samples.append((time.perf_counter() - started) * 1000)
+                    assert response.status_code == 200
+                print(f'{size:>10} {seed_round:>8} {statistics.median(samples):>10.2f} '
+                      f'{max(samples):>10.2f} {response.json["heats"]:>7}')
+        db.session.remove()
+    os.remove(DB_FILE)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,81 @@
+"""
+Concurrent signups: checks athlete_id allocation stays collision-free.
+
+Usage (from backend/):
+    python -m benchmarks.signups [--signups 500] [--threads 50] [--db sqlite:///...]
+
+Fires the signups at POST /signup from a thread pool and then verifies that
+every request succeeded and every athlete_id is unique. Use --db with a
+MySQL URI to exercise real row locking; the default is a temporary SQLite file.
+"""
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+import os
+import sys
+import tempfile
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+import config
+
+DB_FILE = os.path.join(tempfile.gettempdir(), 'swimming_bench_signups.db')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--signups', type=int, default=500)
+    parser.add_argument('--threads', type=int, default=50)
+    parser.add_argument('--db', default=f'sqlite:///{DB_FILE}')
+    args = parser.parse_args()
+
+    config.SQLALCHEMY_DATABASE_URI = args.db
+    # One pooled connection per client thread so the pool is not the bottleneck
+    config.SQLALCHEMY_ENGINE_OPTIONS = {'pool_size': args.threads, 'max_overflow': 0}
+    if args.db.startswith('sqlite'):
+        config.SQLALCHEMY_ENGINE_OPTIONS['connect_args'] = {'timeout': 30}
+    config.MAIL_BACKEND = 'file'
+    config.RATE_LIMIT_ENABLED = False  # Signups all come from one address
+    config.MAIL_FILE_DIR = os.path.join(tempfile.gettempdir(), 'swimming_bench_outbox')
+
+    from app import create_app, db, Swimmer
+
+    app = create_app()
+
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+
+    client = app.test_client()
+
+    def signup(idx):
+        return client.post('/signup', json={
+            'email': f'swimmer{idx}@bench.local',
+            'first_name': 'Swimmer',
+            'last_name': str(idx),
+            'date_of_birth': '2012-05-01',
+            'password': 'bench-password',
+        })
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.threads) as pool:
+        responses = list(pool.map(signup, range(args.signups)))
+    elapsed = time.perf_counter() - started
+
+    failures = [r.status_code for r in responses if r.status_code != 201]
+    with app.app_context():
+        ids = [a for (a,) in db.session.query(Swimmer.athlete_id)]
+        if args.db.startswith('sqlite'):
+            db.drop_all()
+    duplicates = len(ids) - len(set(ids))
+
+    print(f'{args.signups} signups on {args.threads} threads in {elapsed:.2f}s '
+          f'({args.signups / elapsed:.0f}/s)')
+    print(f'failed requests: {len(failures)}  athlete_ids: {len(ids)}  duplicates: {duplicates}')
+    if failures or duplicates:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
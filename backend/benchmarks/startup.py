@@ -0,0 +1,116 @@
+"""
+Worker cold start and time to first request, with and without warm_up().
+
+Usage (from backend/):
+    python -m benchmarks.startup [--workers 5] [--scale 1k] [--db URI]
+
+Generates synthetic data (see datagen.py) once, then starts --workers fresh
+interpreters per mode, as a pre-forking server would start its workers.
+Each one times importing app.py, create_app(), warm_up() (warm mode only)
+and then the first and second call of a few routes through the test
+client. Time to first request is everything from the import to the end of
+the first request. Medians over the workers are printed.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+ROUTES = ['events', 'rankings', 'login']
+
+
+def run_worker(warm):
+    """Runs inside the child process; prints one JSON line of timings in ms"""
+    started = time.perf_counter()
+    import app as app_module
+    imported = time.perf_counter()
+    app = app_module.create_app()
+    created = time.perf_counter()
+    if warm:
+        app_module.warm_up(app, log=lambda message: None)
+    ready = time.perf_counter()
+
+    with app.app_context():
+        from flask_jwt_extended import create_access_token
+        headers = {'Authorization': f'Bearer {create_access_token(identity=1)}'}
+    client = app.test_client()
+    calls = {
+        'events': lambda: client.get('/events', headers=headers),
+        'rankings': lambda: client.get('/rankings/1', headers=headers),
+        'login': lambda: client.post('/login', json={'username': 'swimmer1@bench.local',
+                                                     'password': 'bench-password'}),
+    }
+    timings = {
+        'import': (imported - started) * 1000,
+        'create_app': (created - imported) * 1000,
+        'warm_up': (ready - created) * 1000,
+    }
+    for name in ROUTES:
+        for attempt in ('first', 'second'):
+            call_started = time.perf_counter()
+            response = calls[name]()
+            assert response.status_code == 200, (name, response.status_code)
+            timings[f'{name}_{attempt}'] = (time.perf_counter() - call_started) * 1000
+        if name == ROUTES[0]:
+            timings['first_request'] = (time.perf_counter() - started) * 1000 - timings[f'{name}_second']
+    app.extensions['swimming']['passwords'].shutdown()
+    print(json.dumps(timings))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--workers', type=int, default=5)
+    parser.add_argument('--scale', default='1k')
+    parser.add_argument('--db', default=None, help='SQLAlchemy URI (default: a temporary SQLite file)')
+    parser.add_argument('--child', choices=['cold', 'warm'], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    import config
+    db_file = None
+    if args.db:
+        config.SQLALCHEMY_DATABASE_URI = args.db
+    else:
+        db_file = os.path.join(tempfile.gettempdir(), 'swimming_bench_startup.db')
+        config.SQLALCHEMY_DATABASE_URI = f'sqlite:///{db_file}'
+    if config.SQLALCHEMY_DATABASE_URI.startswith('sqlite'):
+        config.SQLALCHEMY_ENGINE_OPTIONS = {}
+
+    if args.child:
+        run_worker(args.child == 'warm')
+        return
+
+    from benchmarks.datagen import generate
+    from app import create_app
+    app = create_app()
+    with app.app_context():
+        generate(args.scale, log=lambda message: None)
+    app.extensions['swimming']['passwords'].shutdown()
+
+    columns = ['import', 'create_app', 'warm_up', 'first_request'] + [
+        f'{name}_{attempt}' for name in ROUTES for attempt in ('first', 'second')
+    ]
+    print(f'{args.workers} workers per mode, medians in ms')
+    print(f'{"mode":>6} ' + ' '.join(f'{c:>15}' for c in columns))
+    for mode in ('cold', 'warm'):
+        samples = []
+        for _ in range(args.workers):
+            output = subprocess.run(
+                [sys.executable, '-m', 'benchmarks.startup', '--child', mode] + (['--db', args.db] if args.db else []),
+                cwd=BACKEND_DIR, capture_output=True, text=True, check=True
+            ).stdout
+            samples.append(json.loads(output.strip().splitlines()[-1]))
+        print(f'{mode:>6} ' + ' '.join(f'{statistics.median(s[c] for s in samples):>15.1f}' for c in columns))
+
+    if db_file:
+        os.remove(db_file)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,275 @@
+"""
+Benchmark suite: latency and queries per request for the main routes.
+
+Usage (from backend/):
+    python -m benchmarks.suite [--scale 10k] [--db URI] [--concurrency 1]
+                               [--requests 100] [--only rankings entries ...]
+                               [--save-baseline] [--threshold 20]
+
+Generates synthetic data (see datagen.py) into a temporary SQLite file or
+the database given by --db, then drives the real routes through the Flask
+test client: serially, or from --concurrency threads. Each scenario reports
+req/s, p50/p95/p99 latency and mean SQL statements per request.
+
+Results are compared with benchmarks/baselines/<dialect>-<scale>-c<N>.json
+when it exists; a p95 more than --threshold percent slower, or more
+statements per request, is flagged as a regression (exit status 1).
+--save-baseline writes this run as the new baseline.
+"""
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+import io
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import threading
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+import config
+
+BASELINE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baselines')
+
+# name -> share of --requests (writes and logins are much slower per call)
+SCENARIOS = {
+    'rankings': 1.0,
+    'rankings_season': 1.0,
+    'entries': 0.5,
+    'results_page': 1.0,
+    'add_result': 1.0,
+    'upload_results': 0.1,
+    'login': 0.2,
+}
+
+
+class StatementCounter:
+    """Counts SQL statements run on the current thread"""
+
+    def __init__(self):
+        self._local = threading.local()
+
+    def install(self, engine_class):
+        from sqlalchemy import event
+        event.listen(engine_class, 'after_cursor_execute', self._count)
+
+    def _count(self, *args):
+        self._local.count = getattr(self._local, 'count', 0) + 1
+
+    def reset(self):
+        self._local.count = 0
+
+    def value(self):
+        return getattr(self._local, 'count', 0)
+
+
+def percentile(ordered, pct):
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def make_scenarios(app, data):
+    from flask_jwt_extended import create_access_token
+    rankings_cache = app.extensions['swimming']['rankings_cache']
+    from benchmarks.datagen import EVENTS
+
+    with app.app_context():
+        token = create_access_token(identity=1, additional_claims={'role': 'admin'})
+    headers = {'Authorization': f'Bearer {token}'}
+    events = list(range(1, data['events'] + 1))
+    meets = list(range(1, data['meets'] + 1))
+    swimmers = data['swimmers']
+
+    def rankings(client, rng):
+        rankings_cache.invalidate()  # Measure building the ranking, not the cache
+        return client.get(f'/rankings/{rng.choice(events)}', headers=headers)
+
+    def rankings_season(client, rng):
+        rankings_cache.invalidate()
+        age_group = rng.choice(['11-12', '13-14', '15-17', '18&O'])
+        return client.get(f'/rankings/{rng.choice(events)}', headers=headers,
+                          query_string={'season': 2026, 'age_group': age_group})
+
+    def entries(client, rng):
+        return client.get(f'/entries?meet_id={data["upcoming_meet_id"]}', headers=headers)
+
+    def results_page(client, rng):
+        return client.get(f'/results?meet_id={rng.choice(meets)}&event_id={rng.choice(events)}', headers=headers)
+
+    def add_result(client, rng):
+        return client.post('/results', headers=headers, json={
+            'swimmer_id': rng.randint(1, swimmers),
+            'event_id': rng.choice(events),
+            'meet_id': rng.choice(meets),
+            'timing': round(rng.uniform(25, 300), 2),
+        })
+
+    def upload_results(client, rng):
+        lines = ['swimmer_name,event_name,meet_name,timing']
+        event_names = [name for name, *_ in EVENTS]
+        for _ in range(200):
+            lines.append(f'Swimmer {rng.randint(1, swimmers)},{rng.choice(event_names)},'
+                         f'Bench Meet {rng.choice(meets)},{rng.uniform(25, 300):.2f}')
+        body = '\n'.join(lines).encode()
+        return client.post('/upload-results', headers=headers,
+                           data={'file': (io.BytesIO(body), 'results.csv')})
+
+    def login(client, rng):
+        return client.post('/login', json={
+            'username': f'swimmer{rng.randint(1, data["logins"])}@bench.local',
+            'password': 'bench-password',
+        })
+
+    return {
+        'rankings': rankings,
+        'rankings_season': rankings_season,
+        'entries': entries,
+        'results_page': results_page,
+        'add_result': add_result,
+        'upload_results': upload_results,
+        'login': login,
+    }
+
+
+def run_scenario(app, counter, fn, requests, concurrency, seed):
+    client = app.test_client()
+
+    def one(n):
+        rng = random.Random(seed * 100_003 + n)
+        counter.reset()
+        started = time.perf_counter()
+        response = fn(client, rng)
+        elapsed = (time.perf_counter() - started) * 1000
+        return elapsed, counter.value(), response.status_code < 400
+
+    started = time.perf_counter()
+    if concurrency > 1:
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            samples = list(pool.map(one, range(requests)))
+    else:
+        samples = [one(n) for n in range(requests)]
+    wall = time.perf_counter() - started
+
+    latencies = sorted(s[0] for s in samples)
+    return {
+        'requests': requests,
+        'errors': sum(1 for s in samples if not s[2]),
+        'req_per_sec': round(requests / wall, 1),
+        'p50_ms': round(percentile(latencies, 50), 2),
+        'p95_ms': round(percentile(latencies, 95), 2),
+        'p99_ms': round(percentile(latencies, 99), 2),
+        'queries_per_request': round(sum(s[1] for s in samples) / requests, 1),
+    }
+
+
+def compare(report, baseline, threshold):
+    """Print deltas against the baseline; returns the regressed scenario names"""
+    regressions = []
+    for name, current in report['scenarios'].items():
+        before = baseline.get('scenarios', {}).get(name)
+        if not before:
+            continue
+        p95_delta = (current['p95_ms'] - before['p95_ms']) / before['p95_ms'] * 100 if before['p95_ms'] else 0
+        query_delta = current['queries_per_request'] - before['queries_per_request']
+        slower = p95_delta > threshold
+        more_queries = query_delta > 0.5
+        flag = '  REGRESSION' if slower or more_queries else ''
+        print(f'{name:>16} p95 {before["p95_ms"]:>9.2f} -> {current["p95_ms"]:>9.2f} ms ({p95_delta:+6.1f}%)  '
+              f'queries {before["queries_per_request"]:>5} -> {current["queries_per_request"]:>5}{flag}')
+        if flag:
+            regressions.append(name)
+    return regressions
+
+
+def main():
+    from benchmarks.datagen import SCALES
+
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--scale', choices=sorted(SCALES, key=SCALES.get), default='10k')
+    parser.add_argument('--db', default=None, help='SQLAlchemy URI (default: a temporary SQLite file)')
+    parser.add_argument('--concurrency', type=int, default=1)
+    parser.add_argument('--requests', type=int, default=100)
+    parser.add_argument('--only', nargs='+', choices=list(SCENARIOS), default=list(SCENARIOS))
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--baseline', default=None, help='Baseline JSON path (default: benchmarks/baselines/...)')
+    parser.add_argument('--save-baseline', action='store_true')
+    parser.add_argument('--threshold', type=float, default=20.0, help='Allowed p95 slowdown in percent')
+    args = parser.parse_args()
+
+    db_file = None
+    if args.db:
+        config.SQLALCHEMY_DATABASE_URI = args.db
+    else:
+        db_file = os.path.join(tempfile.gettempdir(), f'swimming_bench_suite_{args.scale}.db')
+        config.SQLALCHEMY_DATABASE_URI = f'sqlite:///{db_file}'
+    if config.SQLALCHEMY_DATABASE_URI.startswith('sqlite'):
+        config.SQLALCHEMY_ENGINE_OPTIONS = {'connect_args': {'timeout': 30}}
+    else:
+        config.SQLALCHEMY_ENGINE_OPTIONS = dict(config.SQLALCHEMY_ENGINE_OPTIONS,
+                                                pool_size=max(10, args.concurrency), max_overflow=0)
+    config.MAIL_BACKEND = 'file'
+    config.RATE_LIMIT_ENABLED = False  # Logins all come from one address
+    config.MAIL_FILE_DIR = os.path.join(tempfile.gettempdir(), 'swimming_bench_outbox')
+
+    from benchmarks.datagen import generate
+    from app import create_app, db
+
+    app = create_app()
+
+    with app.app_context():
+        data = generate(args.scale, seed=args.seed)
+        dialect = db.engine.dialect.name
+
+    counter = StatementCounter()
+    counter.install(db.Engine)
+    scenarios = make_scenarios(app, data)
+
+    report = {
+        'scale': args.scale,
+        'dialect': dialect,
+        'concurrency': args.concurrency,
+        'python': platform.python_version(),
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'data': data,
+        'scenarios': {},
+    }
+    print(f'scale {args.scale} on {dialect}, concurrency {args.concurrency}')
+    print(f'{"scenario":>16} {"requests":>9} {"errors":>7} {"req/s":>9} {"p50 ms":>9} '
+          f'{"p95 ms":>9} {"p99 ms":>9} {"queries":>8}')
+    for name in args.only:
+        requests = max(args.concurrency, int(args.requests * SCENARIOS[name]))
+        stats = run_scenario(app, counter, scenarios[name], requests, args.concurrency, args.seed)
+        report['scenarios'][name] = stats
+        print(f'{name:>16} {stats["requests"]:>9} {stats["errors"]:>7} {stats["req_per_sec"]:>9} '
+              f'{stats["p50_ms"]:>9} {stats["p95_ms"]:>9} {stats["p99_ms"]:>9} '
+              f'{stats["queries_per_request"]:>8}')
+
+    app.extensions['swimming']['passwords'].shutdown()
+    if db_file:
+        os.remove(db_file)
+
+    baseline_path = args.baseline or os.path.join(
+        BASELINE_DIR, f'{dialect}-{args.scale}-c{args.concurrency}.json'
+    )
+    regressions = []
+    if args.save_baseline:
+        os.makedirs(os.path.dirname(baseline_path), exist_ok=True)
+        with open(baseline_path, 'w') as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+            f.write('\n')
+        print(f'[INFO] Baseline saved to {baseline_path}')
+    elif os.path.exists(baseline_path):
+        with open(baseline_path) as f:
+            baseline = json.load(f)
+        print(f'\ncompared with {baseline_path} ({baseline.get("created")})')
+        regressions = compare(report, baseline, args.threshold)
+    if regressions:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
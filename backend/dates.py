@@ -0,0 +1,83 @@
+"""
+Date parsing and serialization helpers.
+
+Dates are stored in DATE columns and travel over the API as ISO strings
+(YYYY-MM-DD). ``parse_date`` also accepts the day-first formats that older
+rows and CSV files sometimes contain.
+"""
+from datetime import date, datetime
+
+from flask.json.provider import DefaultJSONProvider
+
+LEGACY_FORMATS = ('%Y-%m-%d', '%d-%m-%Y', '%d/%m/%Y', '%Y/%m/%d', '%Y-%m-%d %H:%M:%S')
+
+
+def parse_date(value):
+    """Return a date for a date/datetime/string value; raise ValueError otherwise"""
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    if not isinstance(value, str) or not value.strip():
+        raise ValueError(f'Invalid date: {value!r}')
+    value = value.strip()
+    for fmt in LEGACY_FORMATS:
+        try:
+            return datetime.strptime(value, fmt).date()
+        except ValueError:
+            continue
+    raise ValueError(f'Invalid date: {value!r} (expected YYYY-MM-DD)')
+
+
+def season_bounds(season):
+    """First and last day of a season (calendar year)"""
+    return date(season, 1, 1), date(season, 12, 31)
+
+
+def birth_date_range(min_age, max_age, season):
+    """
+    Dates of birth for swimmers aged min_age..max_age on 31 December of
+    ``season``; either bound may be None. Returns (earliest, latest).
+    """
+    earliest = date(season - max_age, 1, 1) if max_age is not None else None
+    latest = date(season - min_age, 12, 31) if min_age is not None else None
+    return earliest, latest
+
+
+def date_range_from_args(args):
+    """
+    Read ``season``, ``date_from`` and ``date_to`` from request args.
+
+    Returns (start, end), either of which may be None; raises ValueError for
+    malformed values. An explicit date_from/date_to narrows the season.
+    """
+    start = end = None
+    if args.get('season'):
+        try:
+            start, end = season_bounds(int(args['season']))
+        except ValueError:
+            raise ValueError('season must be a year, e.g. 2026')
+    if args.get('date_from'):
+        start = max(filter(None, [start, parse_date(args['date_from'])]))
+    if args.get('date_to'):
+        end = min(filter(None, [end, parse_date(args['date_to'])]))
+    return start, end
+
+
+def filter_date_range(query, column, start, end):
+    """Apply an inclusive date range to ``column`` (an index range scan)"""
+    if start is not None:
+        query = query.filter(column >= start)
+    if end is not None:
+        query = query.filter(column <= end)
+    return query
+
+
+class ISODateJSONProvider(DefaultJSONProvider):
+    """Serialize dates as YYYY-MM-DD instead of Flask's HTTP date format"""
+
+    @staticmethod
+    def default(o):
+        if isinstance(o, (date, datetime)):
+            return o.isoformat()
+        return DefaultJSONProvider.default(o)
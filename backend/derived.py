@@ -0,0 +1,76 @@
+"""
+Recomputing derived data (result ranks, personal bests, season bests)
+from the result table in one streaming pass.
+
+Result rows arrive sorted by (meet, event, classification, timing), so a
+board's ranks are known as soon as its rows have been seen and only the
+changed ones are kept. Bests are folded into dicts keyed by
+(swimmer, event) and (swimmer, event, season) in the same pass. Nothing
+here touches the ORM; the caller streams plain tuples in and writes the
+returned changes back in bulk.
+"""
+
+
+class DerivedRebuild:
+    """
+    Feed rows with ``add(result_id, meet_id, event_id, group, timing,
+    stored_rank, swimmer_id, meet_date)`` in board order, then read
+    ``rank_changes`` and ``personal_bests`` / ``season_bests``.
+    """
+
+    def __init__(self):
+        self.rows = 0
+        self.rank_changes = []       # (result_id, old_rank, new_rank)
+        self.personal_bests = {}     # (swimmer_id, event_id) -> (timing, meet_date, result_id, meet_id)
+        self.season_bests = {}       # (swimmer_id, event_id, season) -> same
+        self._board = None
+        self._position = 0
+        self._last_timing = None
+        self._last_rank = 0
+
+    def add(self, result_id, meet_id, event_id, group, timing, stored_rank, swimmer_id, meet_date):
+        self.rows += 1
+
+        # Competition ranking within (meet, event, classification): ties share a rank
+        board = (meet_id, event_id, group)
+        if board != self._board:
+            self._board = board
+            self._position = 0
+            self._last_timing = None
+        self._position += 1
+        if timing != self._last_timing:
+            self._last_rank = self._position
+            self._last_timing = timing
+        if stored_rank != self._last_rank:
+            self.rank_changes.append((result_id, stored_rank, self._last_rank))
+
+        # Fastest time wins; ties go to the earlier meet, then the earlier result
+        candidate = (timing, meet_date, result_id, meet_id)
+        key = (swimmer_id, event_id)
+        best = self.personal_bests.get(key)
+        if best is None or candidate < best:
+            self.personal_bests[key] = candidate
+        key = (swimmer_id, event_id, meet_date.year)
+        best = self.season_bests.get(key)
+        if best is None or candidate < best:
+            self.season_bests[key] = candidate
+
+
+def diff_bests(computed, existing):
+    """
+    Compare computed bests with stored rows.
+
+    ``computed`` maps key -> (timing, meet_date, result_id, meet_id);
+    ``existing`` maps key -> (row_id, best_time, meet_id, date). Returns
+    (inserts, updates, delete_ids) where inserts are (key, best) pairs and
+    updates are (row_id, key, best) triples.
+    """
+    inserts, updates = [], []
+    for key, best in computed.items():
+        row = existing.get(key)
+        if row is None:
+            inserts.append((key, best))
+        elif (row[1], row[2], row[3]) != (best[0], best[3], best[1]):
+            updates.append((row[0], key, best))
+    delete_ids = [row[0] for key, row in existing.items() if key not in computed]
+    return inserts, updates, delete_ids
@@ -0,0 +1,153 @@
+"""
+Response encoding: a faster JSON provider and gzip/brotli compression.
+
+``FastJSONProvider`` encodes with orjson when it is installed and falls back
+to the standard library otherwise. Either way responses are compact UTF-8
+(non-ASCII such as accented swimmer names is not escaped) with sorted keys
+and YYYY-MM-DD dates, so both backends send the same bytes.
+``response_rows(names, rows)`` turns column tuples straight into a JSON
+array of objects, so list endpoints skip building ORM objects and the
+``jsonify`` round trip.
+
+``Compressor`` compresses finished responses above a size threshold when
+the client accepts it (brotli needs the brotli package, gzip is always
+there). Streamed responses (SSE, exports) are left alone. A response with
+a strong ETag is the same body every time, so its compressed copy is kept
+and reused until the ETag changes.
+"""
+from collections import OrderedDict
+import gzip
+import threading
+
+from flask import request
+
+from dates import ISODateJSONProvider
+
+
+class FastJSONProvider(ISODateJSONProvider):
+    """
+    ``backend`` is 'auto' (orjson if importable), 'orjson' or 'stdlib'.
+    Pretty-printed debug output and calls with extra json.dumps keyword
+    arguments always go through the standard library.
+    """
+
+    def __init__(self, app, backend='auto'):
+        super().__init__(app)
+        self._orjson = None
+        if backend != 'stdlib':
+            try:
+                import orjson  # Optional dependency, much faster on large lists
+                self._orjson = orjson
+            except ImportError:
+                if backend == 'orjson':
+                    raise
+        self.backend = 'orjson' if self._orjson else 'stdlib'
+
+    def dumps_bytes(self, obj):
+        if self._orjson:
+            option = self._orjson.OPT_NON_STR_KEYS
+            if self.sort_keys:
+                option |= self._orjson.OPT_SORT_KEYS
+            return self._orjson.dumps(obj, default=self.default, option=option)
+        return super().dumps(obj, separators=(',', ':'), ensure_ascii=False).encode()
+
+    def dumps(self, obj, **kwargs):
+        if kwargs or not self._orjson:
+            return super().dumps(obj, **kwargs)
+        return self.dumps_bytes(obj).decode()
+
+    def response(self, *args, **kwargs):
+        pretty = (self.compact is None and self._app.debug) or self.compact is False
+        if not pretty:
+            obj = self._prepare_response_obj(args, kwargs)
+            return self._app.response_class(self.dumps_bytes(obj), mimetype=self.mimetype)
+        return super().response(*args, **kwargs)
+
+    def response_rows(self, names, rows, offset=0):
+        """JSON array response of {name: value} objects from column tuples, skipping ``offset`` leading columns"""
+        body = self.dumps_bytes([dict(zip(names, row[offset:])) for row in rows])
+        return self._app.response_class(body, mimetype=self.mimetype)
+
+
+class Compressor:
+    def __init__(self, min_size=1024, mimetypes=('application/json',), gzip_level=6,
+                 brotli_quality=4, cache_size=256):
+        self.min_size = min_size
+        self.mimetypes = set(mimetypes)
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self.cache_size = cache_size
+        self._brotli = None
+        if brotli_quality is not None:
+            try:
+                import brotli  # Optional dependency; without it only gzip is offered
+                self._brotli = brotli
+            except ImportError:
+                pass
+        self.encodings = (['br'] if self._brotli else []) + ['gzip']
+        self._cache = OrderedDict()  # (etag, encoding) -> compressed body
+        self._counts = {encoding: {'responses': 0, 'bytes_in': 0, 'bytes_out': 0, 'cached': 0}
+                        for encoding in self.encodings}
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        app.after_request(self._after_request)
+
+    def compress(self, body, encoding):
+        if encoding == 'br':
+            return self._brotli.compress(body, quality=self.brotli_quality)
+        return gzip.compress(body, compresslevel=self.gzip_level, mtime=0)
+
+    def _after_request(self, response):
+        if (response.status_code != 200 or response.direct_passthrough or response.is_streamed
+                or response.mimetype not in self.mimetypes or 'Content-Encoding' in response.headers):
+            return response
+        body = response.get_data()
+        if len(body) < self.min_size:
+            return response
+        response.vary.add('Accept-Encoding')
+        encoding = request.accept_encodings.best_match(self.encodings)
+        if encoding is None:
+            return response
+
+        etag, weak = response.get_etag()
+        key = (etag, encoding) if etag and not weak else None
+        with self._lock:
+            compressed = self._cache.get(key) if key else None
+            if compressed is not None:
+                self._cache.move_to_end(key)
+        cached = compressed is not None
+        if not cached:
+            compressed = self.compress(body, encoding)
+
+        with self._lock:
+            if key and not cached:
+                self._cache[key] = compressed
+                while len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+            counts = self._counts[encoding]
+            counts['responses'] += 1
+            counts['bytes_in'] += len(body)
+            counts['bytes_out'] += len(compressed)
+            counts['cached'] += cached
+
+        response.set_data(compressed)
+        response.headers['Content-Encoding'] = encoding
+        if etag and not weak:
+            response.set_etag(etag, weak=True)  # Same resource, different bytes; If-None-Match still matches
+        return response
+
+    def stats(self):
+        with self._lock:
+            return {
+                'min_size': self.min_size,
+                'encodings': list(self.encodings),
+                'cached_bodies': len(self._cache),
+                'counts': {encoding: dict(counts) for encoding, counts in self._counts.items()}
+            }
+
+    def gauges(self):
+        """(name, labels, value) samples for /metrics"""
+        for encoding, counts in self.stats()['counts'].items():
+            for field, value in counts.items():
+                yield f'compressed_{field}', {'encoding': encoding}, value
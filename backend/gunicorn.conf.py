@@ -0,0 +1,62 @@
+# Gunicorn settings for `gunicorn -c gunicorn.conf.py wsgi:app` (see wsgi.py).
+import multiprocessing
+import os
+import time
+
+
+def _per_process_backends():
+    """
+    Backends configured as 'memory' that only see their own worker's state:
+    with several workers a live subscriber misses results posted to another
+    worker and an OTP sent by one worker cannot be verified by the next
+    """
+    import config  # Not as a global: gunicorn reads every global here as a setting
+
+    return [name for name in ('LIVE_BACKEND', 'OTP_BACKEND') if getattr(config, name, None) == 'memory']
+
+
+bind = os.environ.get('GUNICORN_BIND', '0.0.0.0:5000')
+# One worker (gevent keeps it busy) until the per-process backends are switched off
+workers = int(os.environ.get(
+    'GUNICORN_WORKERS', 1 if _per_process_backends() else multiprocessing.cpu_count() * 2 + 1
+))
+# SSE clients stay connected for the whole meet. Under gevent each one is a
+# parked greenlet; under gthread each would hold one of `threads` per worker
+# and starve every other route.
+worker_class = os.environ.get('GUNICORN_WORKER_CLASS', 'gevent')
+worker_connections = int(os.environ.get('GUNICORN_WORKER_CONNECTIONS', 4000))  # gevent
+threads = int(os.environ.get('GUNICORN_THREADS', 4))  # gthread
+timeout = 60
+graceful_timeout = 30
+# Each worker imports the app after the fork: no engines, pools or threads
+# are shared with the master
+preload_app = False
+accesslog = '-'
+
+
+def on_starting(server):
+    if server.cfg.workers < 2:
+        return
+    per_worker = _per_process_backends()
+    if per_worker:
+        raise SystemExit(
+            f'[ERROR] {", ".join(per_worker)} = \'memory\' with {server.cfg.workers} workers: '
+            f'use the redis/sql backends or GUNICORN_WORKERS=1'
+        )
+    import config
+
+    if getattr(config, 'RATE_LIMIT_BACKEND', 'memory') == 'memory':
+        print(f'[WARN] RATE_LIMIT_BACKEND = \'memory\': {server.cfg.workers} workers allow up to '
+              f'{server.cfg.workers}x RATE_LIMITS')
+
+
+def post_fork(server, worker):
+    worker.forked_at = time.perf_counter()
+
+
+def post_worker_init(worker):
+    # Runs in the worker once wsgi:app is loaded, before it accepts connections
+    from app import warm_up
+
+    warm_up(worker.wsgi)
+    print(f'[INFO] Worker {worker.pid} ready {(time.perf_counter() - worker.forked_at) * 1000:.0f} ms after fork')
@@ -0,0 +1,63 @@
+"""
+Block-based sequence allocation for human-readable ids (e.g. ATH-2026-0042).
+
+Each process reserves a block of numbers at a time with a single atomic
+``UPDATE ... SET next_value = next_value + block`` on a sequence row, then
+hands them out from memory. Allocation is O(1) and never scans the swimmer
+table; numbers are unique across processes, though a restart can leave gaps.
+"""
+import threading
+
+from sqlalchemy import insert, select, update
+from sqlalchemy.exc import IntegrityError
+
+
+class SequenceAllocator:
+    """
+    ``table`` must have a string primary key ``name`` and an integer
+    ``next_value`` column. ``seed(conn, name)`` returns the first number to
+    hand out when a sequence row does not exist yet.
+    """
+
+    def __init__(self, engine_getter, table, block_size=20, seed=None):
+        self._engine_getter = engine_getter
+        self.table = table
+        self.block_size = block_size
+        self._seed = seed or (lambda conn, name: 1)
+        self._blocks = {}  # name -> [next, end)
+        self._lock = threading.Lock()
+
+    def _reserve(self, name):
+        """Reserve the next block for ``name`` in its own short transaction"""
+        table = self.table
+        for _ in range(3):
+            with self._engine_getter().begin() as conn:
+                updated = conn.execute(
+                    update(table).where(table.c.name == name)
+                    .values(next_value=table.c.next_value + self.block_size)
+                ).rowcount
+                if updated:
+                    end = conn.execute(select(table.c.next_value).where(table.c.name == name)).scalar_one()
+                    return [end - self.block_size, end]
+            try:
+                with self._engine_getter().begin() as conn:
+                    start = self._seed(conn, name)
+                    conn.execute(insert(table).values(name=name, next_value=start + self.block_size))
+                    return [start, start + self.block_size]
+            except IntegrityError:
+                continue  # Another process created the row first; retry the update
+        raise RuntimeError(f'Could not reserve ids for sequence {name}')
+
+    def next(self, name):
+        with self._lock:
+            block = self._blocks.get(name)
+            if block is None or block[0] >= block[1]:
+                block = self._blocks[name] = self._reserve(name)
+            value = block[0]
+            block[0] += 1
+            return value
+
+    def reset(self):
+        """Forget reserved blocks (e.g. after fork or in tests)"""
+        with self._lock:
+            self._blocks.clear()
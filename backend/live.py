@@ -0,0 +1,145 @@
+"""
+Publish/subscribe for live meet updates, streamed to clients as
+Server-Sent Events.
+
+Brokers:
+    MemoryBroker  fan-out inside this process; enough for a single server
+    RedisBroker   publishes through Redis so every app process sees every
+                  event (needs the ``redis`` package)
+
+Each subscriber gets a bounded queue. A client that falls that far behind
+is sent a ``reset`` event and disconnected rather than slowing publishers
+down; it should refetch and reconnect.
+"""
+import itertools
+import json
+import queue
+import threading
+
+
+class Subscription:
+    def __init__(self, broker, channel, maxsize):
+        self.broker = broker
+        self.channel = channel
+        self.overflowed = False
+        self._queue = queue.Queue(maxsize)
+
+    def offer(self, message):
+        try:
+            self._queue.put_nowait(message)
+        except queue.Full:
+            self.overflowed = True
+
+    def get(self, timeout):
+        """Next (event_id, event, data), or None after ``timeout`` seconds"""
+        try:
+            return self._queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def close(self):
+        self.broker.unsubscribe(self)
+
+
+class MemoryBroker:
+    def __init__(self, queue_size=256):
+        self.queue_size = queue_size
+        self.published = 0
+        self._ids = itertools.count(1)
+        self._channels = {}  # channel -> set of Subscription
+        self._lock = threading.Lock()
+
+    def subscribe(self, channel):
+        subscription = Subscription(self, channel, self.queue_size)
+        with self._lock:
+            self._channels.setdefault(channel, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            subscribers = self._channels.get(subscription.channel)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._channels[subscription.channel]
+
+    def publish(self, channel, event, data):
+        self.deliver(channel, event, data)
+
+    def deliver(self, channel, event, data):
+        """Hand a message to this process's subscribers"""
+        with self._lock:
+            subscribers = list(self._channels.get(channel, ()))
+            message = (next(self._ids), event, data)
+            self.published += 1
+        for subscription in subscribers:
+            subscription.offer(message)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'channels': len(self._channels),
+                'subscribers': sum(len(s) for s in self._channels.values()),
+                'published': self.published
+            }
+
+
+class RedisBroker(MemoryBroker):
+    """
+    Publishes to Redis and relays everything received on ``prefix*`` to the
+    local subscribers from a single listener thread per process.
+    """
+
+    def __init__(self, url, prefix='live:', queue_size=256):
+        import redis  # Optional dependency, only needed for this backend
+
+        super().__init__(queue_size)
+        self.prefix = prefix
+        self._redis = redis.Redis.from_url(url)
+        self._listener = None
+        self._listener_lock = threading.Lock()
+
+    def subscribe(self, channel):
+        self._start_listener()
+        return super().subscribe(channel)
+
+    def publish(self, channel, event, data):
+        self._redis.publish(self.prefix + channel, json.dumps({'event': event, 'data': data}, default=str))
+
+    def _start_listener(self):
+        with self._listener_lock:
+            if self._listener is None:
+                self._listener = threading.Thread(target=self._listen, name='live-redis', daemon=True)
+                self._listener.start()
+
+    def _listen(self):
+        pubsub = self._redis.pubsub(ignore_subscribe_messages=True)
+        pubsub.psubscribe(self.prefix + '*')
+        for message in pubsub.listen():
+            try:
+                payload = json.loads(message['data'])
+                channel = message['channel'].decode()[len(self.prefix):]
+                self.deliver(channel, payload['event'], payload['data'])
+            except Exception as e:
+                print(f'[ERROR] Live relay failed: {e}')
+
+
+def format_sse(event_id, event, data):
+    return f'id: {event_id}\nevent: {event}\ndata: {json.dumps(data, default=str)}\n\n'
+
+
+def stream(subscription, heartbeat=15):
+    """Yield SSE text for a subscription until the client goes away"""
+    try:
+        yield 'retry: 3000\n\n'
+        while True:
+            message = subscription.get(timeout=heartbeat)
+            if subscription.overflowed:
+                yield 'event: reset\ndata: {}\n\n'
+                return
+            if message is None:
+                yield ': ping\n\n'  # Keeps proxies from closing an idle stream
+            else:
+                yield format_sse(*message)
+    finally:
+        subscription.close()
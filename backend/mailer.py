@@ -0,0 +1,256 @@
+"""
+Outbound email queue for OTP mail.
+
+Request handlers call ``MailQueue.enqueue`` and return immediately; a small
+pool of worker threads delivers the messages. Each SMTP worker keeps one
+Flask-Mail connection open and reuses it for every message it sends,
+reconnecting only after an error. Failed sends are retried with exponential
+backoff.
+
+Backends:
+    smtp     deliver through Flask-Mail (persistent connection per worker)
+    console  print the message to stdout (development default)
+    file     write each message as an .eml file to a directory
+"""
+from collections import OrderedDict
+from datetime import datetime
+from string import Template
+import itertools
+import os
+import queue
+import threading
+import time
+
+from flask_mail import Message
+
+from metrics import Histogram
+
+# Seconds from enqueue to delivery, retries included
+SEND_LATENCY_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+_OTP_BOX = """
+<div style="font-family:Arial,sans-serif;max-width:480px;margin:auto;padding:32px;
+            background:#f0f4ff;border-radius:12px;">
+  <h2 style="color:#001f4d;">$heading</h2>
+  <p style="color:#444;">$intro
+     It expires in <strong>10 minutes</strong>.</p>
+  <div style="font-size:2.5rem;font-weight:900;letter-spacing:12px;
+              text-align:center;padding:24px;background:#fff;
+              border-radius:10px;color:#003580;margin:20px 0;">
+    $otp_code
+  </div>
+  <p style="color:#888;font-size:0.88rem;">
+    $footer
+  </p>
+</div>
+"""
+
+
+def _compile(heading, intro, footer):
+    # Fill in the fixed parts once; only the per-message fields remain
+    return Template(Template(_OTP_BOX).safe_substitute(heading=heading, intro=intro, footer=footer))
+
+
+# name -> (subject, html template, plain-text template)
+TEMPLATES = {
+    'verification': (
+        'Aquatics — Email Verification',
+        _compile('🏊 Welcome to Aquatics!',
+                 'Thank you for registering. Please verify your email using the OTP below.',
+                 'Your Athlete ID: <strong>$athlete_id</strong>'),
+        Template('Your Aquatics verification OTP is $otp_code. Athlete ID: $athlete_id'),
+    ),
+    'verification_resend': (
+        'Aquatics — Email Verification',
+        _compile('🏊 Welcome to Aquatics!',
+                 'Please verify your email using the OTP below.',
+                 'Your Athlete ID: <strong>$athlete_id</strong>'),
+        Template('Your Aquatics verification OTP is $otp_code. Athlete ID: $athlete_id'),
+    ),
+    'reset': (
+        'Aquatics — Password Reset OTP',
+        _compile('🏊 Aquatics Password Reset',
+                 'Use the OTP below to reset your password.',
+                 'If you did not request this, ignore this email.'),
+        Template('Your Aquatics password reset OTP is $otp_code.'),
+    ),
+}
+
+
+def render_mail(name, recipient, **params):
+    """Build a Message from one of the cached TEMPLATES"""
+    subject, html, body = TEMPLATES[name]
+    return Message(
+        subject=subject,
+        recipients=[recipient],
+        html=html.substitute(params),
+        body=body.substitute(params)
+    )
+
+
+class ConsoleBackend:
+    def send(self, message):
+        print(f'[DEV] Mail to {", ".join(message.recipients)}: {message.subject} — {message.body}')
+
+    def close(self):
+        pass
+
+
+class FileBackend:
+    def __init__(self, directory):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def send(self, message):
+        stamp = datetime.utcnow().strftime('%Y%m%d-%H%M%S-%f')
+        path = os.path.join(self.directory, f'{stamp}-{threading.get_ident()}.eml')
+        with open(path, 'wb') as f:
+            f.write(message.as_bytes())
+
+    def close(self):
+        pass
+
+
+class SMTPBackend:
+    """One reusable Flask-Mail connection, opened on first use"""
+
+    def __init__(self, mail):
+        self.mail = mail
+        self.connection = None
+
+    def send(self, message):
+        if self.connection is None:
+            self.connection = self.mail.connect().__enter__()
+        try:
+            self.connection.send(message)
+        except Exception:
+            self.close()  # Reconnect on the next attempt
+            raise
+
+    def close(self):
+        if self.connection is not None:
+            try:
+                self.connection.__exit__(None, None, None)
+            except Exception:
+                pass
+            self.connection = None
+
+
+class MailQueue:
+    """
+    Bounded queue of outgoing messages drained by ``workers`` threads.
+
+    ``backend_factory`` is called once per worker so stateful backends
+    (SMTP connections) are never shared between threads.
+    """
+
+    def __init__(self, app, backend_factory, workers=2, max_retries=3, backoff=2.0, maxsize=10000):
+        self.app = app
+        self.backend_factory = backend_factory
+        self.workers = workers
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self._queue = queue.Queue(maxsize=maxsize)
+        self._threads = []
+        self._lock = threading.Lock()
+        self.failed = 0
+        self.retried = 0
+        self.latency = Histogram(SEND_LATENCY_BUCKETS)  # Its count is the number sent
+        self.latency_max = 0.0
+        self._pending = OrderedDict()  # id -> enqueue time, oldest first, until sent or given up
+        self._ids = itertools.count()
+
+    def _start(self):
+        with self._lock:
+            if self._threads:
+                return
+            for idx in range(self.workers):
+                thread = threading.Thread(target=self._run, name=f'mail-worker-{idx}', daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    def enqueue(self, message):
+        """Queue a message for delivery; raises queue.Full if the queue is full"""
+        self._start()
+        queued_at = time.perf_counter()
+        with self._lock:
+            message_id = next(self._ids)
+            self._pending[message_id] = queued_at
+        try:
+            self._queue.put_nowait((message_id, message, queued_at))
+        except queue.Full:
+            with self._lock:
+                del self._pending[message_id]
+            raise
+
+    def _run(self):
+        backend = self.backend_factory()
+        with self.app.app_context():
+            while True:
+                item = self._queue.get()
+                if item is None:
+                    backend.close()
+                    self._queue.task_done()
+                    return
+                message_id, message, queued_at = item
+                self._deliver(backend, message, queued_at)
+                with self._lock:
+                    del self._pending[message_id]
+                self._queue.task_done()
+
+    def _deliver(self, backend, message, queued_at):
+        for attempt in range(self.max_retries + 1):
+            try:
+                backend.send(message)
+            except Exception as e:
+                if attempt == self.max_retries:
+                    with self._lock:
+                        self.failed += 1
+                    print(f'[ERROR] Failed to send email to {", ".join(message.recipients)}: {e}')
+                    return
+                with self._lock:
+                    self.retried += 1
+                time.sleep(self.backoff * (2 ** attempt))
+            else:
+                latency = time.perf_counter() - queued_at
+                with self._lock:
+                    self.latency.observe(latency)
+                    self.latency_max = max(self.latency_max, latency)
+                return
+
+    def join(self):
+        """Block until every queued message has been handled"""
+        self._queue.join()
+
+    def close(self):
+        """Stop the workers after the queue drains"""
+        for _ in self._threads:
+            self._queue.put(None)
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+
+    def stats(self):
+        with self._lock:
+            sent = sum(self.latency.counts)
+            oldest = next(iter(self._pending.values()), None)
+            return {
+                'queue_depth': self._queue.qsize(),
+                'pending': len(self._pending),
+                'oldest_pending_seconds': round(time.perf_counter() - oldest, 3) if oldest is not None else 0,
+                'workers': len(self._threads),
+                'sent': sent,
+                'failed': self.failed,
+                'retried': self.retried,
+                'avg_send_latency_ms': round(self.latency.sum / sent * 1000, 2) if sent else None,
+                'max_send_latency_ms': round(self.latency_max * 1000, 2)
+            }
+
+    def gauges(self):
+        """(name, labels, value) samples for /metrics; the send latency is a Histogram"""
+        stats = self.stats()
+        for field in ('queue_depth', 'pending', 'oldest_pending_seconds', 'sent', 'failed', 'retried'):
+            yield f'mail_{field}', {}, stats[field]
+        with self._lock:
+            latency = self.latency.copy()
+        yield 'mail_send_latency_seconds', {}, latency
@@ -0,0 +1,205 @@
+"""
+Opt-in request and SQL instrumentation, exported in Prometheus text format.
+
+``RequestMetrics.init_app(app, engine)`` hooks Flask's request callbacks and
+SQLAlchemy's cursor events on ``engine`` (an Engine, or the Engine class to
+cover every engine). For every request it records the handler latency, the
+number of SQL statements and the time spent in them, keyed by route rule
+(e.g. ``/rankings/<int:event_id>``). The slowest distinct statements seen so
+far are kept with the route that ran them.
+
+Statements run outside a request (background threads, CLI commands) are
+not counted. Work per statement is two perf_counter() calls and a few
+attribute updates on a thread-local.
+"""
+import bisect
+import threading
+import time
+
+from flask import request
+from sqlalchemy import event
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 500)
+
+
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # Last slot is +Inf
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+
+    def copy(self):
+        histogram = Histogram(self.buckets)
+        histogram.counts, histogram.sum = list(self.counts), self.sum
+        return histogram
+
+    def lines(self, name, labels):
+        cumulative = 0
+        bucket_labels = f'{labels},' if labels else ''
+        for bound, count in zip(self.buckets, self.counts):
+            cumulative += count
+            yield f'{name}_bucket{{{bucket_labels}le="{bound}"}} {cumulative}'
+        cumulative += self.counts[-1]
+        yield f'{name}_bucket{{{bucket_labels}le="+Inf"}} {cumulative}'
+        yield f'{name}_sum{{{labels}}} {self.sum:.6f}'
+        yield f'{name}_count{{{labels}}} {cumulative}'
+
+
+def _label(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', ' ')
+
+
+class RequestMetrics:
+    def __init__(self, slow_queries=10, query_warn=50, prefix='swimming'):
+        self.slow_queries = slow_queries
+        self.query_warn = query_warn
+        self.prefix = prefix
+        self._requests = {}   # (route, method, status) -> count
+        self._latency = {}    # (route, method) -> Histogram
+        self._queries = {}    # route -> Histogram of statements per request
+        self._db_time = {}    # route -> Histogram of SQL seconds per request
+        self._slowest = {}    # statement -> (seconds, route), at most slow_queries
+        self._collectors = []  # callables yielding (name, labels, value) gauges or histograms
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    def init_app(self, app, engine):
+        app.before_request(self._before_request)
+        app.after_request(self._after_request)
+        event.listen(engine, 'before_cursor_execute', self._before_execute)
+        event.listen(engine, 'after_cursor_execute', self._after_execute)
+
+    def add_collector(self, collect):
+        """
+        Export samples from ``collect()``, which yields (name, labels, value),
+        at render time. A Histogram value is exported as a histogram, anything
+        else as a gauge.
+        """
+        self._collectors.append(collect)
+
+    # ── Hooks ──
+    def _before_request(self):
+        local = self._local
+        local.active = True
+        local.queries = 0
+        local.db_time = 0.0
+        local.slow = []
+        local.started = time.perf_counter()
+
+    def _after_request(self, response):
+        local = self._local
+        if not getattr(local, 'active', False):
+            return response
+        local.active = False
+        elapsed = time.perf_counter() - local.started
+        route = request.url_rule.rule if request.url_rule else 'unmatched'
+        method = request.method
+
+        with self._lock:
+            key = (route, method, response.status_code)
+            self._requests[key] = self._requests.get(key, 0) + 1
+            self._histogram(self._latency, (route, method), LATENCY_BUCKETS).observe(elapsed)
+            self._histogram(self._queries, route, QUERY_COUNT_BUCKETS).observe(local.queries)
+            self._histogram(self._db_time, route, LATENCY_BUCKETS).observe(local.db_time)
+            for seconds, statement in local.slow:
+                self._record_slow(statement, seconds, route)
+
+        if self.query_warn and local.queries > self.query_warn:
+            print(f'[WARN] {method} {route} ran {local.queries} SQL statements ({local.db_time * 1000:.1f} ms)')
+        return response
+
+    def _before_execute(self, conn, cursor, statement, parameters, context, executemany):
+        if getattr(self._local, 'active', False):
+            self._local.statement_started = time.perf_counter()
+
+    def _after_execute(self, conn, cursor, statement, parameters, context, executemany):
+        local = self._local
+        if not getattr(local, 'active', False):
+            return
+        seconds = time.perf_counter() - local.statement_started
+        local.queries += 1
+        local.db_time += seconds
+        # Keep only this request's candidates for the global slowest list
+        if len(local.slow) < self.slow_queries:
+            local.slow.append((seconds, statement))
+        else:
+            fastest = min(range(len(local.slow)), key=lambda i: local.slow[i][0])
+            if seconds > local.slow[fastest][0]:
+                local.slow[fastest] = (seconds, statement)
+
+    def _record_slow(self, statement, seconds, route):
+        slowest = self._slowest
+        if statement in slowest:
+            if seconds > slowest[statement][0]:
+                slowest[statement] = (seconds, route)
+            return
+        if len(slowest) >= self.slow_queries:
+            fastest = min(slowest, key=lambda s: slowest[s][0])
+            if seconds <= slowest[fastest][0]:
+                return
+            del slowest[fastest]
+        slowest[statement] = (seconds, route)
+
+    @staticmethod
+    def _histogram(table, key, buckets):
+        histogram = table.get(key)
+        if histogram is None:
+            histogram = table[key] = Histogram(buckets)
+        return histogram
+
+    # ── Export ──
+    def render(self):
+        """Everything recorded so far in Prometheus text exposition format"""
+        p = self.prefix
+        lines = []
+        with self._lock:
+            lines.append(f'# HELP {p}_http_requests_total Requests handled, by route, method and status.')
+            lines.append(f'# TYPE {p}_http_requests_total counter')
+            for (route, method, status), count in sorted(self._requests.items()):
+                lines.append(
+                    f'{p}_http_requests_total{{route="{_label(route)}",method="{method}",status="{status}"}} {count}'
+                )
+
+            lines.append(f'# HELP {p}_http_request_duration_seconds Handler latency.')
+            lines.append(f'# TYPE {p}_http_request_duration_seconds histogram')
+            for (route, method), histogram in sorted(self._latency.items()):
+                lines.extend(histogram.lines(
+                    f'{p}_http_request_duration_seconds', f'route="{_label(route)}",method="{method}"'
+                ))
+
+            lines.append(f'# HELP {p}_db_statements_per_request SQL statements executed per request.')
+            lines.append(f'# TYPE {p}_db_statements_per_request histogram')
+            for route, histogram in sorted(self._queries.items()):
+                lines.extend(histogram.lines(f'{p}_db_statements_per_request', f'route="{_label(route)}"'))
+
+            lines.append(f'# HELP {p}_db_seconds_per_request Time spent in SQL per request.')
+            lines.append(f'# TYPE {p}_db_seconds_per_request histogram')
+            for route, histogram in sorted(self._db_time.items()):
+                lines.extend(histogram.lines(f'{p}_db_seconds_per_request', f'route="{_label(route)}"'))
+
+            lines.append(f'# HELP {p}_db_slowest_statement_seconds Slowest SQL statements seen since start.')
+            lines.append(f'# TYPE {p}_db_slowest_statement_seconds gauge')
+            for statement, (seconds, route) in sorted(self._slowest.items(), key=lambda i: -i[1][0]):
+                lines.append(
+                    f'{p}_db_slowest_statement_seconds{{route="{_label(route)}",'
+                    f'statement="{_label(" ".join(statement.split())[:300])}"}} {seconds:.6f}'
+                )
+
+        typed = set()
+        for collect in self._collectors:
+            for name, labels, value in collect():
+                histogram = isinstance(value, Histogram)
+                if name not in typed:
+                    typed.add(name)
+                    lines.append(f'# TYPE {p}_{name} {"histogram" if histogram else "gauge"}')
+                label_text = ','.join(f'{k}="{_label(v)}"' for k, v in labels.items())
+                if histogram:
+                    lines.extend(value.lines(f'{p}_{name}', label_text))
+                else:
+                    lines.append(f'{p}_{name}{{{label_text}}} {value}')
+        return '\n'.join(lines) + '\n'
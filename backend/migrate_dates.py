@@ -0,0 +1,81 @@
+"""
+Migration: convert string date columns to DATE.
+
+Affected columns (all previously VARCHAR(20)):
+    meet.date, personal_best.date, entry.entry_date, swimmer.date_of_birth
+
+Every value is first parsed and rewritten as YYYY-MM-DD (see
+dates.parse_date for accepted legacy formats). If any value cannot be
+parsed the migration stops before altering anything and lists the rows.
+On MySQL the columns are then altered to DATE; SQLite stores DATE values as
+ISO text already, so only the backfill is needed there. Safe to re-run.
+
+Run with:  flask --app app migrate-dates [--dry-run]
+"""
+from sqlalchemy import inspect, text
+
+from dates import parse_date
+
+DATE_COLUMNS = [
+    ('meet', 'date'),
+    ('personal_best', 'date'),
+    ('entry', 'entry_date'),
+    ('swimmer', 'date_of_birth'),
+]
+
+
+def _is_date_type(column):
+    return column['type'].__class__.__name__.upper() == 'DATE'
+
+
+def migrate_date_columns(engine, dry_run=False, log=print):
+    inspector = inspect(engine)
+    pending = []
+    for table, column in DATE_COLUMNS:
+        info = {c['name']: c for c in inspector.get_columns(table)}.get(column)
+        if info is None:
+            log(f'[SKIP] {table}.{column} does not exist')
+            continue
+        if engine.dialect.name != 'sqlite' and _is_date_type(info):
+            log(f'[SKIP] {table}.{column} is already DATE')
+            continue
+        pending.append((table, column, info['nullable']))
+
+    # Backfill: normalise every value to ISO before touching column types
+    updates = {}
+    bad = []
+    with engine.connect() as conn:
+        for table, column, _ in pending:
+            rows = conn.execute(text(f'SELECT id, {column} FROM {table}')).all()
+            changes = []
+            for row_id, value in rows:
+                if value is None:
+                    continue
+                try:
+                    iso = parse_date(value).isoformat()
+                except ValueError:
+                    bad.append(f'{table}.{column} id={row_id}: {value!r}')
+                    continue
+                if iso != str(value):
+                    changes.append({'id': row_id, 'value': iso})
+            updates[(table, column)] = changes
+            log(f'[INFO] {table}.{column}: {len(rows)} rows, {len(changes)} to rewrite')
+
+    if bad:
+        for line in bad:
+            log(f'[ERROR] Unparseable date {line}')
+        raise ValueError(f'{len(bad)} date values could not be parsed; fix them and re-run')
+    if dry_run:
+        return updates
+
+    with engine.begin() as conn:
+        for (table, column), changes in updates.items():
+            if changes:
+                conn.execute(text(f'UPDATE {table} SET {column} = :value WHERE id = :id'), changes)
+        if engine.dialect.name in ('mysql', 'mariadb'):
+            for table, column, nullable in pending:
+                conn.execute(text(
+                    f'ALTER TABLE `{table}` MODIFY `{column}` DATE {"NULL" if nullable else "NOT NULL"}'
+                ))
+                log(f'[INFO] {table}.{column} altered to DATE')
+    return updates
@@ -0,0 +1,124 @@
+"""
+One-time passcodes for email verification and password reset.
+
+Two interchangeable stores:
+    SQLOTPStore     rows in the ``otp`` table; works across processes
+    MemoryOTPStore  a TTL dict in this process; for single-node deployments
+
+Both check expiry as part of the lookup, so an expired code is simply not
+found. Neither commits: callers commit alongside the change the code
+authorises (e.g. marking the email verified). A background purger deletes
+used and expired rows so lookups stay small.
+"""
+from datetime import datetime, timedelta
+import secrets
+import string
+import threading
+import time
+
+
+def generate_code(length=6):
+    return ''.join(secrets.choice(string.digits) for _ in range(length))
+
+
+class SQLOTPStore:
+    def __init__(self, db, model, ttl=600):
+        self.db = db
+        self.model = model
+        self.ttl = ttl
+
+    def issue(self, email, purpose):
+        """Replace any unused code for (email, purpose) with a new one"""
+        model = self.model
+        model.query.filter_by(email=email, purpose=purpose, is_used=False).delete()
+        code = generate_code()
+        self.db.session.add(model(
+            email=email,
+            code=code,
+            purpose=purpose,
+            created_at=datetime.utcnow(),
+            is_used=False
+        ))
+        return code
+
+    def consume(self, email, code, purpose):
+        """Mark a valid, unexpired code as used; return False if there is none"""
+        model = self.model
+        cutoff = datetime.utcnow() - timedelta(seconds=self.ttl)
+        otp = model.query.filter(
+            model.email == email,
+            model.purpose == purpose,
+            model.is_used == False,  # noqa: E712
+            model.code == code,
+            model.created_at >= cutoff
+        ).order_by(model.created_at.desc()).first()
+        if otp is None:
+            return False
+        otp.is_used = True
+        return True
+
+    def purge(self):
+        """Delete used and expired codes; returns the number of rows removed"""
+        model = self.model
+        cutoff = datetime.utcnow() - timedelta(seconds=self.ttl)
+        removed = model.query.filter(
+            self.db.or_(model.created_at < cutoff, model.is_used == True)  # noqa: E712
+        ).delete(synchronize_session=False)
+        self.db.session.commit()
+        return removed
+
+
+class MemoryOTPStore:
+    def __init__(self, ttl=600):
+        self.ttl = ttl
+        self._codes = {}  # (email, purpose) -> (code, expires_at)
+        self._lock = threading.Lock()
+
+    def issue(self, email, purpose):
+        code = generate_code()
+        with self._lock:
+            self._codes[(email, purpose)] = (code, time.monotonic() + self.ttl)
+        return code
+
+    def consume(self, email, code, purpose):
+        with self._lock:
+            entry = self._codes.get((email, purpose))
+            if entry is None or entry[1] < time.monotonic() or not secrets.compare_digest(entry[0], code):
+                return False
+            del self._codes[(email, purpose)]
+            return True
+
+    def purge(self):
+        now = time.monotonic()
+        with self._lock:
+            expired = [key for key, (_, expires_at) in self._codes.items() if expires_at < now]
+            for key in expired:
+                del self._codes[key]
+        return len(expired)
+
+
+class OTPPurger:
+    """Calls ``store.purge()`` every ``interval`` seconds on a daemon thread"""
+
+    def __init__(self, app, store, interval=300):
+        self.app = app
+        self.store = store
+        self.interval = interval
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def start(self):
+        with self._lock:
+            if self._thread is not None or not self.interval:
+                return
+            self._thread = threading.Thread(target=self._run, name='otp-purger', daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            time.sleep(self.interval)
+            try:
+                with self.app.app_context():
+                    self.store.purge()
+            except Exception as e:
+                print(f'[ERROR] OTP purge failed: {e}')
@@ -0,0 +1,73 @@
+"""
+Keyset (cursor) pagination for list endpoints.
+
+Pages are ordered by primary key and continue with ``WHERE id > cursor``,
+so every page costs the same no matter how deep the client has read and no
+OFFSET scan is ever needed. The response body stays a plain JSON array; the
+cursor for the next page is returned in the ``X-Next-Cursor`` header (and a
+``Link: rel="next"`` header) and is absent on the last page.
+
+Query parameters understood by ``keyset_page``:
+    limit   page size, capped at the configured maximum
+    cursor  value of X-Next-Cursor from the previous page
+    fields  comma-separated subset of the endpoint's fields to return
+"""
+from urllib.parse import urlencode
+
+from flask import current_app, jsonify, request
+
+
+class PaginationError(ValueError):
+    pass
+
+
+def parse_page_args(fields):
+    """Validate limit/cursor/fields from the request query string"""
+    config = current_app.config
+    try:
+        limit = int(request.args.get('limit', config['PAGE_SIZE_DEFAULT']))
+        cursor = request.args.get('cursor')
+        cursor = int(cursor) if cursor else None
+    except ValueError:
+        raise PaginationError('limit and cursor must be integers')
+    if limit < 1:
+        raise PaginationError('limit must be at least 1')
+    limit = min(limit, config['PAGE_SIZE_MAX'])
+
+    selected = list(fields)
+    if request.args.get('fields'):
+        selected = [f.strip() for f in request.args['fields'].split(',') if f.strip()]
+        unknown = [f for f in selected if f not in fields]
+        if unknown:
+            raise PaginationError(f"Unknown fields: {', '.join(unknown)}")
+    return limit, cursor, selected
+
+
+def keyset_page(query, id_column, fields):
+    """
+    Return one page of ``query`` as a JSON response.
+
+    ``query`` is a Session.query() with filters already applied and no
+    columns selected; ``fields`` maps output names to columns.
+    """
+    try:
+        limit, cursor, selected = parse_page_args(fields)
+    except PaginationError as e:
+        return jsonify({'error': str(e)}), 400
+
+    # Only the projected columns are loaded, plus the id for the cursor
+    query = query.with_entities(id_column, *[fields[name] for name in selected])
+    if cursor is not None:
+        query = query.filter(id_column > cursor)
+    rows = query.order_by(id_column).limit(limit + 1).all()
+
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    response = current_app.json.response_rows(selected, rows, offset=1)  # Column 0 is the cursor id
+    if has_more:
+        next_cursor = str(rows[-1][0])
+        args = request.args.to_dict()
+        args['cursor'] = next_cursor
+        response.headers['X-Next-Cursor'] = next_cursor
+        response.headers['Link'] = f'<{request.base_url}?{urlencode(args)}>; rel="next"'
+    return response
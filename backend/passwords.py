@@ -0,0 +1,88 @@
+"""
+Password hashing off the request thread.
+
+scrypt/pbkdf2 are deliberately expensive, so hashes are computed in a small
+process pool instead of holding a request worker (and the GIL) for tens of
+milliseconds. The pool is bounded: once ``max_pending`` jobs are queued,
+further calls raise ``HasherBusy`` so the endpoint can answer 429 instead of
+piling up requests.
+"""
+from concurrent.futures import ProcessPoolExecutor
+import multiprocessing
+import threading
+
+from werkzeug.security import check_password_hash, generate_password_hash
+
+
+class HasherBusy(Exception):
+    """Raised when the hashing pool already has max_pending jobs queued"""
+
+
+class PasswordHasher:
+    """
+    ``method`` is a werkzeug hash method string such as ``scrypt:32768:8:1``
+    or ``pbkdf2:sha256:600000``; short forms (``scrypt``, ``pbkdf2:sha256``)
+    get werkzeug's defaults. ``workers=0`` hashes inline, which is handy for
+    development and scripts.
+    """
+
+    def __init__(self, method='scrypt:32768:8:1', workers=2, max_pending=16, timeout=10):
+        self.method = method
+        self.workers = workers
+        self.max_pending = max_pending
+        self.timeout = timeout
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._pool = None
+        self._pool_lock = threading.Lock()
+        self._prefix = None  # method as werkzeug writes it into hashes
+
+    def _executor(self):
+        # Created on first use so each (forked) server worker gets its own pool
+        with self._pool_lock:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context('spawn')
+                )
+            return self._pool
+
+    def _run(self, fn, *args):
+        if not self.workers:
+            return fn(*args)
+        if not self._slots.acquire(blocking=False):
+            raise HasherBusy()
+        try:
+            return self._executor().submit(fn, *args).result(timeout=self.timeout)
+        finally:
+            self._slots.release()
+
+    def hash(self, password):
+        return self._run(generate_password_hash, password, self.method)
+
+    def verify(self, password_hash, password):
+        return self._run(check_password_hash, password_hash, password)
+
+    def method_prefix(self):
+        """``method`` in the full form stored in hashes, e.g. 'scrypt' -> 'scrypt:32768:8:1'"""
+        if self._prefix is None:
+            # Ask werkzeug rather than duplicating its defaults; costs one hash per process
+            self._prefix = self.hash('').split('$', 1)[0]
+        return self._prefix
+
+    def needs_rehash(self, password_hash):
+        """True when the stored hash was made with a different method or cost"""
+        return password_hash.split('$', 1)[0] != self.method_prefix()
+
+    def warm_up(self):
+        """Start the worker processes (and load the hashing code) before the first login"""
+        if self.workers:
+            executor = self._executor()
+            futures = [executor.submit(generate_password_hash, 'warm-up', self.method) for _ in range(self.workers)]
+            for future in futures:
+                self._prefix = future.result(timeout=self.timeout * 3).split('$', 1)[0]
+
+    def shutdown(self):
+        with self._pool_lock:
+            if self._pool is not None:
+                self._pool.shutdown()
+                self._pool = None
@@ -0,0 +1,64 @@
+"""
+Incremental ranking for meet results.
+
+A new timing is placed on its (meet_id, event_id, classification) board
+with a binary search instead of re-ranking every result in the event. Ties
+share a rank (standard competition ranking, e.g. 1, 2, 2, 4), so inserting
+a time only changes the rank of rows that are strictly slower than it.
+
+Boards are built from rows read in the writing transaction, never cached:
+any other worker or upload may have added results since the last request.
+"""
+from bisect import bisect_left, bisect_right
+
+
+def competition_ranks(timings):
+    """Return competition ranks for an already sorted list of timings"""
+    ranks = []
+    for idx, timing in enumerate(timings):
+        if idx and timing == timings[idx - 1]:
+            ranks.append(ranks[-1])
+        else:
+            ranks.append(idx + 1)
+    return ranks
+
+
+class RankingBoard:
+    """Sorted timings for one (meet, event, classification) group"""
+
+    def __init__(self, rows=()):
+        # rows: iterable of (result_id, timing)
+        ordered = sorted((timing, result_id) for result_id, timing in rows)
+        self.timings = [t for t, _ in ordered]
+        self.result_ids = [rid for _, rid in ordered]
+
+    def rank_of(self, timing):
+        return bisect_left(self.timings, timing) + 1
+
+    def ranks(self):
+        """Map result_id -> rank for every row on the board"""
+        return dict(zip(self.result_ids, competition_ranks(self.timings)))
+
+    def insert(self, result_id, timing):
+        """Insert a timing after any equal ones; return its rank"""
+        rank = self.rank_of(timing)
+        pos = bisect_right(self.timings, timing)
+        self.timings.insert(pos, timing)
+        self.result_ids.insert(pos, result_id)
+        return rank
+
+
+def place_result(rows, result_id, timing):
+    """
+    Rank a new result against its group's current ``(result_id, timing,
+    stored_rank)`` rows, read in the same transaction that inserts it.
+    Returns ``(rank, changes)`` where ``changes`` maps result_id -> rank for
+    every existing row whose stored rank must change: rows the new time
+    pushed down, plus any stored rank that was already wrong.
+    """
+    stored = {rid: rank for rid, _, rank in rows}
+    board = RankingBoard((rid, board_timing) for rid, board_timing, _ in rows)
+    rank = board.insert(result_id, timing)
+    changes = {rid: new_rank for rid, new_rank in board.ranks().items()
+               if rid != result_id and stored[rid] != new_rank}
+    return rank, changes
@@ -0,0 +1,128 @@
+"""
+Token-bucket rate limiting for the unauthenticated endpoints.
+
+A rule is ``(limit, period)``: a bucket holds at most ``limit`` tokens and
+refills at ``limit / period`` tokens per second, so a client gets a burst
+of ``limit`` requests and then one every ``period / limit`` seconds.
+``hit(key, limit, period)`` takes a token and returns 0, or returns how
+many seconds until one is available (nothing is taken then).
+
+``MemoryLimiter`` keeps buckets in this process (each server worker has
+its own); ``RedisLimiter`` (needs the redis package) shares them between
+processes with one atomic script call per check.
+"""
+from collections import OrderedDict
+import threading
+import time
+
+
+class MemoryLimiter:
+    def __init__(self, maxsize=100000):
+        self.maxsize = maxsize
+        self._buckets = OrderedDict()  # key -> [tokens, updated_at]
+        self._lock = threading.Lock()
+
+    def hit(self, key, limit, period):
+        now = time.monotonic()
+        rate = limit / period
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = self._buckets[key] = [float(limit), now]
+                if len(self._buckets) > self.maxsize:
+                    self._buckets.popitem(last=False)  # Least recently used
+            else:
+                self._buckets.move_to_end(key)
+                bucket[0] = min(limit, bucket[0] + (now - bucket[1]) * rate)
+                bucket[1] = now
+            if bucket[0] >= 1:
+                bucket[0] -= 1
+                return 0
+            return (1 - bucket[0]) / rate
+
+    def reset(self):
+        with self._lock:
+            self._buckets.clear()
+
+    def size(self):
+        return len(self._buckets)
+
+
+# KEYS[1] bucket; ARGV limit, period. Uses the Redis clock so every process
+# agrees on time. Returns the wait in seconds as a string (Lua numbers would
+# be truncated to integers).
+_REDIS_HIT = """
+local limit = tonumber(ARGV[1])
+local rate = limit / tonumber(ARGV[2])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'at')
+local tokens = tonumber(bucket[1]) or limit
+local at = tonumber(bucket[2]) or now
+tokens = math.min(limit, tokens + (now - at) * rate)
+local wait = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+else
+    wait = (1 - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'at', tostring(now))
+redis.call('PEXPIRE', KEYS[1], math.ceil(tonumber(ARGV[2]) * 1000))
+return tostring(wait)
+"""
+
+
+class RedisLimiter:
+    def __init__(self, url, prefix='ratelimit:'):
+        import redis  # Optional dependency, only needed for this backend
+
+        self.prefix = prefix
+        self._redis = redis.Redis.from_url(url)
+        self._hit = self._redis.register_script(_REDIS_HIT)
+
+    def hit(self, key, limit, period):
+        return float(self._hit(keys=[self.prefix + key], args=[limit, period]))
+
+    def reset(self):
+        for key in self._redis.scan_iter(self.prefix + '*'):
+            self._redis.delete(key)
+
+    def size(self):
+        return None
+
+
+class RateLimiter:
+    """
+    Applies the configured rules: ``rules`` maps a rule name (e.g. 'login')
+    to ``{'ip': (limit, period), 'email': (limit, period)}``; either part may
+    be left out. Counts allowed and limited requests per rule.
+    """
+
+    def __init__(self, backend, rules):
+        self.backend = backend
+        self.rules = rules
+        self._counts = {name: {'allowed': 0, 'limited': 0} for name in rules}
+
+    def check(self, name, ip, email=None):
+        """Seconds the caller has to wait, or 0 if the request may go ahead"""
+        rule = self.rules.get(name)
+        if not rule:
+            return 0
+        wait = 0
+        if 'ip' in rule:
+            wait = self.backend.hit(f'{name}:ip:{ip}', *rule['ip'])
+        if not wait and email and 'email' in rule:
+            wait = self.backend.hit(f'{name}:email:{email.strip().lower()}', *rule['email'])
+        self._counts[name]['limited' if wait else 'allowed'] += 1
+        return wait
+
+    def stats(self):
+        return {
+            'backend': type(self.backend).__name__,
+            'buckets': self.backend.size(),
+            'rules': {
+                name: dict(counts, **{part: {'limit': limit, 'period': period}
+                                      for part, (limit, period) in self.rules[name].items()})
+                for name, counts in self._counts.items()
+            }
+        }
@@ -0,0 +1,174 @@
+"""
+Read-replica routing for the Flask-SQLAlchemy session, with per-pool
+connection counters.
+
+Replicas are plain binds (``replica0``, ``replica1``, ...) so
+Flask-SQLAlchemy creates and disposes their engines; no model is mapped to
+them. ``RoutingSession`` sends a statement for the default bind to a
+replica when all of these hold:
+
+- it runs inside a GET, HEAD or OPTIONS request
+- it is a SELECT and the session has not written during this request
+- the client (``key_func()``, e.g. JWT identity or remote address) has not
+  committed a write in the last ``sticky_seconds``
+- the code is not inside ``router.primary()``
+
+Everything else goes to the primary. A session keeps the replica it first
+picked (round robin) for the rest of the request, so one request reads one
+consistent snapshot. Replication itself, and keeping its lag below
+``sticky_seconds``, is the database's job.
+"""
+from contextlib import contextmanager
+from itertools import cycle
+import threading
+import time
+
+from flask import current_app, has_app_context, has_request_context, request
+from flask_sqlalchemy.session import Session
+from sqlalchemy import event
+
+from cache import TTLCache
+
+READ_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+
+class RoutingSession(Session):
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        engine = super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+        if bind is not None or not has_app_context():
+            return engine
+        router = current_app.extensions.get('replica_router')
+        if router is None or engine is not self._db.engine:
+            return engine  # Explicit binds are never rerouted
+        return router.route(self, clause, engine)
+
+
+@event.listens_for(RoutingSession, 'after_commit')
+def _after_commit(session):
+    router = current_app.extensions.get('replica_router') if has_app_context() else None
+    if router is not None:
+        router.after_commit(session)
+
+
+class ReplicaRouter:
+    def __init__(self, keys=(), sticky_seconds=5, key_func=None, sticky_size=10000):
+        self.keys = list(keys)
+        self.sticky_seconds = sticky_seconds
+        self.key_func = key_func or (lambda: request.remote_addr)
+        self._sticky = TTLCache(ttl=sticky_seconds, maxsize=sticky_size)
+        self._next_replica = cycle(self.keys) if self.keys else None
+        self._last_write = float('-inf')
+        self._routes = {'replica': 0, 'sticky': 0, 'primary': 0}
+        self._pools = {}  # name -> counters
+        self._engines = {}
+        self._lock = threading.Lock()
+        self.db = None
+
+    def init_app(self, app, db):
+        self.db = db
+        app.extensions['replica_router'] = self
+        app.teardown_request(self._end_request)
+        with app.app_context():
+            self._watch('primary', db.engine)
+            for key in self.keys:
+                self._watch(key, db.engines[key])
+
+    # ── Routing ──
+    def route(self, session, clause, primary):
+        if not self.keys:
+            return primary
+        info = session.info
+        if session._flushing or (clause is not None and not getattr(clause, 'is_select', False)):
+            info['wrote'] = True
+        target = 'primary'
+        if (clause is not None and not info.get('wrote') and not info.get('primary')
+                and has_request_context() and request.method in READ_METHODS):
+            if self._sticky.get(self.key_func()):
+                target = 'sticky'
+            else:
+                target = 'replica'
+                if 'replica' not in info:
+                    info['replica'] = next(self._next_replica)
+        with self._lock:
+            self._routes[target] += 1
+        if target == 'replica':
+            return self.db.engines[info['replica']]
+        return primary
+
+    @contextmanager
+    def primary(self, force=True):
+        """Send the current session's reads to the primary inside the block"""
+        info = self.db.session().info
+        previous = info.get('primary', False)
+        info['primary'] = previous or force
+        try:
+            yield
+        finally:
+            info['primary'] = previous
+
+    def recently_written(self):
+        """True if this process committed a write within the sticky window"""
+        return time.monotonic() - self._last_write < self.sticky_seconds
+
+    def after_commit(self, session):
+        if not session.info.pop('wrote', False):
+            return
+        self._last_write = time.monotonic()
+        if has_request_context():
+            self._sticky.put(self.key_func(), True)
+
+    def _end_request(self, exc):
+        if self.db.session.registry.has():
+            info = self.db.session().info
+            for key in ('wrote', 'replica', 'primary'):
+                info.pop(key, None)
+
+    # ── Pool metrics ──
+    def _watch(self, name, engine):
+        counters = self._pools[name] = {'connects': 0, 'checkouts': 0, 'checked_out': 0, 'peak_checked_out': 0}
+        self._engines[name] = engine
+        lock = self._lock
+
+        def on_connect(dbapi_connection, record):
+            with lock:
+                counters['connects'] += 1
+
+        def on_checkout(dbapi_connection, record, proxy):
+            with lock:
+                counters['checkouts'] += 1
+                counters['checked_out'] += 1
+                counters['peak_checked_out'] = max(counters['peak_checked_out'], counters['checked_out'])
+
+        def on_checkin(dbapi_connection, record):
+            with lock:
+                counters['checked_out'] -= 1
+
+        event.listen(engine, 'connect', on_connect)
+        event.listen(engine, 'checkout', on_checkout)
+        event.listen(engine, 'checkin', on_checkin)
+
+    def stats(self):
+        with self._lock:
+            pools = {}
+            for name, counters in self._pools.items():
+                pool = self._engines[name].pool
+                pools[name] = dict(counters, pool=type(pool).__name__)
+                if hasattr(pool, 'overflow'):  # QueuePool
+                    pools[name].update(size=pool.size(), overflow=pool.overflow())
+            return {
+                'replicas': list(self.keys),
+                'sticky_seconds': self.sticky_seconds,
+                'sticky_clients': self._sticky.stats()['size'],
+                'routes': dict(self._routes),
+                'pools': pools
+            }
+
+    def gauges(self):
+        """(name, labels, value) samples for /metrics"""
+        stats = self.stats()
+        for target, count in stats['routes'].items():
+            yield 'db_routed_statements', {'target': target}, count
+        for field in ('connects', 'checkouts', 'checked_out', 'peak_checked_out', 'size', 'overflow'):
+            for name, pool in stats['pools'].items():
+                if field in pool:
+                    yield f'db_pool_{field}', {'pool': name}, pool[field]
@@ -0,0 +1,80 @@
+"""
+Heat and lane seeding for one event at a meet.
+
+Entries are ordered by seed time (entries without a time swim first, in
+entry order). Heats fill from the last heat, which holds the fastest
+swimmers; the first heat takes the remainder but is topped up to three
+swimmers where possible. Within a heat the fastest swimmer gets the centre
+lane and the rest spread outwards (4, 5, 3, 6, 2, 7, 1, 8 in an 8-lane pool).
+
+Circle seeding deals the fastest swimmers across the last three heats in
+turn (fastest to the last heat, next to the heat before it, ...) so those
+heats are evenly matched; earlier heats are seeded as above.
+"""
+import math
+
+MIN_FIRST_HEAT = 3
+CIRCLE_HEATS = 3
+
+
+def lane_order(lanes):
+    """Lane numbers from the centre outwards, e.g. [4, 5, 3, 6, 2, 7, 1, 8]"""
+    order = [(lanes + 1) // 2]
+    step = 1
+    while len(order) < lanes:
+        for lane in (order[0] + step, order[0] - step):
+            if 1 <= lane <= lanes and len(order) < lanes:
+                order.append(lane)
+        step += 1
+    return order
+
+
+def heat_sizes(count, lanes):
+    """Swimmers per heat, first heat first"""
+    if count == 0:
+        return []
+    heats = math.ceil(count / lanes)
+    sizes = [lanes] * heats
+    sizes[0] = count - lanes * (heats - 1)
+    if heats > 1 and sizes[0] < MIN_FIRST_HEAT <= lanes:
+        moved = MIN_FIRST_HEAT - sizes[0]
+        sizes[0] += moved
+        sizes[1] -= moved
+    return sizes
+
+
+def seed_heats(entries, lanes=8, circle=False):
+    """
+    Assign heats and lanes.
+
+    ``entries`` is an iterable of (entry_id, seed_time) where seed_time may be
+    None for no time. Returns a list of (entry_id, heat, lane).
+    """
+    ordered = sorted(entries, key=lambda e: (e[1] is None, e[1] or 0, e[0]))  # Fastest first
+    sizes = heat_sizes(len(ordered), lanes)
+    heats = [[] for _ in sizes]
+
+    # Fastest swimmers first: circle-seeded across the last heats, then the
+    # remaining heats filled from the back
+    position = 0
+    if circle and len(sizes) > 1:
+        circled = list(range(len(sizes) - 1, max(len(sizes) - CIRCLE_HEATS, 0) - 1, -1))
+        slots = sum(sizes[h] for h in circled)
+        turn = 0
+        for entry in ordered[:slots]:
+            while len(heats[circled[turn % len(circled)]]) >= sizes[circled[turn % len(circled)]]:
+                turn += 1
+            heats[circled[turn % len(circled)]].append(entry)
+            turn += 1
+        position = slots
+    for heat in range(len(sizes) - 1, -1, -1):
+        room = sizes[heat] - len(heats[heat])
+        heats[heat].extend(ordered[position:position + room])
+        position += room
+
+    order = lane_order(lanes)
+    return [
+        (entry_id, heat + 1, order[place])
+        for heat, swimmers in enumerate(heats)
+        for place, (entry_id, _) in enumerate(swimmers)
+    ]
@@ -0,0 +1,18 @@
+"""
+Production entry point for pre-forking WSGI servers.
+
+    gunicorn -c gunicorn.conf.py wsgi:app
+
+Gunicorn imports this module in each worker after the fork (preload_app
+is off in gunicorn.conf.py), so every worker builds its own app, engines
+and pools; gunicorn.conf.py warms the worker up before it accepts
+connections. It runs gevent workers, so open live streams do not tie up
+request threads. While LIVE_BACKEND or OTP_BACKEND is 'memory' it starts
+one worker and refuses GUNICORN_WORKERS above 1. Other servers should import ``app`` the same way (e.g. uWSGI
+with lazy-apps) and call ``warm_up(app)`` from app.py once per worker.
+
+Create the schema and admin user with ``flask --app app init-db`` first.
+"""
+from app import create_app
+
+app = create_app()
@@ -92,6 +92,17 @@ function AdminView({ swimmers, meets, events, results, entries, onRefresh, onLog
     }
   };
 
+  const handleApproveAllPending = async () => {
+    const ids = entries.filter(e => e.status === 'pending').map(e => e.id);
+    if (ids.length === 0) return;
+    try {
+      await axiosInstance.put('/entries/bulk', { ids, status: 'approved' });
+      onRefresh();
+    } catch (error) {
+      console.error('Failed to approve entries:', error);
+    }
+  };
+
   const handleDeleteEntry = async (entryId) => {
     if (window.confirm('Are you sure you want to delete this entry?')) {
       try {
@@ -257,6 +268,9 @@ function AdminView({ swimmers, meets, events, results, entries, onRefresh, onLog
           <div className="section">
             <h2>Event Entries Management</h2>
             <p className="info-text">Manage swimmer registrations for events</p>
+            {entries.some(e => e.status === 'pending') && (
+              <button className="btn-approve" onClick={handleApproveAllPending}>Approve All Pending</button>
+            )}
             
             {entries.length === 0 ? (
               <div className="no-data">No entries yet</div>
@@ -1,5 +1,5 @@
 import React, { useState, useEffect } from 'react';
-import axiosInstance from './axiosConfig';
+import axiosInstance, { fetchAllPages } from './axiosConfig';
 import Home from './Home';
 import Login from './Login';
 import AdminView from './AdminView';
@@ -38,10 +38,10 @@ function App() {
     fetchEntries();
   };
 
-  const fetchSwimmers = () => axiosInstance.get('/swimmers').then(res => setSwimmers(res.data)).catch(() => {});
-  const fetchMeets = () => axiosInstance.get('/meets').then(res => setMeets(res.data)).catch(() => {});
-  const fetchEvents = () => axiosInstance.get('/events').then(res => setEvents(res.data)).catch(() => {});
-  const fetchResults = () => axiosInstance.get('/results').then(res => setResults(res.data)).catch(() => {});
+  const fetchSwimmers = () => fetchAllPages('/swimmers').then(setSwimmers).catch(() => {});
+  const fetchMeets = () => fetchAllPages('/meets').then(setMeets).catch(() => {});
+  const fetchEvents = () => fetchAllPages('/events').then(setEvents).catch(() => {});
+  const fetchResults = () => fetchAllPages('/results').then(setResults).catch(() => {});
   const fetchEntries = () => axiosInstance.get('/entries').then(res => setEntries(res.data)).catch(() => {});
 
   const handleLogin = (userData) => {
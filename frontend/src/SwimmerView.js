@@ -1,4 +1,4 @@
-import React, { useState } from 'react';
+import React, { useState, useEffect } from 'react';
 import axiosInstance from './axiosConfig';
 import './SwimmerView.css';
 
@@ -8,6 +8,16 @@ function SwimmerView({ swimmers, meets, events, results, entries, onRefresh, onL
   const [activeTab, setActiveTab] = useState('results');
   const [entryForm, setEntryForm] = useState({ meet_id: '', event_id: '', entry_time: '' });
   const [entryMessage, setEntryMessage] = useState('');
+  const [history, setHistory] = useState(null);
+
+  // Load every event's history in one request the first time the tab opens
+  useEffect(() => {
+    if (activeTab === 'progress' && history === null && user.swimmer_id) {
+      axiosInstance.get(`/performance-history/${user.swimmer_id}`)
+        .then(res => setHistory(res.data))
+        .catch(() => setHistory([]));
+    }
+  }, [activeTab, history, user.swimmer_id]);
 
   // Get swimmer's entries
   const myEntries = entries.filter(e => e.swimmer_id === user.swimmer_id);
@@ -64,6 +74,7 @@ function SwimmerView({ swimmers, meets, events, results, entries, onRefresh, onL
         <button className={activeTab === 'results' ? 'tab active' : 'tab'} onClick={() => setActiveTab('results')}>Results</button>
         <button className={activeTab === 'register' ? 'tab active' : 'tab'} onClick={() => setActiveTab('register')}>Register for Events</button>
         <button className={activeTab === 'myEntries' ? 'tab active' : 'tab'} onClick={() => setActiveTab('myEntries')}>My Entries</button>
+        <button className={activeTab === 'progress' ? 'tab active' : 'tab'} onClick={() => setActiveTab('progress')}>My Progress</button>
       </div>
 
       <div className="swimmer-content">
@@ -156,6 +167,33 @@ function SwimmerView({ swimmers, meets, events, results, entries, onRefresh, onL
           </div>
         )}
 
+        {activeTab === 'progress' && (
+          <div className="my-entries-section">
+            <h2>My Progress</h2>
+            {history === null ? (
+              <div className="no-entries">Loading...</div>
+            ) : history.length === 0 ? (
+              <div className="no-entries">No results recorded yet.</div>
+            ) : (
+              <div className="entries-grid">
+                {history.map(series => (
+                  <div key={series.event_id} className="entry-card">
+                    <div className="entry-header">
+                      <h3>{series.event_name}</h3>
+                      <span className="badge">Best: {Math.min(...series.history.map(h => h.timing))}s</span>
+                    </div>
+                    <div className="entry-details">
+                      {series.history.map((h, idx) => (
+                        <p key={idx}><strong>{h.meet_date}</strong> {h.meet_name}: {h.timing}s{h.rank ? ` (#${h.rank})` : ''}</p>
+                      ))}
+                    </div>
+                  </div>
+                ))}
+              </div>
+            )}
+          </div>
+        )}
+
         {activeTab === 'results' && (
           <>
             <div className="filters">
@@ -63,4 +63,18 @@ axiosInstance.interceptors.response.use(
   }
 );
 
+// Fetch every page of a cursor-paginated list endpoint (/swimmers, /results, ...)
+export const fetchAllPages = async (url, params = {}) => {
+  const rows = [];
+  let cursor = null;
+  do {
+    const response = await axiosInstance.get(url, {
+      params: cursor ? { ...params, cursor } : params
+    });
+    rows.push(...response.data);
+    cursor = response.headers['x-next-cursor'];
+  } while (cursor);
+  return rows;
+};
+
 export default axiosInstance;